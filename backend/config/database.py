@@ -1,17 +1,42 @@
 # Gerekli kütüphaneleri içe aktarıyoruz
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
-import os
+from starlette.concurrency import run_in_threadpool
+from backend.config.settings import get_settings
+from backend.utils.metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
 
-# .env dosyasındaki ortam değişkenlerini yükle
-load_dotenv()
+# Veritabanı URL'si ayarlardan (.env dahil) gelir
+settings = get_settings()
+DATABASE_URL = settings.database_url
 
-# Veritabanı URL'sini ortam değişkenlerinden al
-DATABASE_URL = os.getenv("DATABASE_URL")
+# Havuz ayarları: sync ve async engine için ortak
+POOL_OPTIONS = {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": settings.db_pool_pre_ping,
+}
+
+# statement_timeout bağlantı açılırken oturum ayarı olarak verilir
+# (psycopg2: libpq "options", asyncpg: server_settings)
+SYNC_CONNECT_ARGS = {}
+ASYNC_CONNECT_ARGS = {}
+if settings.db_statement_timeout_ms > 0:
+    SYNC_CONNECT_ARGS["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    ASYNC_CONNECT_ARGS["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+
+# Metrikler açıkken havuz bekleme süresi ölçülen havuz sınıfları kullanılır
+SYNC_METRICS_OPTIONS = {"poolclass": TimedQueuePool} if settings.metrics_enabled else {}
+ASYNC_METRICS_OPTIONS = {"poolclass": TimedAsyncQueuePool} if settings.metrics_enabled else {}
 
 # SQLAlchemy engine oluştur: Veritabanına bağlanmak için kullanılır
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, connect_args=SYNC_CONNECT_ARGS, **POOL_OPTIONS, **SYNC_METRICS_OPTIONS)
+
+# Sorgu sayısı / süresi (/metrics)
+if settings.metrics_enabled:
+    instrument_engine(engine)
 
 # Session sınıfını oluştur: Veritabanı işlemlerini yönetmek için
 SessionLocal = sessionmaker(
@@ -22,3 +47,100 @@ SessionLocal = sessionmaker(
 
 # Declarative base sınıfı: ORM modelleri bu sınıftan türetilir
 Base = declarative_base()
+
+
+# postgresql:// veya postgresql+psycopg2:// -> postgresql+asyncpg://
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{scheme.split('+')[0]}+asyncpg{sep}{rest}"
+
+
+# Async engine (asyncpg + SQLAlchemy asyncio)
+# -------------------------
+# DB_ASYNC=1 (varsayılan) iken istekler bu engine üzerinden çalışır;
+# DB_ASYNC=0 ile senkron engine + threadpool yoluna dönülür (karşılaştırma için).
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL),
+        connect_args=ASYNC_CONNECT_ARGS,
+        **POOL_OPTIONS,
+        **ASYNC_METRICS_OPTIONS
+    )
+    if settings.metrics_enabled:
+        instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+# İstek başına veritabanı oturumu
+# -------------------------
+# Sorgu kodu senkron Session ile yazılır ve run() ile çalıştırılır:
+#   async modda AsyncSession.run_sync (asyncpg, thread tutmaz),
+#   senkron modda Starlette threadpool'unda.
+# Böylece handler'lar async kalır, aynı sorgu fonksiyonları iki modda da çalışır.
+class DBSession:
+    def __init__(self):
+        self.is_async = AsyncSessionLocal is not None
+        self.session = AsyncSessionLocal() if self.is_async else SessionLocal()
+
+    async def run(self, fn, *args, **kwargs):
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    # Sorguyu sunucu tarafı cursor ile parça parça oku
+    # -------------------------
+    # yield_per: her parçada en fazla bu kadar satır; tüm sonuç belleğe alınmaz.
+    async def stream(self, stmt, yield_per: int):
+        stmt = stmt.execution_options(yield_per=yield_per)
+        if self.is_async:
+            result = await self.session.stream(stmt)
+            async for rows in result.partitions():
+                yield rows
+            return
+        result = await run_in_threadpool(self.session.execute, stmt)
+        partitions = result.partitions()
+        while True:
+            rows = await run_in_threadpool(next, partitions, None)
+            if rows is None:
+                break
+            yield rows
+
+    # Birden çok run() çağrısına yayılan transaction'ı bitir
+    async def commit(self):
+        if self.is_async:
+            await self.session.commit()
+        else:
+            await run_in_threadpool(self.session.commit)
+
+    # Açık transaction'ı bitir ve bağlantıyı havuza geri ver
+    # (uzun bir await öncesi; sonraki run() yeni bağlantı alır)
+    async def rollback(self):
+        if self.is_async:
+            await self.session.rollback()
+        else:
+            await run_in_threadpool(self.session.rollback)
+
+    async def close(self):
+        if self.is_async:
+            await self.session.close()
+        else:
+            await run_in_threadpool(self.session.close)
+
+
+# DB Bağımlılığı: istek başına tek oturum
+# -------------------------
+# get_current_user ve handler'lar aynı bağımlılığı kullanır; FastAPI bunu
+# istek içinde önbelleğe aldığı için kimlik doğrulama ve handler aynı
+# oturumu (ve aynı havuz bağlantısını) paylaşır.
+async def get_db():
+    db = DBSession()
+    try:
+        yield db
+    finally:
+        await db.close()
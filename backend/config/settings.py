@@ -0,0 +1,141 @@
+from functools import lru_cache
+from dotenv import load_dotenv
+import os
+
+# .env dosyasındaki ortam değişkenlerini yükle (tek yer: diğer modüller
+# ortamı doğrudan okumaz, get_settings() kullanır)
+load_dotenv()
+
+
+# "1", "true", "yes", "on" -> True
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Uygulama ayarları
+# -------------------------
+# Ortam değişkenlerinden bir kez okunur, get_settings() ile paylaşılır.
+class Settings:
+    def __init__(self):
+        # Veritabanı bağlantısı
+        self.database_url = os.getenv("DATABASE_URL")
+
+        # JWT
+        self.secret_key = os.getenv("SECRET_KEY")
+        self.jwt_algorithm = os.getenv("ALGORITHM", "HS256")
+        self.access_token_expire_minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+
+        # Async veritabanı yolu (asyncpg); 0 ise senkron engine + threadpool
+        self.db_async = _env_bool("DB_ASYNC", True)
+
+        # Bağlantı havuzu ayarları (her worker için)
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+        self.db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+        self.db_pool_pre_ping = _env_bool("DB_POOL_PRE_PING", True)
+        # Sorgu başına zaman aşımı (ms, PostgreSQL statement_timeout); 0 = kapalı
+        self.db_statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+
+        # get_current_user principal önbelleği ve imzalı claim seçeneği
+        self.principal_cache_size = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+        self.principal_cache_ttl = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+        self.jwt_principal_claims = _env_bool("JWT_PRINCIPAL_CLAIMS", False)
+
+        # bcrypt: maliyet, worker process sayısı ve kuyruk sınırı
+        self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", "12"))
+        self.bcrypt_workers = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.bcrypt_max_pending = int(os.getenv("BCRYPT_MAX_PENDING", "32"))
+
+        # POST /donations/bulk: INSERT başına satır, istek başına en fazla satır ve gövde boyutu
+        self.bulk_batch_size = int(os.getenv("BULK_BATCH_SIZE", "500"))
+        self.bulk_max_rows = int(os.getenv("BULK_MAX_ROWS", "5000"))
+        self.bulk_max_bytes = int(os.getenv("BULK_MAX_BYTES", str(10 * 1024 * 1024)))
+
+        # /donations/batch uçlarında istek başına en fazla id
+        self.batch_max_ids = int(os.getenv("BATCH_MAX_IDS", "200"))
+
+        # NDJSON akış modunda veritabanından parça başına okunan satır
+        self.stream_batch_size = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+        # GET uçlarında ETag/Last-Modified (db/migration_add_change_counter.sql gerekir,
+        # bu yüzden varsayılan kapalı; migration uygulandıktan sonra açılır)
+        self.http_validators_enabled = _env_bool("HTTP_VALIDATORS_ENABLED", False)
+
+        # Yakın bağış sorguları için alan bazlı yanıt önbelleği
+        # backend: "memory" (worker başına) veya "redis" (paylaşılan, RESPONSE_CACHE_URL)
+        # Varsayılan kapalı: konum hücre merkezine, yarıçap kovaya yuvarlanır (sonuç kayar)
+        self.response_cache_enabled = _env_bool("RESPONSE_CACHE_ENABLED", False)
+        self.response_cache_backend = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+        self.response_cache_url = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+        self.response_cache_size = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+        self.response_cache_ttl = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+        self.response_cache_cell_deg = float(os.getenv("RESPONSE_CACHE_CELL_DEG", "0.002"))
+
+        # Canlı değişiklik akışı (WebSocket/SSE)
+        # backend: "postgres" (LISTEN/NOTIFY, tüm worker'lar), "local" (sadece bu worker), "off"
+        self.change_feed_backend = os.getenv("CHANGE_FEED_BACKEND", "local")
+        self.change_feed_max_subscribers = int(os.getenv("CHANGE_FEED_MAX_SUBSCRIBERS", "1000"))
+        self.change_feed_queue_size = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "100"))
+        self.change_feed_keepalive_seconds = float(os.getenv("CHANGE_FEED_KEEPALIVE_SECONDS", "15"))
+
+        # GET /donations/changes: bu kadar saniyeden yeni değişiklikler sonraki
+        # senkrona bırakılır (henüz commit olmamış eşzamanlı yazmalar kaçmasın)
+        self.sync_safety_seconds = float(os.getenv("SYNC_SAFETY_SECONDS", "10"))
+
+        # Arşiv süpürücüsü: teslim alınan/silinen/süresi dolan bağışlar bu kadar
+        # saat sonra donations_archive'a taşınır (o zamana kadar /changes tombstone döner)
+        # Sırasıyla db/migration_add_soft_delete.sql ve db/migration_add_archive.sql
+        # gerekir; bu yüzden varsayılan kapalı, migration'lar uygulandıktan sonra açılır
+        self.archive_enabled = _env_bool("ARCHIVE_ENABLED", False)
+        self.archive_interval_seconds = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "300"))
+        self.archive_batch_size = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+        self.archive_retention_hours = float(os.getenv("ARCHIVE_RETENTION_HOURS", "168"))
+
+        # /metrics (Prometheus) ve route bazlı SQL/gecikme ölçümü
+        # QUERY_BUDGET_ENFORCE=1 (test modu): @query_budget aşılırsa istek hata verir
+        self.metrics_enabled = _env_bool("METRICS_ENABLED", True)
+        self.query_budget_enforce = _env_bool("QUERY_BUDGET_ENFORCE", False)
+
+        # İstek profili (bkz. backend/utils/profiler.py)
+        # ADMIN_TOKEN: /admin ve /metrics uçları (X-Admin-Token header'ı) ve
+        # "X-Profile: <token>" ile tek istek profili; boşsa hepsi kapalı
+        # PROFILER_SAMPLE_RATE: rastgele profillenecek istek oranı (0 = kapalı)
+        self.admin_token = os.getenv("ADMIN_TOKEN") or None
+        self.profiler_sample_rate = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+        self.profiler_interval_ms = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+        self.profiler_slowest_per_route = int(os.getenv("PROFILER_SLOWEST_PER_ROUTE", "5"))
+
+        # Kullanıcı (veya IP) başına token bucket: dakikada istek ve anlık patlama
+        # auth: login/register (IP'ye göre), read: GET uçları, write: diğerleri; 0 = sınırsız
+        self.rate_limit_enabled = _env_bool("RATE_LIMIT_ENABLED", True)
+        self.rate_limit_max_keys = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+        self.rate_limit_auth_per_minute = float(os.getenv("RATE_LIMIT_AUTH_PER_MINUTE", "20"))
+        self.rate_limit_auth_burst = int(os.getenv("RATE_LIMIT_AUTH_BURST", "10"))
+        self.rate_limit_read_per_minute = float(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "600"))
+        self.rate_limit_read_burst = int(os.getenv("RATE_LIMIT_READ_BURST", "60"))
+        self.rate_limit_write_per_minute = float(os.getenv("RATE_LIMIT_WRITE_PER_MINUTE", "120"))
+        self.rate_limit_write_burst = int(os.getenv("RATE_LIMIT_WRITE_BURST", "30"))
+
+        # Yük atma: worker başına eşzamanlı istek sınırı (0 = yok) ve havuz bekleme
+        # ortalaması eşiği (ms, 0 = kapalı; bekleme ölçümü METRICS_ENABLED gerektirir)
+        self.shed_max_concurrency = int(os.getenv("SHED_MAX_CONCURRENCY", "0"))
+        self.shed_pool_wait_ms = float(os.getenv("SHED_POOL_WAIT_MS", "250"))
+
+        # Açılışta havuz bağlantılarını aç ve sık sorguları bir kez çalıştır
+        # (ilk isteklerin bağlantı kurma / statement hazırlama maliyeti ödememesi için)
+        self.warmup_enabled = _env_bool("WARMUP_ENABLED", True)
+        self.warmup_connections = int(os.getenv("WARMUP_CONNECTIONS", str(self.db_pool_size)))
+
+        # Bellek içi mekânsal indeks (açık bağışlar için yakın sorguları)
+        self.spatial_index_enabled = _env_bool("SPATIAL_INDEX_ENABLED", False)
+        self.spatial_index_cell_deg = float(os.getenv("SPATIAL_INDEX_CELL_DEG", "0.01"))
+        self.spatial_index_refresh_seconds = float(os.getenv("SPATIAL_INDEX_REFRESH_SECONDS", "60"))
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -1,9 +1,83 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+
+from backend.config.database import DATABASE_URL
+from backend.config.settings import get_settings
+from backend.routers import admin_router, auth_router, donation_router
+from backend.services.spatial_index import warm_spatial_index, refresh_spatial_index_periodically
+from backend.services.change_feed import change_feed
+from backend.services.donation_archive import archive_donations_periodically
+from backend.services.warmup import warm_up_database
+from backend.utils.hash import shutdown_hash_pool, warm_hash_pool
+from backend.utils.load_shedding import LoadShedMiddleware
+from backend.utils.metrics import MetricsMiddleware, render_metrics
+from backend.utils.profiler import ProfilerMiddleware
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+# Uygulama yaşam döngüsü: açılışta indeksleri ısıt, arka plan görevlerini başlat
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+
+    # Havuz bağlantılarını aç, sık sorguları hazırla; bcrypt worker'larını
+    # arka planda başlat (ilk login'i beklemesin)
+    if settings.warmup_enabled:
+        try:
+            await warm_up_database(settings.warmup_connections)
+        except Exception:
+            logger.exception("database warm-up failed")
+        tasks.append(asyncio.create_task(warm_hash_pool()))
+
+    # Açık bağışların bellek içi mekânsal indeksi (opsiyonel)
+    # Isıtma başarısız olursa indeks soğuk kalır, okumalar PostGIS'e düşer
+    if settings.spatial_index_enabled:
+        try:
+            await run_in_threadpool(warm_spatial_index)
+        except Exception:
+            logger.exception("spatial index warm-up failed")
+        tasks.append(asyncio.create_task(
+            refresh_spatial_index_periodically(settings.spatial_index_refresh_seconds)
+        ))
+
+    # Süresi dolan ilanları işaretle, kapanmış ilanları arşive taşı
+    # (birden çok worker aynı anda çalışabilir: adaylar SKIP LOCKED ile seçilir)
+    if settings.archive_enabled:
+        tasks.append(asyncio.create_task(archive_donations_periodically(
+            settings.archive_interval_seconds,
+            settings.archive_batch_size,
+            settings.archive_retention_hours,
+        )))
 
-from backend.routers import auth_router, donation_router
+    # Canlı değişiklik akışı: postgres modunda LISTEN thread'i başlar
+    await change_feed.start(DATABASE_URL)
 
-app = FastAPI()
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await change_feed.stop()
+    shutdown_hash_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Yük atma: eşzamanlılık sınırı veya havuz bekleme eşiği aşılınca hızlı 503
+# CORS'tan önce eklenir (onun içinde kalır): 503 yanıtları da CORS header'ı taşır
+if settings.shed_max_concurrency > 0 or settings.shed_pool_wait_ms > 0:
+    app.add_middleware(
+        LoadShedMiddleware,
+        max_concurrency=settings.shed_max_concurrency,
+        pool_wait_threshold=settings.shed_pool_wait_ms / 1000,
+    )
 
 # CORS: allow Expo/React Native dev clients (adjust origins for prod)
 app.add_middleware(
@@ -14,8 +88,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# İstek profili: ADMIN_TOKEN'lı X-Profile header'ı veya PROFILER_SAMPLE_RATE ile
+# İkisi de kapalıysa middleware eklenmez (profilsiz isteklere ek maliyet yok)
+if settings.admin_token or settings.profiler_sample_rate > 0:
+    app.add_middleware(
+        ProfilerMiddleware,
+        sample_rate=settings.profiler_sample_rate,
+        admin_token=settings.admin_token,
+        interval=settings.profiler_interval_ms / 1000,
+    )
+
+# Route bazlı gecikme / SQL sayısı / havuz bekleme metrikleri
+# En dışta durur: CORS dahil tüm istek süresini ölçer
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, enforce_budgets=settings.query_budget_enforce)
+
+    # Prometheus formatında metrikler (worker başına)
+    # Route şablonları ve gecikme dağılımları dışarı açılmaz: /admin uçları gibi
+    # X-Admin-Token header'ı ADMIN_TOKEN ile eşleşmeli (yoksa 403)
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(admin_router.require_admin)])
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Yetkilendirme işlemleri
 app.include_router(auth_router.router, prefix="/auth", tags=["Auth"])
 
 # Bağış işlemleri
 app.include_router(donation_router.router, prefix="/donations", tags=["Donations"])
+
+# Yönetim (profiller); ADMIN_TOKEN yoksa tüm uçlar 403 döner
+app.include_router(admin_router.router, prefix="/admin", tags=["Admin"], include_in_schema=False)
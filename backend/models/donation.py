@@ -20,6 +20,7 @@ class Donation(Base):
     title = Column(String(150), nullable=False)        # Bağış başlığı
     description = Column(String, nullable=True)       # Bağış açıklaması
     category = Column(String(50), nullable=True)      # Kategori (Gıda, Giyim, vb.)
+    previous_category = Column(String(50), nullable=True)  # Son değişiklikten önceki kategori (trigger doldurur)
     quantity = Column(String(50), nullable=True)      # Miktar bilgisi
     is_for_animals = Column(Boolean, default=False)  # Hayvanlar için mi?
 
@@ -27,6 +28,9 @@ class Donation(Base):
     is_reserved = Column(Boolean, default=False)     # Rezerve edildi mi?
     is_collected = Column(Boolean, default=False)    # Toplandı mı?
 
+    # Son kullanma tarihi: geçince ilan listelerde görünmez, sonra arşivlenir
+    expiration_date = Column(TIMESTAMP(timezone=True), nullable=True)
+
     # Konum bilgisi (PostGIS Point)
     location = Column(Geometry(geometry_type="POINT", srid=4326), nullable=False)
 
@@ -37,3 +41,6 @@ class Donation(Base):
         server_default=func.now(),
         onupdate=func.now()  # Güncellenme zamanı
     )
+
+    # Silinme zamanı: silme satırı kaldırmaz (senkronizasyon için tombstone)
+    deleted_at = Column(TIMESTAMP(timezone=True), nullable=True)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP
+from sqlalchemy.sql import func
+from geoalchemy2 import Geometry
+from backend.config.database import Base
+
+# Arşivlenmiş bağışlar (teslim alınmış / silinmiş / süresi dolmuş)
+# Aylık partition'lara bölünmüş tablo (archived_at'e göre), satırları arka plan
+# süpürücüsü taşır; uygulama okumaz. Bkz. db/migration_add_archive.sql
+class DonationArchive(Base):
+    __tablename__ = "donations_archive"
+
+    # Partition anahtarı birincil anahtarda olmak zorunda
+    id = Column(Integer, primary_key=True)
+    archived_at = Column(TIMESTAMP(timezone=True), primary_key=True, server_default=func.now())
+    archive_reason = Column(String(20), nullable=False)   # deleted / collected / expired
+
+    # donations ile aynı kolonlar (yabancı anahtar yok: geçmiş kayıt)
+    donor_id = Column(Integer, nullable=True)
+    reserved_by = Column(Integer, nullable=True)
+    title = Column(String(150), nullable=False)
+    description = Column(String, nullable=True)
+    category = Column(String(50), nullable=True)
+    quantity = Column(String(50), nullable=True)
+    is_for_animals = Column(Boolean, nullable=True)
+    is_reserved = Column(Boolean, nullable=True)
+    is_collected = Column(Boolean, nullable=True)
+    location = Column(Geometry(geometry_type="POINT", srid=4326), nullable=False)
+    expiration_date = Column(TIMESTAMP(timezone=True), nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    deleted_at = Column(TIMESTAMP(timezone=True), nullable=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, BigInteger, TIMESTAMP
+from sqlalchemy.sql import func
+from backend.config.database import Base
+
+# Tablo bazlı değişiklik sayacı
+# Sayaç, yazmalar commit edildikten sonra ayrı bir transaction'da artırılır
+# (donation_events.bump_version). Bkz. db/migration_add_change_counter.sql
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    changed_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
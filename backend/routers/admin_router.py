@@ -0,0 +1,46 @@
+import hmac
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import PlainTextResponse
+from backend.config.settings import get_settings
+from backend.utils.profiler import profile_store
+from backend.utils.serialization import FastJSONResponse
+
+router = APIRouter()
+settings = get_settings()
+
+
+# Admin yetkisi: X-Admin-Token header'ı ADMIN_TOKEN ile eşleşmeli
+def require_admin(x_admin_token: str | None = Header(None)):
+    if not settings.admin_token or x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), settings.admin_token.encode()
+    ):
+        raise HTTPException(
+            status_code=403,
+            detail={"status": "error", "message": "Yetkisiz erişim."}
+        )
+
+
+# GET /admin/profiles — Route başına en yavaş profiller (bu worker)
+@router.get("/profiles", status_code=200, dependencies=[Depends(require_admin)])
+async def list_profiles(route: str | None = Query(None, description="Route şablonu, örn. /donations/")):
+    profiles = profile_store.list(route)
+    return FastJSONResponse({"data": profiles, "message": f"{len(profiles)} profil bulundu"})
+
+
+# GET /admin/profiles/{profile_id} — Profil "folded stacks" formatında
+# (flamegraph.pl veya speedscope ile açılabilir)
+@router.get("/profiles/{profile_id}", status_code=200, dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: int):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"status": "error", "message": "Profil bulunamadı."}
+        )
+    return PlainTextResponse(profile.folded())
+
+
+# DELETE /admin/profiles — Profil deposunu temizle
+@router.delete("/profiles", status_code=204, dependencies=[Depends(require_admin)])
+async def clear_profiles():
+    profile_store.clear()
@@ -1,30 +1,57 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from backend.config.database import SessionLocal
+from backend.config.database import DBSession, get_db
 from backend.models.user import User
 from backend.schemas.user import (
     UserRegister,
     UserLogin,
-    UserResponse,
     AuthRegisterResponse,
     AuthLoginResponse,
     AuthMeResponse,
-    AuthLogoutResponse,
-    UserType
+    AuthLogoutResponse
 )
-from backend.utils.hash import hash_password, verify_password
-from backend.utils.jwt import create_access_token, get_current_user
+from backend.utils.hash import hash_password_async, verify_password_async
+from backend.utils.jwt import create_access_token, get_user_by_id, principal_claims
+from backend.utils.rate_limit import auth_ip_limit, read_user
+from backend.utils.serialization import FastJSONResponse
 
 router = APIRouter()
 
 
-# DB Bağımlılığı: Session oluştur
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Email ile kullanıcıyı bul
+# Nesne oturumdan ayrılır: rollback sonrası alanları expire olmaz, yeniden yüklenmez
+def _get_user_by_email(db: Session, email: str):
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None:
+        db.expunge(user)
+    return user
+
+
+# Eski maliyetle üretilmiş hash'i güncelle
+def _update_password_hash(db: Session, user_id: int, password_hash: str):
+    db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
+    db.commit()
+
+
+# Yeni kullanıcıyı kaydet
+def _insert_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+# Kullanıcıyı response formatına çevir (UserResponse alanları, model kurulmadan)
+def _user_payload(user: User) -> dict:
+    return {
+        "id": user.id,
+        "full_name": user.full_name,
+        "email": user.email,
+        "phone_number": user.phone_number,
+        "user_type": user.user_type,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
 
 
 def _ensure_password_limit(password: str):
@@ -37,20 +64,22 @@ def _ensure_password_limit(password: str):
 
 
 # REGISTER — Yeni kullanıcı oluştur
-@router.post("/register", status_code=201, response_model=AuthRegisterResponse)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+@router.post("/register", status_code=201, response_model=AuthRegisterResponse, dependencies=[Depends(auth_ip_limit)])
+async def register(user_data: UserRegister, db: DBSession = Depends(get_db)):
     _ensure_password_limit(user_data.password)
 
     # Email daha önce kullanılmış mı kontrol et
-    existing = db.query(User).filter(User.email == user_data.email).first()
+    existing = await db.run(_get_user_by_email, user_data.email)
+    # bcrypt beklerken havuz bağlantısı tutulmasın; insert yeni bağlantı alır
+    await db.rollback()
     if existing:
         raise HTTPException(
             status_code=400,
             detail={"status": "error", "message": "Bu email zaten kayıtlı."}
         )
 
-    # Şifreyi hashle
-    hashed_pw = hash_password(user_data.password)
+    # Şifreyi hashle (bcrypt worker havuzunda; havuz doluysa 503)
+    hashed_pw = await hash_password_async(user_data.password)
 
     # Yeni kullanıcı nesnesi oluştur
     new_user = User(
@@ -62,36 +91,29 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
 
     # Veritabanına ekle ve commit et
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await db.run(_insert_user, new_user)
 
     # JWT token oluştur
-    access_token = create_access_token({"sub": str(new_user.id)})
+    access_token = create_access_token(principal_claims(new_user))
 
     # Response formatına uygun döndür
-    return AuthRegisterResponse(
-        status="success",
-        message="Kullanıcı başarıyla kaydedildi",
-        data=UserResponse(
-            id=new_user.id,
-            full_name=new_user.full_name,
-            email=new_user.email,
-            phone_number=new_user.phone_number,
-            user_type=UserType(new_user.user_type),
-            created_at=new_user.created_at.isoformat() if new_user.created_at else None
-        ),
-        token=access_token
-    )
+    return FastJSONResponse({
+        "status": "success",
+        "message": "Kullanıcı başarıyla kaydedildi",
+        "data": _user_payload(new_user),
+        "token": access_token,
+    }, status_code=201)
 
 
 # LOGIN — JWT Token oluştur
-@router.post("/login", status_code=200, response_model=AuthLoginResponse)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", status_code=200, response_model=AuthLoginResponse, dependencies=[Depends(auth_ip_limit)])
+async def login(user_data: UserLogin, db: DBSession = Depends(get_db)):
     _ensure_password_limit(user_data.password)
 
     # Email ile kullanıcıyı bul
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await db.run(_get_user_by_email, user_data.email)
+    # bcrypt beklerken havuz bağlantısı tutulmasın; rehash gerekirse yeni bağlantı alır
+    await db.rollback()
 
     if not user:
         raise HTTPException(
@@ -99,37 +121,37 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             detail={"status": "error", "message": "Email bulunamadı."}
         )
 
-    # Şifreyi doğrula
-    if not verify_password(user_data.password, user.password_hash):
+    # Şifreyi doğrula (bcrypt worker havuzunda; havuz doluysa 503)
+    password_ok, new_hash = await verify_password_async(user_data.password, user.password_hash)
+    if not password_ok:
         raise HTTPException(
             status_code=400,
             detail={"status": "error", "message": "Şifre yanlış."}
         )
 
     # JWT token oluştur
-    access_token = create_access_token({"sub": str(user.id)})
+    access_token = create_access_token(principal_claims(user))
 
     # Response formatına uygun döndür
-    return AuthLoginResponse(
-        status="success",
-        message="Giriş başarılı",
-        data=UserResponse(
-            id=user.id,
-            full_name=user.full_name,
-            email=user.email,
-            phone_number=user.phone_number,
-            user_type=UserType(user.user_type),
-            created_at=user.created_at.isoformat() if user.created_at else None
-        ),
-        token=access_token
-    )
+    response = FastJSONResponse({
+        "status": "success",
+        "message": "Giriş başarılı",
+        "data": _user_payload(user),
+        "token": access_token,
+    })
+
+    # bcrypt maliyeti değiştiyse hash'i şeffaf şekilde güncelle
+    if new_hash:
+        await db.run(_update_password_hash, user.id, new_hash)
+
+    return response
 
 
 # ME — Mevcut kullanıcı bilgilerini getir
 @router.get("/me", status_code=200, response_model=AuthMeResponse)
-def get_me(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_me(current_user: dict = Depends(read_user), db: DBSession = Depends(get_db)):
     # Token'dan gelen user_id ile kullanıcıyı bul
-    user = db.query(User).filter(User.id == current_user["user_id"]).first()
+    user = await db.run(get_user_by_id, current_user["user_id"])
     
     if not user:
         raise HTTPException(
@@ -137,22 +159,12 @@ def get_me(current_user: dict = Depends(get_current_user), db: Session = Depends
             detail={"status": "error", "message": "Kullanıcı bulunamadı."}
         )
 
-    return AuthMeResponse(
-        status="success",
-        data=UserResponse(
-            id=user.id,
-            full_name=user.full_name,
-            email=user.email,
-            phone_number=user.phone_number,
-            user_type=UserType(user.user_type),
-            created_at=user.created_at.isoformat() if user.created_at else None
-        )
-    )
+    return FastJSONResponse({"status": "success", "data": _user_payload(user)})
 
 
 # LOGOUT — JWT stateless; client token'ı siler
 @router.post("/logout", status_code=200, response_model=AuthLogoutResponse)
-def logout(current_user: dict = Depends(get_current_user)):
+async def logout(current_user: dict = Depends(read_user)):
     return AuthLogoutResponse(
         status="success",
         message="Çıkış yapıldı. Lütfen token'ı istemciden silin."
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import text, and_
+from sqlalchemy import func, update, tuple_
 from backend.schemas.donation import (
     DonationCreate,
     DonationUpdate,
@@ -8,156 +13,682 @@ from backend.schemas.donation import (
     DonationListResponse,
     DonationDetailResponse,
     DonationCreateResponse,
-    CategoryListResponse
+    CategoryListResponse,
+    DonationOrder,
+    DonationClusterResponse,
+    DonationBulkResponse,
+    DonationBatchAction,
+    DonationBatchRequest,
+    DonationBatchResponse
 )
 from backend.models.donation import Donation
-from backend.config.database import SessionLocal
-from backend.utils.jwt import get_current_user
-from geoalchemy2.shape import from_shape
-from shapely.geometry import Point
+from backend.config.database import DBSession, get_db
+from backend.utils.jwt import resolve_principal
+from backend.utils.rate_limit import read_ip_limit, read_user, write_user
+from backend.services.donation_service import (
+    DONATION_COLUMNS,
+    NOT_DELETED,
+    NOT_EXPIRED,
+    is_expired,
+    select_donations,
+    get_donation_row,
+    get_donation_rows,
+    get_donations_version,
+    get_donation_updated_at,
+    fetch_all,
+    insert_donations,
+    apply_transition,
+    apply_batch_transition,
+    delete_donations,
+    get_changes,
+    row_to_response,
+    row_to_dict,
+    DONATION_FIELDS,
+    encode_cursor,
+    decode_cursor,
+    decode_page_cursor
+)
+from backend.services.geo_query import (
+    within_radius,
+    distance_to,
+    cluster_cell_size,
+    cluster_query,
+    merge_cluster_rows
+)
+from backend.services.spatial_index import spatial_index
+from backend.services.response_cache import response_cache
+from backend.services.change_feed import change_feed
+from backend.services.donation_events import after_write
+from backend.config.settings import get_settings
+from backend.utils.serialization import FastJSONResponse, dumps, dumps_line, parse_fields
+from backend.utils.http_cache import make_etag, conditional_response, is_not_modified, validator_headers
+from backend.utils.metrics import query_budget
 
 router = APIRouter()
+settings = get_settings()
 
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
 
-# DB Bağımlılığı: Session üret
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-# Helper: Location'ı latitude/longitude olarak döndür
-def get_location_coords(db: Session, donation_id: int):
-    """PostGIS location'ı latitude/longitude olarak döndürür"""
-    result = db.execute(
-        text("""
-            SELECT ST_Y(location) AS latitude, ST_X(location) AS longitude
-            FROM donations WHERE id = :donation_id
-        """),
-        {"donation_id": donation_id}
+CATEGORIES = ["temiz yemek", "atık yemek"]
+CATEGORIES_ETAG = make_etag("categories", *CATEGORIES)
+
+# Rol bazlı kategori zorlaması: bu roller sadece kendi kategorilerini görür
+ROLE_CATEGORY = {
+    "shelter_volunteer": "atık yemek",
+    "recipient": "temiz yemek",
+}
+
+
+# Helper: Kullanıcının görebileceği kategori (rol zorlaması yoksa istenen)
+def _role_category(current_user: dict, category: str | None) -> str | None:
+    return ROLE_CATEGORY.get(current_user.get("user_type")) or category
+
+
+# Helper: UPDATE ... RETURNING ile güncellenmiş satırı koordinatlarıyla döndür
+def _update_returning(db: Session, donation_id: int, values: dict):
+    return db.execute(
+        update(Donation)
+        .where(Donation.id == donation_id, NOT_DELETED)
+        .values(**values)
+        .returning(*DONATION_COLUMNS)
+        .execution_options(synchronize_session=False)
     ).first()
-    if result:
-        return {"latitude": float(result.latitude), "longitude": float(result.longitude)}
-    return {"latitude": 0.0, "longitude": 0.0}
-
-
-# Helper: Donation objesini response formatına çevir
-def donation_to_response(db: Session, donation: Donation) -> DonationResponse:
-    """Donation objesini DonationResponse formatına çevirir"""
-    coords = get_location_coords(db, donation.id)
-    return DonationResponse(
-        id=donation.id,
-        title=donation.title,
-        description=donation.description,
-        category=donation.category,
-        quantity=donation.quantity,
-        is_for_animals=donation.is_for_animals,
-        is_reserved=donation.is_reserved,
-        reserved_by=donation.reserved_by,
-        is_collected=donation.is_collected,
-        latitude=coords["latitude"],
-        longitude=coords["longitude"],
-        created_at=donation.created_at,
-        updated_at=donation.updated_at
-    )
 
 
 # GET /donations — Bağışları listele (query params ile filtreleme)
+# -------------------------
+# limit + cursor ile keyset sayfalama yapılır.
+# order=distance: PostGIS KNN (<->) ile yakından uzağa sıralar (geography GIST indeksi).
+# open_only + konum verildiğinde, bellek içi indeks hazırsa PostgreSQL'e gidilmez.
+# stream=1 veya Accept: application/x-ndjson: sayfalama yapılmaz, tüm sonuç
+# (cursor'dan sonrası) satır satır NDJSON olarak akıtılır.
+# fields=id,latitude,longitude: sadece istenen alanlar döner (harita görünümü).
+# Yanıt pydantic modeli kurulmadan dict + orjson ile üretilir.
 @router.get("/", status_code=200, response_model=DonationListResponse)
-def get_donations(
+@query_budget(3)
+async def get_donations(
+    request: Request,
     category: str | None = Query(None, description="Kategori filtresi"),
     latitude: float | None = Query(None, description="Enlem (yakın bağışlar için)"),
     longitude: float | None = Query(None, description="Boylam (yakın bağışlar için)"),
     radius_km: float | None = Query(None, description="Arama yarıçapı (km)"),
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    order: DonationOrder = Query("id", description="Sıralama: id veya distance"),
+    limit: int = Query(100, ge=1, le=500, description="Sayfa boyutu"),
+    cursor: str | None = Query(None, description="Önceki sayfadan dönen next_cursor"),
+    open_only: bool = Query(False, description="Sadece teslim alınmamış bağışlar"),
+    stream: bool = Query(False, description="NDJSON olarak akıt (sayfalama yok)"),
+    fields: str | None = Query(None, description="Virgülle ayrılmış alanlar, örn. id,latitude,longitude"),
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(read_user)
 ):
+    field_names = parse_fields(fields, DONATION_FIELDS)
+
     # Rol bazlı kategori zorlaması
-    role_category = {
-        "shelter_volunteer": "atık yemek",
-        "recipient": "temiz yemek",
-    }
-    enforced_category = role_category.get(current_user.get("user_type"))
-    if enforced_category:
-        category = enforced_category
-
-    # Konum bazlı filtreleme (latitude, longitude varsa PostGIS kullan)
-    if latitude is not None and longitude is not None:
-        radius_m = (radius_km * 1000) if radius_km else 5000  # Varsayılan 5 km
-        
-        # PostGIS ile yakın bağışları bul (category filtresi ile birlikte)
-        if category:
-            query_text = text("""
-                SELECT id FROM donations
-                WHERE category = :category
-                AND ST_DWithin(
-                    location,
-                    ST_SetSRID(ST_Point(:lng, :lat), 4326),
-                    :radius
-                )
-            """)
-            nearby_ids = db.execute(
-                query_text,
-                {"lng": longitude, "lat": latitude, "radius": radius_m, "category": category}
-            ).fetchall()
-        else:
-            query_text = text("""
-                SELECT id FROM donations
-                WHERE ST_DWithin(
-                    location,
-                    ST_SetSRID(ST_Point(:lng, :lat), 4326),
-                    :radius
-                )
-            """)
-            nearby_ids = db.execute(
-                query_text,
-                {"lng": longitude, "lat": latitude, "radius": radius_m}
-            ).fetchall()
-        
-        nearby_id_list = [row[0] for row in nearby_ids]
-        if not nearby_id_list:
-            return DonationListResponse(data=[], message="Yakın bağış bulunamadı")
-        
-        # ID listesine göre filtrele
-        query = db.query(Donation).filter(Donation.id.in_(nearby_id_list))
-        
-        # Kategori filtresi zaten SQL'de uygulandı, burada tekrar uygulamaya gerek yok
+    category = _role_category(current_user, category)
+
+    nearby = latitude is not None and longitude is not None
+    if order == "distance" and not nearby:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": "Mesafeye göre sıralama için konum gerekli."}
+        )
+    radius_m = ((radius_km * 1000) if radius_km else 5000) if nearby else None  # Varsayılan 5 km
+
+    # Keyset: son görülen sıralama anahtarları, (mesafe, id) veya (id)
+    last = None
+    if cursor:
+        try:
+            last = decode_page_cursor(cursor, 2 if order == "distance" else 1)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail={"status": "error", "message": "Geçersiz sayfa imleci."}
+            )
+
+    streaming = stream or NDJSON_TYPES[0] in request.headers.get("accept", "")
+    use_index = not streaming and open_only and nearby and spatial_index.ready
+
+    # Alan bazlı önbellek (sadece konumlu, ilk sayfa, akış olmayan sorgular):
+    # konum hücre merkezine, yarıçap kovaya yuvarlanır ve sorgu bu değerlerle çalışır.
+    cache_key = None
+    if response_cache is not None and nearby and not cursor and not streaming:
+        cell_i, cell_j, latitude, longitude = response_cache.snap(latitude, longitude)
+        radius_m = response_cache.bucket_radius(radius_m)
+        cache_key = response_cache.make_key(
+            cell_i, cell_j, radius_m, category, order, limit, open_only, field_names
+        )
+
+    # Önbellek kaydı hücre bazlı geçerlidir (yazmalar ilgili hücreleri siler, TTL);
+    # isabette sürüm sorgusu dahil veritabanına gidilmez. Kayıt üretildiği
+    # yanıtın ETag'ini taşır, koşullu GET ona göre cevaplanır.
+    if cache_key is not None:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            etag, body = cached
+            headers = validator_headers(etag) if etag else {}
+            if etag and is_not_modified(request, etag):
+                return Response(status_code=304, headers=headers)
+            return Response(body, media_type="application/json", headers=headers)
+
+    # Koşullu GET: tablo sayacı değişmediyse liste sorgusu hiç çalışmaz.
+    # İndeksten dönen yanıtlarda indeksin kendi sürümü de ETag'e girer
+    # (indeks diğer worker'ların yazmalarını yenilemeyle birlikte görür).
+    headers = {}
+    etag = None
+    if settings.http_validators_enabled:
+        version = await db.run(get_donations_version)
+        if version is not None:
+            etag = make_etag(
+                "donations", version.version, spatial_index.generation if use_index else None,
+                category, latitude, longitude, radius_m, order, limit, cursor, open_only, streaming, field_names
+            )
+            not_modified, headers = conditional_response(request, etag, version.changed_at)
+            if not_modified is not None:
+                return not_modified
+
+    if streaming:
+        query = _donations_query(category, latitude, longitude, radius_m, order, last, open_only)
+        return StreamingResponse(
+            _stream_donations(query, field_names), media_type=NDJSON_TYPES[0], headers=headers
+        )
+
+    # Bir fazla satır çekilir: sonraki sayfa olup olmadığını anlamak için
+    if use_index:
+        # Bellek içi indeks: [(kayıt, mesafe), ...]
+        page = spatial_index.query(
+            latitude, longitude, radius_m,
+            category=category, order=order, after=last, limit=limit + 1
+        )
     else:
-        # Konum filtresi yoksa normal SQLAlchemy query kullan
-        query = db.query(Donation)
-        
-        # Kategori filtresi
-        if category:
-            query = query.filter(Donation.category == category)
-    
-    # Tüm bağışları al
-    donations = query.all()
-    
-    # Response formatına çevir
-    results = [donation_to_response(db, d) for d in donations]
-    
-    return DonationListResponse(
-        data=results,
-        message=f"{len(results)} bağış bulundu"
+        rows = await db.run(
+            _query_donations, category, latitude, longitude, radius_m, order, last, open_only, limit=limit + 1
+        )
+        page = [(row, row.distance_m if nearby else None) for row in rows]
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last_row, last_distance = page[-1]
+        next_cursor = encode_cursor(
+            [last_distance, last_row.id] if order == "distance" else [last_row.id]
+        )
+
+    if nearby and not page:
+        response = FastJSONResponse(
+            {"data": [], "message": "Yakın bağış bulunamadı", "next_cursor": None}, headers=headers
+        )
+    else:
+        # Response formatına çevir
+        results = [row_to_dict(row, distance, field_names) for row, distance in page]
+        response = FastJSONResponse({
+            "data": results,
+            "message": f"{len(results)} bağış bulundu",
+            "next_cursor": next_cursor,
+        }, headers=headers)
+
+    if cache_key is not None:
+        await response_cache.set(cache_key, etag, response.body)
+    return response
+
+
+# Helper: GET /donations için PostGIS sorgusu (limit olmadan)
+def _donations_query(
+    category: str | None,
+    latitude: float | None,
+    longitude: float | None,
+    radius_m: float | None,
+    order: str,
+    last: list | None,
+    open_only: bool
+):
+    # Tüm kolonlar + koordinatlar tek sorguda gelir; süresi dolanlar listelenmez
+    query = select_donations().where(NOT_EXPIRED)
+
+    # Kategori filtresi
+    if category:
+        query = query.where(Donation.category == category)
+
+    # Teslim alınmamış bağışlar
+    if open_only:
+        query = query.where(Donation.is_collected.isnot(True))
+
+    # Konum bazlı filtreleme (metre cinsinden, geography indeksi ile)
+    if radius_m is not None:
+        distance = distance_to(latitude, longitude)
+        query = query.add_columns(distance.label("distance_m")).where(
+            within_radius(latitude, longitude, radius_m)
+        )
+
+    # Sıralama anahtarı: (mesafe, id) veya (id)
+    if order == "distance":
+        sort_keys = [distance, Donation.id]
+    else:
+        sort_keys = [Donation.id]
+
+    if last is not None:
+        query = query.where(tuple_(*sort_keys) > tuple_(*last))
+
+    return query.order_by(*sort_keys)
+
+
+def _query_donations(db: Session, *filters, limit: int):
+    return db.execute(_donations_query(*filters).limit(limit)).all()
+
+
+# Helper: Sorgu sonucunu NDJSON olarak akıt
+# -------------------------
+# Yanıt gövdesi handler döndükten sonra gönderildiği için istek oturumu
+# (get_db) kullanılamaz; akış kendi oturumunu açar ve bitince kapatır.
+# Bellekte aynı anda en fazla STREAM_BATCH_SIZE satır tutulur.
+async def _stream_donations(query, fields: tuple | None = None):
+    db = DBSession()
+    try:
+        async for rows in db.stream(query, settings.stream_batch_size):
+            yield b"".join(dumps_line(row_to_dict(row, fields=fields)) for row in rows)
+    finally:
+        await db.close()
+
+
+# Helper: "min_lng,min_lat,max_lng,max_lat" -> tuple; geçersizse 400
+def _parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    try:
+        bounds = tuple(float(part) for part in bbox.split(","))
+    except ValueError:
+        bounds = ()
+    if len(bounds) != 4 or bounds[0] >= bounds[2] or bounds[1] >= bounds[3]:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": "bbox formatı: min_lng,min_lat,max_lng,max_lat"}
+        )
+    return bounds
+
+
+# GET /donations/clusters — Harita için sunucu tarafı kümeleme
+# -------------------------
+# bbox: "min_lng,min_lat,max_lng,max_lat"; zoom: harita zoom seviyesi.
+# Görünen alandaki bağış sayısından bağımsız, sabit boyutlu cevap döner.
+@router.get("/clusters", status_code=200, response_model=DonationClusterResponse)
+@query_budget(2)
+async def get_donation_clusters(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    zoom: int = Query(..., ge=0, le=22, description="Harita zoom seviyesi"),
+    category: str | None = Query(None, description="Kategori filtresi"),
+    open_only: bool = Query(False, description="Sadece teslim alınmamış bağışlar"),
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(read_user)
+):
+    bounds = _parse_bbox(bbox)
+
+    # Rol bazlı kategori zorlaması (GET /donations ile aynı)
+    category = _role_category(current_user, category)
+
+    cell = cluster_cell_size(bounds, zoom)
+    query = cluster_query(bounds, cell)
+    if category:
+        query = query.where(Donation.category == category)
+    if open_only:
+        query = query.where(Donation.is_collected.isnot(True))
+
+    clusters = merge_cluster_rows(await db.run(fetch_all, query))
+
+    return DonationClusterResponse(
+        data=clusters,
+        cell_size_deg=cell,
+        message=f"{len(clusters)} küme bulundu"
     )
 
 
+
+
 # GET /donations/categories — Sabit kategori listesi
+# Liste sabit olduğu için ETag içerikten üretilir; veritabanına gidilmez.
 @router.get("/categories", status_code=200, response_model=CategoryListResponse)
-def get_categories():
-    category_list = ["temiz yemek", "atık yemek"]
-    return CategoryListResponse(
-        data=category_list,
-        message=f"{len(category_list)} kategori bulundu"
+async def get_categories(request: Request):
+    not_modified, headers = conditional_response(request, CATEGORIES_ETAG)
+    if not_modified is not None:
+        return not_modified
+    return FastJSONResponse({
+        "data": CATEGORIES,
+        "message": f"{len(CATEGORIES)} kategori bulundu",
+    }, headers=headers)
+
+
+# GET /donations/cache/stats — Alan bazlı yanıt önbelleği sayaçları (bu worker)
+@router.get("/cache/stats", status_code=200)
+async def get_cache_stats(current_user: dict = Depends(read_user)):
+    stats = response_cache.stats() if response_cache is not None else {"backend": None}
+    return FastJSONResponse({"data": stats, "message": "Önbellek istatistikleri"})
+
+
+# Helper: Toplu işlem id'lerini doğrula (sırayı koruyarak tekrarları at)
+def _batch_ids(ids: list[int]) -> list[int]:
+    ids = list(dict.fromkeys(ids))
+    if not ids or len(ids) > settings.batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": f"1 ile {settings.batch_max_ids} arasında id gönderilmeli."}
+        )
+    return ids
+
+
+# Helper: Toplu işlem sonucunu id sırasıyla response formatına çevir
+# -------------------------
+# rows  : {id: satır} başarılı olanlar (delete için satır None)
+# errors: {id: (status_code, mesaj)}
+def _batch_response(ids: list[int], rows: dict, errors: dict, ok_message: str) -> DonationBatchResponse:
+    items = []
+    for donation_id in ids:
+        if donation_id in errors:
+            status_code, message = errors[donation_id]
+            items.append({"id": donation_id, "status": "error", "status_code": status_code, "message": message})
+        else:
+            row = rows.get(donation_id)
+            items.append({
+                "id": donation_id,
+                "status": "ok",
+                "status_code": 200,
+                "message": ok_message,
+                "data": row_to_response(row) if row is not None else None,
+            })
+    succeeded = len(ids) - len(errors)
+    return DonationBatchResponse(
+        data=items,
+        message=f"{succeeded} başarılı, {len(errors)} başarısız"
     )
 
 
+# GET /donations/batch?ids=1,2,3 — Birden çok bağışın detayı (tek sorgu)
+@router.get("/batch", status_code=200, response_model=DonationBatchResponse, dependencies=[Depends(read_ip_limit)])
+@query_budget(1)
+async def get_donations_batch(
+    ids: str = Query(..., description="Virgülle ayrılmış bağış id'leri"),
+    db: DBSession = Depends(get_db)
+):
+    try:
+        id_list = _batch_ids([int(part) for part in ids.split(",") if part.strip()])
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": "ids virgülle ayrılmış tam sayılar olmalı."}
+        )
+
+    rows = await db.run(get_donation_rows, id_list, include_expired=False)
+    errors = {i: (404, "Bağış bulunamadı.") for i in id_list if i not in rows}
+    return _batch_response(id_list, rows, errors, "Bağış detayları")
+
+
+# POST /donations/batch/{reserve,cancel,collect,delete} — Toplu durum değişikliği
+# -------------------------
+# Tekil uçlarla aynı sahiplik/durum kuralları; id sayısından bağımsız olarak
+# en fazla iki SQL ifadesi ve bir commit. Her id için ayrı sonuç döner.
+@router.post("/batch/{action}", status_code=200, response_model=DonationBatchResponse)
+async def batch_donation_action(
+    action: DonationBatchAction,
+    data: DonationBatchRequest,
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
+):
+    ids = _batch_ids(data.ids)
+    user_id = current_user["user_id"]
+
+    if action == "delete":
+        deleted, errors = await db.run(delete_donations, ids, user_id)
+        await after_write(removed=deleted.values())
+        return _batch_response(ids, {}, errors, "Bağış silindi")
+
+    rows, errors = await db.run(apply_batch_transition, action, ids, user_id)
+    await after_write(upserted=rows.values(), event=action)
+    messages = {
+        "reserve": "Bağış rezerve edildi",
+        "cancel": "Rezervasyon iptal edildi",
+        "collect": "Bağış teslim alındı",
+    }
+    return _batch_response(ids, rows, errors, messages[action])
+
+
+# Helper: Akış aboneliğinin alanını doğrula
+# -------------------------
+# return: (enlem, boylam, yarıçap_m); geçersizse ValueError.
+# Yarıçap verilmezse 5 km, en fazla FEED_MAX_RADIUS_M.
+FEED_MAX_RADIUS_M = 100_000
+
+
+def _feed_area(latitude, longitude, radius_km) -> tuple[float, float, float]:
+    latitude = float(latitude)
+    longitude = float(longitude)
+    radius_m = float(radius_km) * 1000 if radius_km else 5000.0
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180 and radius_m > 0):
+        raise ValueError("invalid area")
+    return latitude, longitude, min(radius_m, FEED_MAX_RADIUS_M)
+
+
+def _feed_unavailable():
+    return HTTPException(
+        status_code=503,
+        detail={"status": "error", "message": "Canlı akış şu anda kullanılamıyor."},
+        headers={"Retry-After": "5"},
+    )
+
+
+# WS /donations/feed — Canlı değişiklik akışı (WebSocket)
+# -------------------------
+# Bağlantı: /donations/feed?token=<JWT>&latitude=..&longitude=..&radius_km=..
+# Alandaki create/update/reserve/cancel/collect/delete olayları tek tek JSON
+# mesajı olarak gelir. İstemci {"latitude", "longitude", "radius_km"} göndererek
+# alanı değiştirebilir. {"type": "resync"} gelirse olay kaçırılmıştır, liste
+# yeniden çekilmelidir.
+@router.websocket("/feed")
+async def donation_feed_ws(
+    websocket: WebSocket,
+    token: str = Query(...),
+    latitude: float = Query(...),
+    longitude: float = Query(...),
+    radius_km: float | None = Query(None)
+):
+    # Kimlik doğrulama için kısa ömürlü oturum; bağlantı boyunca DB bağlantısı tutulmaz
+    db = DBSession()
+    try:
+        current_user = await resolve_principal(token, db)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    finally:
+        await db.close()
+
+    try:
+        area = _feed_area(latitude, longitude, radius_km)
+    except ValueError:
+        await websocket.close(code=1003)
+        return
+
+    subscription = None
+    if change_feed.backend != "off":
+        subscription = change_feed.subscribe(*area, _role_category(current_user, None))
+    if subscription is None:
+        await websocket.close(code=1013)
+        return
+
+    await websocket.accept()
+    sender = asyncio.create_task(_send_feed_events(websocket, subscription))
+    receiver = asyncio.create_task(_receive_feed_area(websocket, subscription))
+    try:
+        done, pending = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.exception()
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+async def _send_feed_events(websocket: WebSocket, subscription):
+    while True:
+        event = await subscription.queue.get()
+        await websocket.send_text(dumps(event).decode())
+
+
+# Metin veya ikili çerçeve (UTF-8 JSON) kabul edilir; bozuk mesaj bağlantıyı kapatmaz
+async def _receive_feed_area(websocket: WebSocket, subscription):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        payload = message.get("text")
+        if payload is None:
+            payload = message.get("bytes") or b""
+        try:
+            area = json.loads(payload)
+            subscription.set_area(*_feed_area(
+                area.get("latitude"), area.get("longitude"), area.get("radius_km")
+            ))
+        except (AttributeError, TypeError, ValueError):
+            try:
+                await websocket.send_text('{"type":"error","message":"Geçersiz alan."}')
+            except WebSocketDisconnect:
+                return
+
+
+# GET /donations/feed/sse — Canlı değişiklik akışı (Server-Sent Events)
+# -------------------------
+# WebSocket ile aynı olaylar; "event: <tür>" + "data: <JSON>" olarak gelir.
+# Olay yoksa CHANGE_FEED_KEEPALIVE_SECONDS'ta bir yorum satırı gönderilir.
+@router.get("/feed/sse", status_code=200)
+async def donation_feed_sse(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float | None = Query(None, gt=0),
+    current_user: dict = Depends(read_user)
+):
+    if change_feed.backend == "off" or change_feed.full:
+        raise _feed_unavailable()
+    return StreamingResponse(
+        _sse_events(_feed_area(latitude, longitude, radius_km), _role_category(current_user, None)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Abonelik generator içinde açılır: istemci akış başlamadan koparsa generator
+# hiç çalışmaz ve abonelik de oluşmaz; oluştuysa finally her durumda kapatır.
+async def _sse_events(area: tuple, category: str | None):
+    subscription = change_feed.subscribe(*area, category)
+    if subscription is None:
+        yield b"event: error\ndata: " + dumps({"type": "error", "message": "Canlı akış şu anda kullanılamıyor."}) + b"\n\n"
+        return
+    try:
+        yield b": connected\n\n"
+        while True:
+            event = await subscription.next(settings.change_feed_keepalive_seconds)
+            if event is None:
+                yield b": ping\n\n"
+                continue
+            yield b"event: " + event["type"].encode() + b"\ndata: " + dumps(event) + b"\n\n"
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+# GET /donations/changes?since=<token>&bbox=... — Delta senkron
+# -------------------------
+# since yoksa alandaki açık bağışların tam listesi, varsa token'dan sonra
+# değişenler döner. Değişiklik artık istemcide görünmemesi gereken bir satırsa
+# (silinmiş, teslim alınmış, süresi dolmuş, kategorisi rol kategorisinden
+# değişmiş) tombstone olarak gelir. Kategori filtresi SQL'dedir; başka
+# kategorideki satırların id'leri dönmez.
+# Sıralama (updated_at, id) keyset'i ile yapılır; son saniyelerdeki değişiklikler
+# (sync_safety_seconds) henüz commit olmamış yazmalarla sıra karışmasın diye
+# bir sonraki senkrona bırakılır. has_more ise aynı token ile tekrar çağrılmalı.
+@router.get("/changes", status_code=200)
+@query_budget(2)
+async def get_donation_changes(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    since: str | None = Query(None, description="Önceki senkrondan dönen next_token"),
+    limit: int = Query(500, ge=1, le=2000, description="Sayfa başına en fazla değişiklik"),
+    category: str | None = Query(None, description="Kategori filtresi"),
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(read_user)
+):
+    bounds = _parse_bbox(bbox)
+    category = _role_category(current_user, category)
+
+    after = None
+    if since:
+        try:
+            updated_at, donation_id = decode_cursor(since, 2)
+            updated_at = datetime.fromisoformat(updated_at)
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            after = (updated_at, int(donation_id))
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=400,
+                detail={"status": "error", "message": "Geçersiz senkron token'ı."}
+            )
+
+    # Arşivlenen satırlar için tombstone kalmaz: token arşiv süresinden eskiyse
+    # istemci tam senkron yapmalı
+    now = datetime.now(timezone.utc)
+    retention = timedelta(hours=settings.archive_retention_hours)
+    if after is not None and settings.archive_enabled and after[0] < now - retention:
+        raise HTTPException(
+            status_code=410,
+            detail={"status": "error", "message": "Senkron token'ı çok eski; since olmadan tam senkron yapın."}
+        )
+
+    rows = await db.run(get_changes, bounds, after, settings.sync_safety_seconds, limit + 1, category)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    changes = []
+    tombstones = []
+    for row in rows:
+        if row.deleted_at is not None:
+            reason = "deleted"
+        elif row.is_collected:
+            reason = "collected"
+        elif is_expired(row, now):
+            reason = "expired"
+        elif category and row.category != category:
+            # Sadece previous_category eşleşen satırlar (kategorisi değişmiş)
+            reason = "hidden"
+        else:
+            changes.append(row_to_dict(row))
+            continue
+        # İlk senkronda istemcide silinecek bir şey yok
+        if after is not None:
+            tombstones.append({"id": row.id, "reason": reason, "updated_at": row.updated_at})
+
+    next_token = encode_cursor([rows[-1].updated_at.isoformat(), rows[-1].id]) if rows else since
+    return FastJSONResponse({
+        "data": changes,
+        "deleted": tombstones,
+        "next_token": next_token,
+        "has_more": has_more,
+        "message": f"{len(changes)} değişiklik, {len(tombstones)} silinen",
+    })
+
+
 # GET /donations/:id — Tekil bağış detayı
-@router.get("/{donation_id}", status_code=200, response_model=DonationDetailResponse)
-def get_donation_by_id(donation_id: int, db: Session = Depends(get_db)):
-    donation = db.query(Donation).filter(Donation.id == donation_id).first()
+# ETag/Last-Modified satırın updated_at değerinden gelir; önce sadece o kolon okunur.
+@router.get("/{donation_id}", status_code=200, response_model=DonationDetailResponse, dependencies=[Depends(read_ip_limit)])
+@query_budget(2)
+async def get_donation_by_id(
+    request: Request,
+    donation_id: int,
+    fields: str | None = Query(None, description="Virgülle ayrılmış alanlar"),
+    db: DBSession = Depends(get_db)
+):
+    field_names = parse_fields(fields, DONATION_FIELDS)
+
+    headers = {}
+    if settings.http_validators_enabled:
+        stamp = await db.run(get_donation_updated_at, donation_id)
+        if stamp is not None:
+            etag = make_etag("donation", donation_id, stamp.updated_at, field_names)
+            not_modified, headers = conditional_response(request, etag, stamp.updated_at)
+            if not_modified is not None:
+                return not_modified
+
+    donation = await db.run(get_donation_row, donation_id, include_expired=False)
     
     if not donation:
         raise HTTPException(
@@ -165,56 +696,163 @@ def get_donation_by_id(donation_id: int, db: Session = Depends(get_db)):
             detail={"status": "error", "message": "Bağış bulunamadı."}
         )
     
-    return DonationDetailResponse(
-        data=donation_to_response(db, donation),
-        message="Bağış detayları"
-    )
+    return FastJSONResponse({
+        "data": row_to_dict(donation, fields=field_names),
+        "message": "Bağış detayları",
+    }, headers=headers)
 
 
 # POST /donations — Yeni bağış oluştur (Bearer token gerekli, donor olmalı)
 @router.post("/", status_code=201, response_model=DonationCreateResponse)
-def create_donation(
+@query_budget(3)
+async def create_donation(
     data: DonationCreate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
 ):
     # Kullanıcı tipi kontrolü (opsiyonel - sadece donor kontrolü yapılabilir)
     # Şu an herkes bağış oluşturabilir, gerekirse kontrol eklenebilir
-    
-    # Kullanıcının gönderdiği longitude ve latitude'i Point objesine çevir
-    point = from_shape(Point(data.longitude, data.latitude), srid=4326)
-    
-    # Donation nesnesini oluştur
-    donation = Donation(
-        donor_id=current_user["user_id"],
-        title=data.title,
-        description=data.description,
-        category=data.category,
-        quantity=data.quantity,
-        is_for_animals=data.is_for_animals,
-        location=point
-    )
-    
-    # DB'ye ekle ve commit et
-    db.add(donation)
-    db.commit()
-    db.refresh(donation)
+    donation = await db.run(_create_donation, data, current_user["user_id"])
+    await after_write(upserted=[donation], event="create")
     
     return DonationCreateResponse(
-        data=donation_to_response(db, donation),
+        data=row_to_response(donation),
         message="Bağış başarıyla oluşturuldu"
     )
 
 
+# Helper: Toplu ekleme gövdesini boyut sınırıyla oku
+# -------------------------
+# Gövde BULK_MAX_BYTES'a kadar belleğe alınır, aşılırsa 413 (Content-Length
+# varsa okumadan önce). Veritabanı bağlantısı gövde tamamen okunup doğrulandıktan
+# sonra alınır: yavaş yükleyen istemci bağlantı ve satır kilidi tutmaz.
+async def _read_bulk_body(request: Request) -> bytes:
+    too_large = HTTPException(
+        status_code=413,
+        detail={"status": "error", "message": f"Gövde en fazla {settings.bulk_max_bytes} bayt olabilir."}
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.bulk_max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.bulk_max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+# Helper: Toplu ekleme gövdesini satırlara ayır
+# -------------------------
+# NDJSON gövdesi satır satır, diğer içerik tipleri JSON dizisi olarak ayrıştırılır.
+# yield: (satır_no, nesne, hata) — ayrıştırılamayan satırda nesne None'dır.
+def _iter_bulk_items(body: bytes, content_type: str):
+    if content_type in NDJSON_TYPES:
+        index = 0
+        for line in body.split(b"\n"):
+            if line.strip():
+                yield (index, *_parse_ndjson_line(line))
+                index += 1
+        return
+
+    try:
+        items = json.loads(body)
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": "Gövde bir JSON dizisi veya NDJSON olmalı."}
+        )
+    for index, item in enumerate(items):
+        yield index, item, None
+
+
+def _parse_ndjson_line(line: bytes):
+    try:
+        return json.loads(line), None
+    except ValueError as exc:
+        return None, {"loc": [], "msg": f"Geçersiz JSON: {exc}"}
+
+
+# POST /donations/bulk — Toplu bağış ekleme (JSON dizisi veya NDJSON)
+# -------------------------
+# Önce gövdenin tamamı okunur ve her satır DonationCreate ile doğrulanır;
+# sonra geçerli satırlar BULK_BATCH_SIZE'lık gruplar halinde tek INSERT ile
+# eklenir. Tüm gruplar tek transaction'dadır, en sonda bir kez commit edilir.
+# Geçersiz satırlar eklenmez, hataları satır numarasıyla döner.
+@router.post("/bulk", status_code=201, response_model=DonationBulkResponse)
+async def bulk_create_donations(
+    request: Request,
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
+):
+    user_id = current_user["user_id"]
+    errors = []
+    valid = []
+
+    body = await _read_bulk_body(request)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    for index, item, error in _iter_bulk_items(body, content_type):
+        if index >= settings.bulk_max_rows:
+            raise HTTPException(
+                status_code=413,
+                detail={"status": "error", "message": f"En fazla {settings.bulk_max_rows} satır gönderilebilir."}
+            )
+        if error is not None:
+            errors.append({"index": index, "errors": [error]})
+            continue
+        try:
+            valid.append(DonationCreate.model_validate(item))
+        except ValidationError as exc:
+            errors.append({
+                "index": index,
+                "errors": [{"loc": list(e["loc"]), "msg": e["msg"]} for e in exc.errors()]
+            })
+
+    inserted_rows = []
+    for start in range(0, len(valid), settings.bulk_batch_size):
+        inserted_rows += await db.run(insert_donations, valid[start:start + settings.bulk_batch_size], user_id)
+    if inserted_rows:
+        await db.commit()
+
+    ids = [row.id for row in inserted_rows]
+    await after_write(upserted=inserted_rows, event="create")
+
+    return DonationBulkResponse(
+        data={"inserted": len(ids), "ids": ids, "errors": errors},
+        message=f"{len(ids)} bağış eklendi, {len(errors)} satır hatalı"
+    )
+
+
+# Bağışı ekle ve commit et
+# Konum PostGIS tarafında ST_MakePoint ile oluşur (toplu ekleme ile aynı INSERT ... RETURNING)
+def _create_donation(db: Session, data: DonationCreate, user_id: int):
+    donation = insert_donations(db, [data], user_id)[0]
+    db.commit()
+    return donation
+
+
 # PATCH /donations/:id — Bağışı güncelle (opsiyonel)
 @router.patch("/{donation_id}", status_code=200, response_model=DonationDetailResponse)
-def update_donation(
+async def update_donation(
     donation_id: int,
     data: DonationUpdate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
 ):
-    donation = db.query(Donation).filter(Donation.id == donation_id).first()
+    donation = await db.run(_update_donation, donation_id, data, current_user["user_id"])
+    await after_write(upserted=[donation], event="update")
+    
+    return DonationDetailResponse(
+        data=row_to_response(donation),
+        message="Bağış başarıyla güncellendi"
+    )
+
+
+# Sahiplik kontrolü + güncelleme
+def _update_donation(db: Session, donation_id: int, data: DonationUpdate, user_id: int):
+    donation = get_donation_row(db, donation_id)
     
     if not donation:
         raise HTTPException(
@@ -223,114 +861,87 @@ def update_donation(
         )
     
     # Sadece bağışı oluşturan kullanıcı güncelleyebilir
-    if donation.donor_id != current_user["user_id"]:
+    if donation.donor_id != user_id:
         raise HTTPException(
             status_code=403,
             detail={"status": "error", "message": "Bu bağışı sadece oluşturan kullanıcı güncelleyebilir."}
         )
     
-    # Güncelleme alanları
+    # Güncelleme alanları (UPDATE ... RETURNING ile güncel satır tek seferde döner)
     update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(donation, field, value)
-    
-    db.commit()
-    db.refresh(donation)
-    
-    return DonationDetailResponse(
-        data=donation_to_response(db, donation),
-        message="Bağış başarıyla güncellendi"
-    )
+    if update_data:
+        donation = _update_returning(db, donation_id, update_data)
+        db.commit()
+    return donation
 
 
 # POST /donations/:id/reserve — Bağışı rezerve et
 @router.post("/{donation_id}/reserve", status_code=200, response_model=DonationDetailResponse)
-def reserve_donation(
+@query_budget(4)
+async def reserve_donation(
     donation_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
 ):
-    donation = db.query(Donation).filter(Donation.id == donation_id).first()
-
-    if not donation:
-        raise HTTPException(
-            status_code=404,
-            detail={"status": "error", "message": "Bağış bulunamadı."}
-        )
-
-    if donation.is_collected:
-        raise HTTPException(
-            status_code=400,
-            detail={"status": "error", "message": "Bağış zaten teslim alınmış."}
-        )
-
-    # Başkası tarafından rezerve ise reddet
-    if donation.is_reserved and donation.reserved_by and donation.reserved_by != current_user["user_id"]:
-        raise HTTPException(
-            status_code=400,
-            detail={"status": "error", "message": "Bağış başka bir kullanıcı tarafından rezerve edilmiş."}
-        )
-
-    donation.is_reserved = True
-    donation.reserved_by = current_user["user_id"]
-
-    db.commit()
-    db.refresh(donation)
+    donation = await db.run(apply_transition, "reserve", donation_id, current_user["user_id"])
+    await after_write(upserted=[donation], event="reserve")
 
     return DonationDetailResponse(
-        data=donation_to_response(db, donation),
+        data=row_to_response(donation),
         message="Bağış rezerve edildi"
     )
 
 
 # POST /donations/:id/cancel_reservation — Rezervasyon iptal et
 @router.post("/{donation_id}/cancel_reservation", status_code=200, response_model=DonationDetailResponse)
-def cancel_reservation(
+@query_budget(4)
+async def cancel_reservation(
     donation_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
 ):
-    donation = db.query(Donation).filter(Donation.id == donation_id).first()
+    donation = await db.run(apply_transition, "cancel", donation_id, current_user["user_id"])
+    await after_write(upserted=[donation], event="cancel")
 
-    if not donation:
-        raise HTTPException(
-            status_code=404,
-            detail={"status": "error", "message": "Bağış bulunamadı."}
-        )
-
-    if not donation.is_reserved:
-        raise HTTPException(
-            status_code=400,
-            detail={"status": "error", "message": "Bağış rezerve değil."}
-        )
-
-    # Sadece rezervasyonu yapan veya bağışı oluşturan kişi iptal edebilir
-    if donation.reserved_by not in (None, current_user["user_id"]) and donation.donor_id != current_user["user_id"]:
-        raise HTTPException(
-            status_code=403,
-            detail={"status": "error", "message": "Rezervasyonu sadece rezervasyonu yapan veya bağış sahibi iptal edebilir."}
-        )
+    return DonationDetailResponse(
+        data=row_to_response(donation),
+        message="Rezervasyon iptal edildi"
+    )
 
-    donation.is_reserved = False
-    donation.reserved_by = None
 
-    db.commit()
-    db.refresh(donation)
+# POST /donations/:id/collect — Bağışı teslim alındı olarak işaretle
+@router.post("/{donation_id}/collect", status_code=200, response_model=DonationDetailResponse)
+@query_budget(4)
+async def collect_donation(
+    donation_id: int,
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
+):
+    donation = await db.run(apply_transition, "collect", donation_id, current_user["user_id"])
+    await after_write(upserted=[donation], event="collect")
 
     return DonationDetailResponse(
-        data=donation_to_response(db, donation),
-        message="Rezervasyon iptal edildi"
+        data=row_to_response(donation),
+        message="Bağış teslim alındı"
     )
 
 
 # DELETE /donations/:id — Bağışı sil (opsiyonel)
 @router.delete("/{donation_id}", status_code=204)
-def delete_donation(
+async def delete_donation(
     donation_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: DBSession = Depends(get_db),
+    current_user: dict = Depends(write_user)
 ):
-    donation = db.query(Donation).filter(Donation.id == donation_id).first()
+    donation = await db.run(_delete_donation, donation_id, current_user["user_id"])
+    await after_write(removed=[donation])
+    
+    return None
+
+
+# Sahiplik kontrolü + silme
+def _delete_donation(db: Session, donation_id: int, user_id: int):
+    donation = get_donation_row(db, donation_id)
     
     if not donation:
         raise HTTPException(
@@ -339,13 +950,18 @@ def delete_donation(
         )
     
     # Sadece bağışı oluşturan kullanıcı silebilir
-    if donation.donor_id != current_user["user_id"]:
+    if donation.donor_id != user_id:
         raise HTTPException(
             status_code=403,
             detail={"status": "error", "message": "Bu bağışı sadece oluşturan kullanıcı silebilir."}
         )
     
-    db.delete(donation)
+    # Satır kaldırılmaz; deleted_at ile tombstone olarak kalır (delta senkron için)
+    donation = _update_returning(db, donation_id, {"deleted_at": func.now()})
+    if donation is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"status": "error", "message": "Bağış bulunamadı."}
+        )
     db.commit()
-    
-    return None
+    return donation
@@ -1,8 +1,32 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Literal
-from datetime import datetime
+from datetime import date, datetime, time
 
 FoodCategory = Literal["temiz yemek", "atık yemek"]
+DonationOrder = Literal["id", "distance"]
+DonationBatchAction = Literal["reserve", "cancel", "collect", "delete"]
+
+# Son kullanma tarihi girdisi
+# -------------------------
+# Formdan serbest metin gelir: ISO tarih/zaman veya "GG.AA.YYYY".
+# Sadece tarih verilirse o günün sonuna kadar geçerli sayılır; boş metin None.
+def parse_expiration(value):
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            value = datetime.strptime(value, "%d.%m.%Y").date()
+        except ValueError:
+            if len(value) == 10:
+                try:
+                    value = date.fromisoformat(value)
+                except ValueError:
+                    pass
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.max)
+    return value
+
 
 # BAĞIŞ OLUŞTURMA İSTEĞİ (INPUT)
 class DonationCreate(BaseModel):
@@ -13,6 +37,12 @@ class DonationCreate(BaseModel):
     is_for_animals: bool = False      # Hayvanlar için mi?
     latitude: float                    # Konum: enlem
     longitude: float                   # Konum: boylam
+    expiration_date: datetime | None = None  # Son kullanma (ISO veya GG.AA.YYYY)
+
+    @field_validator("expiration_date", mode="before")
+    @classmethod
+    def _parse_expiration(cls, value):
+        return parse_expiration(value)
 
 
 # BAĞIŞ GÜNCELLEME İSTEĞİ (INPUT)
@@ -24,6 +54,12 @@ class DonationUpdate(BaseModel):
     is_for_animals: bool | None = None
     is_reserved: bool | None = None
     is_collected: bool | None = None
+    expiration_date: datetime | None = None
+
+    @field_validator("expiration_date", mode="before")
+    @classmethod
+    def _parse_expiration(cls, value):
+        return parse_expiration(value)
 
 
 # BAĞIŞ DETAYI (OUTPUT)
@@ -39,17 +75,19 @@ class DonationResponse(BaseModel):
     is_collected: bool
     latitude: float
     longitude: float
+    expiration_date: datetime | None = None
     created_at: datetime | None = None
     updated_at: datetime | None = None
+    distance_m: float | None = None   # Sorgu noktasına uzaklık (metre, sunucuda hesaplanır)
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # API Response Formatları
 class DonationListResponse(BaseModel):
     data: list[DonationResponse]
     message: str
+    next_cursor: str | None = None   # Sonraki sayfa için imleç (yoksa son sayfa)
 
 
 class DonationDetailResponse(BaseModel):
@@ -64,4 +102,55 @@ class DonationCreateResponse(BaseModel):
 
 class CategoryListResponse(BaseModel):
       data: list[str]
-      message: str
\ No newline at end of file
+      message: str
+
+
+# Harita kümesi (OUTPUT)
+class DonationCluster(BaseModel):
+    latitude: float                   # Küme merkezi (ortalama konum)
+    longitude: float
+    count: int                        # Hücredeki bağış sayısı
+    categories: dict[str, int]        # Kategori bazında sayılar
+    donation_id: int | None = None    # Hücrede tek bağış varsa id'si
+
+
+class DonationClusterResponse(BaseModel):
+    data: list[DonationCluster]
+    cell_size_deg: float
+    message: str
+
+
+# Toplu ekleme sonucu (OUTPUT)
+class DonationBulkError(BaseModel):
+    index: int                        # Gövdedeki satır sırası (0'dan başlar)
+    errors: list[dict]                # Doğrulama / ayrıştırma hataları
+
+
+class DonationBulkResult(BaseModel):
+    inserted: int
+    ids: list[int]
+    errors: list[DonationBulkError]
+
+
+class DonationBulkResponse(BaseModel):
+    data: DonationBulkResult
+    message: str
+
+
+# Toplu işlem isteği (INPUT)
+class DonationBatchRequest(BaseModel):
+    ids: list[int] = Field(..., min_length=1)   # İşlem yapılacak bağış id'leri
+
+
+# Toplu işlem sonucu (OUTPUT) — her id için ayrı sonuç
+class DonationBatchItem(BaseModel):
+    id: int
+    status: Literal["ok", "error"]
+    status_code: int                  # Tekil uçta dönecek HTTP kodu
+    message: str | None = None
+    data: DonationResponse | None = None
+
+
+class DonationBatchResponse(BaseModel):
+    data: list[DonationBatchItem]
+    message: str
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from enum import Enum
 
 # -------------------------
@@ -47,8 +47,7 @@ class UserResponse(BaseModel):
     user_type: UserType
     created_at: str | None = None
 
-    class Config:
-        from_attributes = True  # ORM modeli Pydantic objesine dönüştürür
+    model_config = ConfigDict(from_attributes=True)  # ORM modeli Pydantic objesine dönüştürür
 
 
 # Auth Response Formatları
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from sqlalchemy.engine import make_url
+from backend.config.settings import get_settings
+from backend.services.spatial_index import haversine_m
+
+logger = logging.getLogger(__name__)
+
+# db/migration_add_change_feed.sql içindeki trigger bu kanala yazar
+FEED_CHANNEL = "donation_changes"
+
+
+# Yazma sonrası yayınlanan olay (trigger'ın ürettiği JSON ile aynı alanlar)
+# -------------------------
+# Olay hafif tutulur (NOTIFY 8000 byte sınırı); istemci ayrıntı için
+# GET /donations/batch?ids=... kullanır.
+def feed_event(event_type: str, row) -> dict:
+    return {
+        "type": event_type,
+        "id": row.id,
+        "latitude": float(row.latitude),
+        "longitude": float(row.longitude),
+        "category": row.category,
+        "is_reserved": row.is_reserved,
+        "is_collected": row.is_collected,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
+
+
+# Tek bir istemcinin aboneliği
+# -------------------------
+# Alan: merkez + yarıçap (metre) ve rolün zorladığı kategori.
+# Kuyruk sınırlıdır: istemci yetişemezse bekleyen olaylar atılır ve yerine tek
+# bir {"type": "resync"} konur; istemci listeyi yeniden çekmelidir. Böylece yavaş
+# bir bağlantı için bellekte en fazla max_pending olay birikir.
+class Subscription:
+    def __init__(self, latitude: float, longitude: float, radius_m: float, category: str | None, max_pending: int):
+        self.category = category
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.set_area(latitude, longitude, radius_m)
+
+    def set_area(self, latitude: float, longitude: float, radius_m: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_m = radius_m
+
+    def matches(self, event: dict) -> bool:
+        if event.get("type") == "resync":
+            return True
+        if self.category and event.get("category") != self.category:
+            return False
+        return haversine_m(self.latitude, self.longitude, event["latitude"], event["longitude"]) <= self.radius_m
+
+    def offer(self, event: dict):
+        if not self.matches(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait({"type": "resync"})
+
+    # Sıradaki olay; timeout içinde olay yoksa None
+    async def next(self, timeout: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# Worker başına olay dağıtıcısı
+# -------------------------
+# backend="postgres": ayrı bir psycopg2 bağlantısı LISTEN yapar (havuzdan
+#   bağlantı tutmaz); tüm worker'lardaki ve veritabanındaki her yazma
+#   trigger üzerinden commit sonrası gelir.
+# backend="local": olaylar bu worker'ın yazma uçlarından publish() ile gelir
+#   (tek worker / migration uygulanmamış kurulumlar için).
+class ChangeFeed:
+    def __init__(self, backend: str, max_subscribers: int, max_pending: int):
+        self.backend = backend
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._subscribers: set[Subscription] = set()
+        self._loop = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def local(self) -> bool:
+        return self.backend == "local"
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    # Yeni abonelik; sınır doluysa None
+    def subscribe(self, latitude: float, longitude: float, radius_m: float, category: str | None):
+        if self.full:
+            return None
+        subscription = Subscription(latitude, longitude, radius_m, category, self.max_pending)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    # Olayı eşleşen abonelere dağıt (event loop içinde çağrılır)
+    def publish(self, event: dict):
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+
+    def _publish_payload(self, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("invalid change feed payload: %r", payload)
+            return
+        self.publish(event)
+
+    async def start(self, database_url: str):
+        if self.backend != "postgres" or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._thread = threading.Thread(target=self._listen, args=(dsn,), name="change-feed", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 5)
+            self._thread = None
+
+    # LISTEN döngüsü (ayrı thread)
+    # -------------------------
+    # Bağlantı koparsa artan beklemeyle yeniden bağlanır; aradaki olaylar
+    # kaçırılmış olabileceği için abonelere resync gönderilir.
+    def _listen(self, dsn: str):
+        import psycopg2
+
+        backoff = 1.0
+        reconnect = False
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {FEED_CHANNEL}")
+                if reconnect:
+                    self._loop.call_soon_threadsafe(self.publish, {"type": "resync"})
+                reconnect = True
+                backoff = 1.0
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._loop.call_soon_threadsafe(self._publish_payload, notify.payload)
+            except Exception:
+                logger.exception("change feed listener failed")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+_settings = get_settings()
+
+# Uygulama genelinde tek dağıtıcı
+change_feed = ChangeFeed(
+    _settings.change_feed_backend,
+    _settings.change_feed_max_subscribers,
+    _settings.change_feed_queue_size,
+)
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from datetime import timedelta
+from sqlalchemy import and_, case, delete, func, insert, or_, select, text, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from backend.config.database import SessionLocal
+from backend.models.donation import Donation
+from backend.models.donation_archive import DonationArchive
+from backend.services.donation_service import DONATION_COLUMNS, NOT_DELETED
+from backend.services.donation_events import after_write, bump_version
+
+logger = logging.getLogger(__name__)
+
+# donations'tan donations_archive'a birebir taşınan kolonlar
+ARCHIVE_COLUMNS = (
+    "id", "donor_id", "reserved_by", "title", "description", "category", "quantity",
+    "is_for_animals", "is_reserved", "is_collected", "location",
+    "expiration_date", "created_at", "updated_at", "deleted_at",
+)
+
+
+# Süresi yeni dolan bağışları işaretle
+# -------------------------
+# Son kullanma tarihinin geçmesi satırı değiştirmez; ETag sayacı, yanıt önbelleği,
+# canlı akış ve delta senkron bunu kendiliğinden görmez. Süresi dolmuş ve o
+# tarihten sonra güncellenmemiş satırların updated_at'i bir kez ileri alınır:
+# after_write sayacı artırır, trigger olay yayınlar, /changes "expired" tombstone döner.
+# (updated_at >= expiration_date olduktan sonra satır tekrar seçilmez.)
+def expire_statement(limit: int):
+    candidates = (
+        select(Donation.id)
+        .where(
+            Donation.expiration_date <= func.now(),
+            Donation.updated_at < Donation.expiration_date,
+            NOT_DELETED,
+            Donation.is_collected.isnot(True),
+        )
+        .order_by(Donation.expiration_date)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Donation)
+        .where(Donation.id.in_(candidates))
+        .values(updated_at=func.now())
+        .returning(*DONATION_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Arşive taşınacak satırlar: retention süresince değişmemiş ve
+# teslim alınmış / silinmiş / süresi dolmuş olanlar
+# -------------------------
+# Kollar kısmi indekslerin koşullarıyla birebir yazılır:
+#   kapanmış ilanlar     -> idx_donations_archivable (updated_at)
+#   süresi dolmuş açıklar -> idx_donations_expiration (expiration_date)
+def archive_candidates(retention: timedelta, limit: int):
+    cutoff = func.now() - retention
+    closed = Donation.is_collected.is_(True) | Donation.deleted_at.isnot(None)
+    expired_open = and_(NOT_DELETED, Donation.is_collected.isnot(True), Donation.expiration_date < cutoff)
+    return (
+        select(Donation.id)
+        .where(
+            Donation.updated_at < cutoff,
+            or_(closed, expired_open),
+        )
+        .order_by(Donation.updated_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+# Tek ifadede taşı: DELETE ... RETURNING sonucu arşive INSERT edilir
+# -------------------------
+# Aynı transaction'da olduğu için satır ya iki tabloda da yoktur ya da
+# sadece birindedir; SKIP LOCKED ile birden çok worker aynı anda süpürebilir.
+def archive_statement(retention: timedelta, limit: int):
+    candidates = archive_candidates(retention, limit).cte("candidates")
+    moved = (
+        delete(Donation)
+        .where(Donation.id == candidates.c.id)
+        .returning(*(Donation.__table__.c[name] for name in ARCHIVE_COLUMNS))
+        .cte("moved")
+    )
+    reason = case(
+        (moved.c.deleted_at.isnot(None), "deleted"),
+        (moved.c.is_collected.is_(True), "collected"),
+        else_="expired",
+    )
+    return insert(DonationArchive).from_select(
+        [*ARCHIVE_COLUMNS, "archive_reason"],
+        select(*(moved.c[name] for name in ARCHIVE_COLUMNS), reason),
+    )
+
+
+# Bu ay ve gelecek ay için arşiv partition'ı (yoksa) oluştur
+def ensure_archive_partitions(db: Session):
+    db.execute(text("SELECT ensure_donations_archive_partition(now())"))
+    db.execute(text("SELECT ensure_donations_archive_partition(now() + interval '1 month')"))
+    db.commit()
+
+
+# Süresi dolan bağışları partiler halinde işaretle
+# -------------------------
+# Her parti ayrı transaction'dır (kilitler kısa tutulur); parti dolu geldikçe devam eder.
+# Bir parti hata verse bile önceki partilerde commit edilmiş satırlar döner:
+# bu satırlar expire_statement ile bir daha seçilmez, after_write kaçırılmamalı.
+def expire_donations(batch_size: int):
+    expired = []
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(expire_statement(batch_size)).all()
+            db.commit()
+            expired.extend(rows)
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        logger.exception("donation expire sweep failed")
+    finally:
+        db.close()
+    return expired
+
+
+# Kapanmış / süresi dolmuş bağışları arşive taşı
+# return: arşive taşınan satır sayısı
+def archive_donations(batch_size: int, retention: timedelta):
+    archived = 0
+    db = SessionLocal()
+    try:
+        ensure_archive_partitions(db)
+        while True:
+            moved = db.execute(archive_statement(retention, batch_size)).rowcount
+            db.commit()
+            archived += moved
+            if moved < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return archived
+
+
+# Periyodik süpürme
+# -------------------------
+# Süresi dolanlar için yazma sonrası işlemler (bellek içi indeks, önbellek,
+# local akış) bu worker'da, arşivlemeden önce yapılır; arşiv adımı hata verse
+# de (ör. migration uygulanmamış) süresi dolan ilanlar canlı görünmeye devam etmez.
+# Diğer worker'lar sayaç ve yenileme ile görür.
+# Sadece arşivleme olduysa da (liste sonucu değişebilir) sayaç artırılır.
+async def archive_donations_periodically(interval: float, batch_size: int, retention_hours: float):
+    retention = timedelta(hours=retention_hours)
+    while True:
+        try:
+            expired = await run_in_threadpool(expire_donations, batch_size)
+            if expired:
+                await after_write(upserted=expired, event="update")
+                logger.info("donation sweep: %d expired", len(expired))
+        except Exception:
+            logger.exception("donation expire sweep failed")
+        try:
+            archived = await run_in_threadpool(archive_donations, batch_size, retention)
+            if archived:
+                await bump_version()
+                logger.info("donation sweep: %d archived", archived)
+        except Exception:
+            logger.exception("donation archive sweep failed")
+        await asyncio.sleep(interval)
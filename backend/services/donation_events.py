@@ -0,0 +1,73 @@
+import logging
+from backend.config.database import DBSession
+from backend.config.settings import get_settings
+from backend.services.donation_service import bump_donations_version
+from backend.services.spatial_index import spatial_index
+from backend.services.response_cache import response_cache
+from backend.services.change_feed import change_feed, feed_event
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+# Yazma sonrası bellek içi indeksi güncelle
+# -------------------------
+# Güncelleme başarısız olursa indeks tutarsız işaretlenir ve okumalar
+# bir sonraki yeniden yüklemeye kadar PostGIS yoluna düşer.
+def index_upsert(row):
+    try:
+        spatial_index.upsert(row)
+    except Exception:
+        spatial_index.mark_inconsistent()
+
+
+def index_remove(donation_id: int):
+    try:
+        spatial_index.remove(donation_id)
+    except Exception:
+        spatial_index.mark_inconsistent()
+
+
+# ETag sayacını ayrı, kısa bir transaction'da artır
+# -------------------------
+# Yazma zaten commit edildiği için hata isteği düşürmez (loglanır). Commit ile
+# artırma arasındaki kısa aralıkta doğrulanan eski ETag bir kez daha 304
+# alabilir; sayaç artınca bir sonraki doğrulama yeni veriyi görür.
+async def bump_version():
+    if not settings.http_validators_enabled:
+        return
+    db = DBSession()
+    try:
+        await db.run(bump_donations_version)
+    except Exception:
+        logger.exception("donations version bump failed")
+    finally:
+        await db.close()
+
+
+# Yazma sonrası türetilmiş durumları güncelle
+# -------------------------
+# upserted: eklenen/güncellenen satırlar, removed: silinen satırlar (konumlarıyla).
+# event: değişiklik akışındaki olay türü (create/update/reserve/cancel/collect/delete).
+# Önce ETag sayacı artırılır, sonra bellek içi indeks güncellenir, alan
+# önbelleğinde sadece bu konumları kapsayan kayıtlar silinir; akış "local"
+# modundaysa olaylar buradan yayınlanır ("postgres" modunda veritabanı trigger'ı yayınlar).
+async def after_write(upserted=(), removed=(), event: str = "update"):
+    upserted = tuple(upserted)
+    removed = tuple(removed)
+    if not upserted and not removed:
+        return
+    await bump_version()
+    for row in upserted:
+        index_upsert(row)
+    for row in removed:
+        index_remove(row.id)
+    if change_feed.local:
+        for row in upserted:
+            change_feed.publish(feed_event(event, row))
+        for row in removed:
+            change_feed.publish(feed_event("delete", row))
+    if response_cache is not None:
+        await response_cache.invalidate_points(
+            (float(row.latitude), float(row.longitude)) for row in (*upserted, *removed)
+        )
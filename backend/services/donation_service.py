@@ -0,0 +1,399 @@
+import base64
+import json
+import math
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select, func, insert, update, tuple_
+from sqlalchemy.orm import Session
+from backend.models.donation import Donation
+from backend.models.table_version import TableVersion
+from backend.schemas.donation import DonationResponse
+
+
+# Liste/detay sorgularında seçilen kolonlar
+# -------------------------
+# Konum ST_Y/ST_X ile aynı sorguda enlem/boylam olarak gelir,
+# böylece satır başına ayrı bir koordinat sorgusu atılmaz.
+DONATION_COLUMNS = (
+    Donation.id,
+    Donation.donor_id,
+    Donation.reserved_by,
+    Donation.title,
+    Donation.description,
+    Donation.category,
+    Donation.quantity,
+    Donation.is_for_animals,
+    Donation.is_reserved,
+    Donation.is_collected,
+    func.ST_Y(Donation.location).label("latitude"),
+    func.ST_X(Donation.location).label("longitude"),
+    Donation.expiration_date,
+    Donation.created_at,
+    Donation.updated_at,
+)
+
+
+# Silinmemiş bağışlar (silme deleted_at doldurur, satır tombstone olarak kalır)
+NOT_DELETED = Donation.deleted_at.is_(None)
+
+# Son kullanma tarihi geçmemiş bağışlar (liste, harita ve rezervasyon için)
+NOT_EXPIRED = or_(Donation.expiration_date.is_(None), Donation.expiration_date > func.now())
+
+
+# Satırın son kullanma tarihi geçmiş mi? (bellekteki/dönen satırlar için)
+def is_expired(row, now: datetime | None = None) -> bool:
+    expiration_date = row.expiration_date
+    if expiration_date is None:
+        return False
+    if expiration_date.tzinfo is None:
+        expiration_date = expiration_date.replace(tzinfo=timezone.utc)
+    return expiration_date <= (now or datetime.now(timezone.utc))
+
+
+# Tüm kolonları + koordinatları seçen temel sorgu (silinenler hariç)
+def select_donations():
+    return select(*DONATION_COLUMNS).where(NOT_DELETED)
+
+
+# Tek bir bağış satırını (koordinatlarıyla) getir
+# include_expired=False: okuma uçları; süresi dolmuş ilan bulunamamış sayılır
+# (yazma yolları sahiplik/durum hatası için süresi dolmuş satırı da okur)
+def get_donation_row(db: Session, donation_id: int, include_expired: bool = True):
+    query = select_donations().where(Donation.id == donation_id)
+    if not include_expired:
+        query = query.where(NOT_EXPIRED)
+    return db.execute(query).first()
+
+
+# Birden çok bağışı tek sorguda getir
+# -------------------------
+# return: {id: satır}; bulunamayan (ve include_expired=False iken süresi dolmuş) id'ler sözlükte yer almaz
+def get_donation_rows(db: Session, ids: list[int], include_expired: bool = True) -> dict:
+    query = select_donations().where(Donation.id.in_(ids))
+    if not include_expired:
+        query = query.where(NOT_EXPIRED)
+    rows = db.execute(query).all()
+    return {row.id: row for row in rows}
+
+
+# donations sayacını artır (yazma commit edildikten sonra, kendi kısa transaction'ında)
+# Satır kilidi sadece bu tek UPDATE boyunca tutulur; yazan transaction'lar
+# sayaç satırında sıraya girmez.
+def bump_donations_version(db: Session):
+    db.execute(
+        update(TableVersion)
+        .where(TableVersion.table_name == Donation.__tablename__)
+        .values(version=TableVersion.version + 1, changed_at=func.clock_timestamp())
+    )
+    db.commit()
+
+
+# donations tablosunun değişiklik sayacı (tek satırlık birincil anahtar okuması)
+# return: (version, changed_at) satırı; migration uygulanmamışsa None
+def get_donations_version(db: Session):
+    return db.execute(
+        select(TableVersion.version, TableVersion.changed_at)
+        .where(TableVersion.table_name == Donation.__tablename__)
+    ).first()
+
+
+# Tek bağışın updated_at değeri (id indeksiyle); bağış yoksa veya süresi dolmuşsa None
+def get_donation_updated_at(db: Session, donation_id: int):
+    return db.execute(
+        select(Donation.updated_at).where(Donation.id == donation_id, NOT_DELETED, NOT_EXPIRED)
+    ).first()
+
+
+# Sorguyu çalıştırıp tüm satırları döndür (DBSession.run ile kullanılır)
+def fetch_all(db: Session, stmt):
+    return db.execute(stmt).all()
+
+
+# Birden çok bağışı tek INSERT ile ekle (commit etmez)
+# -------------------------
+# rows: DonationCreate listesi. Konum PostGIS tarafında ST_MakePoint ile oluşturulur.
+# return: eklenen satırlar (DONATION_COLUMNS)
+def insert_donations(db: Session, rows: list, donor_id: int):
+    values = [
+        {
+            "donor_id": donor_id,
+            "title": row.title,
+            "description": row.description,
+            "category": row.category,
+            "quantity": row.quantity,
+            "is_for_animals": row.is_for_animals,
+            "is_reserved": False,
+            "is_collected": False,
+            "expiration_date": row.expiration_date,
+            "location": func.ST_SetSRID(func.ST_MakePoint(row.longitude, row.latitude), 4326),
+        }
+        for row in rows
+    ]
+    return db.execute(
+        insert(Donation).values(values).returning(*DONATION_COLUMNS)
+    ).all()
+
+
+# Sorgu satırını response formatına çevir
+# distance_m verilmezse satırdaki distance_m kolonu (varsa) kullanılır
+def row_to_response(row, distance_m: float | None = None) -> DonationResponse:
+    """DONATION_COLUMNS ile seçilmiş satırı DonationResponse formatına çevirir"""
+    return DonationResponse(**row_to_dict(row, distance_m))
+
+
+# DonationResponse alan adları (fields= parametresinde izin verilenler)
+DONATION_FIELDS = tuple(DonationResponse.model_fields)
+
+
+# Sorgu satırını doğrudan JSON'a hazır dict'e çevir (hızlı yol)
+# -------------------------
+# Pydantic modeli kurulmaz; alanlar ve biçim DonationResponse ile aynıdır.
+# fields verilirse sadece o alanlar (verilen sırayla) döner.
+def row_to_dict(row, distance_m: float | None = None, fields: tuple | None = None) -> dict:
+    if distance_m is None:
+        distance_m = getattr(row, "distance_m", None)
+    data = {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "category": row.category,
+        "quantity": row.quantity,
+        "is_for_animals": row.is_for_animals,
+        "is_reserved": row.is_reserved,
+        "reserved_by": row.reserved_by,
+        "is_collected": row.is_collected,
+        "latitude": float(row.latitude),
+        "longitude": float(row.longitude),
+        "expiration_date": row.expiration_date,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "distance_m": distance_m,
+    }
+    if fields:
+        return {name: data[name] for name in fields}
+    return data
+
+
+# Opak sayfalama imleci (keyset cursor)
+# -------------------------
+# values: son satırın sıralama anahtarları, örn. [id] veya [mesafe, id]
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+# İmleci çöz; bozuk imleçte ValueError fırlatır
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("invalid cursor")
+    return values
+
+
+# Sayfalama imlecini çöz: sıralama anahtarları sonlu sayı, son eleman (id) tam sayı olmalı
+# (aksi halde keyset karşılaştırması veritabanında / bellek içi indekste patlar)
+def decode_page_cursor(cursor: str, size: int) -> list:
+    values = decode_cursor(cursor, size)
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError("invalid cursor")
+    if not isinstance(values[-1], int):
+        raise ValueError("invalid cursor")
+    return values
+
+
+# Durum geçişleri (reserve / cancel / collect)
+# -------------------------
+# Her geçiş, kuralları WHERE koşulunda taşıyan tek bir
+# UPDATE ... WHERE ... RETURNING ile yapılır; iki kullanıcı aynı ilana aynı
+# anda bassa bile satır kilidi sayesinde sadece biri kazanır.
+# Tekil ve toplu uçlar aynı koşulları kullanır.
+def _reservable_by(user_id: int):
+    return and_(
+        Donation.is_collected.isnot(True),
+        NOT_EXPIRED,
+        or_(
+            Donation.is_reserved.isnot(True),
+            Donation.reserved_by.is_(None),
+            Donation.reserved_by == user_id
+        )
+    )
+
+
+def _cancellable_by(user_id: int):
+    return and_(
+        Donation.is_reserved.is_(True),
+        or_(
+            Donation.reserved_by.is_(None),
+            Donation.reserved_by == user_id,
+            Donation.donor_id == user_id
+        )
+    )
+
+
+def _collectable_by(user_id: int):
+    return and_(
+        Donation.is_collected.isnot(True),
+        or_(Donation.donor_id == user_id, Donation.reserved_by == user_id)
+    )
+
+
+# geçiş adı -> (koşul, yeni değerler)
+TRANSITIONS = {
+    "reserve": (_reservable_by, lambda user_id: {"is_reserved": True, "reserved_by": user_id}),
+    "cancel": (_cancellable_by, lambda user_id: {"is_reserved": False, "reserved_by": None}),
+    "collect": (_collectable_by, lambda user_id: {"is_collected": True}),
+}
+
+
+# Geçiş için UPDATE ifadesi; where_clause tekil (id ==) veya toplu (id IN) olabilir
+def transition_statement(action: str, where_clause, user_id: int):
+    condition, values = TRANSITIONS[action]
+    return (
+        update(Donation)
+        .where(where_clause, NOT_DELETED, condition(user_id))
+        .values(**values(user_id))
+        .returning(*DONATION_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Geçiş neden reddedildi? (row: bağışın güncel hali, yoksa None)
+# -------------------------
+# return: (status_code, mesaj)
+def transition_error(action: str, row, user_id: int) -> tuple[int, str]:
+    if row is None:
+        return 404, "Bağış bulunamadı."
+    if action == "reserve":
+        if row.is_collected:
+            return 400, "Bağış zaten teslim alınmış."
+        if is_expired(row):
+            return 400, "Bağışın son kullanma tarihi geçmiş."
+        return 400, "Bağış başka bir kullanıcı tarafından rezerve edilmiş."
+    if action == "cancel":
+        if not row.is_reserved:
+            return 400, "Bağış rezerve değil."
+        return 403, "Rezervasyonu sadece rezervasyonu yapan veya bağış sahibi iptal edebilir."
+    if row.is_collected:
+        return 400, "Bağış zaten teslim alınmış."
+    return 403, "Bağışı sadece bağış sahibi veya rezervasyonu yapan teslim alabilir."
+
+
+# Tek bağış için geçişi uygula
+# -------------------------
+# Başarılı durumda tek round trip: UPDATE ... RETURNING + commit.
+# Reddedilirse sebebi bulmak için satır bir kez okunur ve HTTPException fırlatılır.
+def apply_transition(db: Session, action: str, donation_id: int, user_id: int):
+    donation = db.execute(
+        transition_statement(action, Donation.id == donation_id, user_id)
+    ).first()
+    if donation is None:
+        db.rollback()
+        status_code, message = transition_error(action, get_donation_row(db, donation_id), user_id)
+        raise HTTPException(
+            status_code=status_code,
+            detail={"status": "error", "message": message}
+        )
+    db.commit()
+    return donation
+
+
+# Toplu işlemlerde reddedilen id'ler için sebepleri bul
+# -------------------------
+# Tek SELECT ... WHERE id IN (...) ile okunur.
+# return: {id: (status_code, mesaj)}
+def _batch_errors(db: Session, action: str, ids: list[int], user_id: int) -> dict:
+    if not ids:
+        return {}
+    rows = get_donation_rows(db, ids)
+    return {donation_id: transition_error(action, rows.get(donation_id), user_id) for donation_id in ids}
+
+
+# Birden çok bağış için geçişi uygula
+# -------------------------
+# Tekil uçla aynı koşullar; id sayısından bağımsız olarak en fazla iki sorgu:
+# UPDATE ... WHERE id IN (...) AND koşul RETURNING, reddedilenler için bir SELECT.
+# Kısmi başarı: koşulu sağlayanlar commit edilir, diğerleri için sebep döner.
+# return: ({id: güncel satır}, {id: (status_code, mesaj)})
+def apply_batch_transition(db: Session, action: str, ids: list[int], user_id: int):
+    updated = {
+        row.id: row
+        for row in db.execute(transition_statement(action, Donation.id.in_(ids), user_id)).all()
+    }
+    errors = _batch_errors(db, action, [i for i in ids if i not in updated], user_id)
+    db.commit()
+    return updated, errors
+
+
+# Silme (deleted_at doldurur) UPDATE ifadesi; sadece bağış sahibinin satırları
+def delete_statement(where_clause, user_id: int):
+    return (
+        update(Donation)
+        .where(where_clause, Donation.donor_id == user_id, NOT_DELETED)
+        .values(deleted_at=func.now())
+        .returning(*DONATION_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Birden çok bağışı sil (sadece bağış sahibi)
+# -------------------------
+# Satırlar kaldırılmaz, deleted_at doldurulur (GET /donations/changes tombstone döner).
+# UPDATE ... WHERE id IN (...) AND donor_id = :user RETURNING + reddedilenler için bir SELECT.
+# return: ({id: silinen satır}, {id: (status_code, mesaj)})
+def delete_donations(db: Session, ids: list[int], user_id: int):
+    deleted = {
+        row.id: row
+        for row in db.execute(delete_statement(Donation.id.in_(ids), user_id)).all()
+    }
+    rows = get_donation_rows(db, [i for i in ids if i not in deleted]) if len(deleted) < len(ids) else {}
+    errors = {
+        donation_id: (403, "Bu bağışı sadece oluşturan kullanıcı silebilir.")
+        if donation_id in rows else (404, "Bağış bulunamadı.")
+        for donation_id in ids if donation_id not in deleted
+    }
+    db.commit()
+    return deleted, errors
+
+
+# Delta senkronizasyon: token'dan sonra değişen satırlar
+# -------------------------
+# (updated_at, id) sırasıyla idx_donations_updated_at üzerinden okunur; maliyet
+# alan büyüklüğüyle değil değişiklik sayısıyla orantılıdır.
+# after  : son görülen (updated_at, id); None ise ilk senkron (sadece aktif satırlar)
+# horizon: son horizon_seconds içinde değişen satırlar bir sonraki senkrona kalır.
+#          updated_at transaction başlangıç zamanıdır; daha uzun süren bir transaction
+#          token'ın gerisinde commit edilip kaçırılmasın diye.
+# Silinen/teslim alınan/süresi dolan satırlar da döner (tombstone), deleted_at kolonuyla birlikte.
+# category: rol kategorisi SQL'de uygulanır; ilk senkronda sadece o kategori,
+#           sonrakilerde ayrıca kategorisi bu kategoriden değişmiş satırlar
+#           (previous_category) döner ki istemci onları tombstone ile silsin.
+#           Diğer kategorilerin id'leri hiç dönmez.
+def changes_query(bbox: tuple, after: tuple | None, horizon_seconds: float, category: str | None = None):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    query = (
+        select(*DONATION_COLUMNS, Donation.deleted_at)
+        .where(
+            Donation.location.op("&&")(func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)),
+            Donation.updated_at <= func.now() - timedelta(seconds=horizon_seconds),
+        )
+    )
+    if after is None:
+        query = query.where(NOT_DELETED, NOT_EXPIRED, Donation.is_collected.isnot(True))
+        if category:
+            query = query.where(Donation.category == category)
+    else:
+        query = query.where(tuple_(Donation.updated_at, Donation.id) > tuple_(*after))
+        if category:
+            query = query.where(or_(Donation.category == category, Donation.previous_category == category))
+    return query.order_by(Donation.updated_at, Donation.id)
+
+
+def get_changes(
+    db: Session, bbox: tuple, after: tuple | None, horizon_seconds: float, limit: int, category: str | None = None
+):
+    return db.execute(changes_query(bbox, after, horizon_seconds, category).limit(limit)).all()
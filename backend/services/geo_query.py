@@ -0,0 +1,170 @@
+import json
+import math
+from sqlalchemy import Float, cast, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.types import UserDefinedType
+from backend.models.donation import Donation
+from backend.services.donation_service import NOT_DELETED, NOT_EXPIRED
+
+
+# PostGIS geography tipi (sadece CAST için)
+# -------------------------
+# location kolonu geometry(Point,4326) olarak saklanır; birimi derecedir.
+# Metre cinsinden yarıçap/mesafe için geography'ye cast edilir.
+class Geography(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "geography"
+
+
+# Konumun geography ifadesi
+# -------------------------
+# db/migration_add_geography_index.sql içindeki idx_donations_location_geog
+# indeksi birebir bu ifade üzerine kuruludur: ((location::geography)).
+# Sorgular indeksi kullanabilsin diye ifade değiştirilmemelidir.
+LOCATION_GEOGRAPHY = cast(Donation.location, Geography())
+
+
+# Enlem/boylamdan geography noktası oluştur
+def geography_point(latitude: float, longitude: float):
+    return cast(
+        func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+        Geography()
+    )
+
+
+# Yarıçap filtresi (metre)
+# -------------------------
+# ST_DWithin(geography, geography, metre) geography GIST indeksini kullanır;
+# use_spheroid=false ile küre üzerinde hesaplanır (<-> ile aynı ölçü).
+def within_radius(latitude: float, longitude: float, radius_m: float):
+    return func.ST_DWithin(
+        LOCATION_GEOGRAPHY,
+        geography_point(latitude, longitude),
+        radius_m,
+        False
+    )
+
+
+# Noktaya uzaklık (metre)
+# -------------------------
+# geography <-> operatörü küre üzerindeki mesafeyi döner ve ORDER BY içinde
+# KNN indeks taramasıyla çalışır; aynı ifade hem sıralama hem distance_m için kullanılır.
+def distance_to(latitude: float, longitude: float):
+    return LOCATION_GEOGRAPHY.op("<->", return_type=Float)(
+        geography_point(latitude, longitude)
+    )
+
+
+# Harita kümeleme (grid)
+# -------------------------
+# Zoom seviyesinde bir harita karosu (256px) CLUSTER_CELLS_PER_TILE x CLUSTER_CELLS_PER_TILE
+# hücreye bölünür. Görünen alan çok büyükse hücre büyütülür; böylece dönen
+# hücre sayısı en fazla CLUSTER_MAX_CELLS olur (payload sabit boyutta kalır).
+CLUSTER_CELLS_PER_TILE = 8
+CLUSTER_MAX_CELLS = 1024
+
+
+# bbox ve zoom için hücre boyutu (derece)
+def cluster_cell_size(bbox: tuple[float, float, float, float], zoom: int) -> float:
+    min_lng, min_lat, max_lng, max_lat = bbox
+    cell = 360.0 / (2 ** zoom) / CLUSTER_CELLS_PER_TILE
+    area = (max_lng - min_lng) * (max_lat - min_lat)
+    return max(cell, math.sqrt(area / CLUSTER_MAX_CELLS))
+
+
+# bbox içindeki bağışları hücre + kategori bazında grupla
+# -------------------------
+# location && ST_MakeEnvelope(...) geometry GIST indeksini kullanır.
+# Her satır: cx, cy, category, count, latitude/longitude (ortalama), sample_id
+def cluster_query(bbox: tuple[float, float, float, float], cell: float):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    lng = func.ST_X(Donation.location)
+    lat = func.ST_Y(Donation.location)
+    cx = func.floor(lng / cell).label("cx")
+    cy = func.floor(lat / cell).label("cy")
+    return (
+        select(
+            cx,
+            cy,
+            Donation.category,
+            func.count().label("count"),
+            func.avg(lat).label("latitude"),
+            func.avg(lng).label("longitude"),
+            func.min(Donation.id).label("sample_id"),
+        )
+        .where(
+            Donation.location.op("&&")(
+                func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+            ),
+            NOT_DELETED,
+            NOT_EXPIRED
+        )
+        .group_by(cx, cy, Donation.category)
+    )
+
+
+# Hücre + kategori satırlarını hücre başına tek kümede birleştir
+# -------------------------
+# return: [{"latitude", "longitude", "count", "categories", "donation_id"}, ...]
+# donation_id yalnızca hücrede tek bağış varsa doldurulur.
+def merge_cluster_rows(rows) -> list[dict]:
+    cells: dict[tuple, dict] = {}
+    for row in rows:
+        count = int(row.count)
+        cell = cells.setdefault((row.cx, row.cy), {
+            "lat_sum": 0.0, "lng_sum": 0.0, "count": 0, "categories": {}, "sample_id": row.sample_id,
+        })
+        cell["lat_sum"] += float(row.latitude) * count
+        cell["lng_sum"] += float(row.longitude) * count
+        cell["count"] += count
+        category = row.category or "diğer"
+        cell["categories"][category] = cell["categories"].get(category, 0) + count
+        cell["sample_id"] = min(cell["sample_id"], row.sample_id)
+    return [
+        {
+            "latitude": cell["lat_sum"] / cell["count"],
+            "longitude": cell["lng_sum"] / cell["count"],
+            "count": cell["count"],
+            "categories": cell["categories"],
+            "donation_id": cell["sample_id"] if cell["count"] == 1 else None,
+        }
+        for cell in cells.values()
+    ]
+
+
+# Sorgu planını getir (EXPLAIN FORMAT JSON)
+# -------------------------
+# stmt parametreleri literal olarak gömülür; plan kontrolleri için kullanılır.
+def explain(db: Session, stmt, analyze: bool = False) -> dict:
+    compiled = stmt.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True}
+    )
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    plan = db.execute(text(f"EXPLAIN ({options}) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+# Plan ağacındaki tüm düğümleri gez
+def iter_plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+# Plan verilen tablo üzerinde sıralı tarama (Seq Scan) yapıyor mu?
+def has_seq_scan(plan: dict, relation: str = "donations") -> bool:
+    return any(
+        node.get("Node Type") == "Seq Scan" and node.get("Relation Name") == relation
+        for node in iter_plan_nodes(plan)
+    )
+
+
+# Plan verilen indeksi kullanıyor mu?
+def uses_index(plan: dict, index_name: str) -> bool:
+    return any(node.get("Index Name") == index_name for node in iter_plan_nodes(plan))
@@ -0,0 +1,197 @@
+import logging
+import math
+import time
+from backend.config.settings import get_settings
+from backend.services.spatial_index import haversine_m
+from backend.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Yarıçap kovaları (metre); istenen yarıçap bir üst kovaya yuvarlanır
+RADIUS_BUCKETS_M = (500, 1000, 2000, 5000, 10000, 20000, 50000)
+RADIUS_STEP_M = 10000  # son kovadan büyük yarıçaplar için
+
+
+# Yerel (process içi) önbellek
+# -------------------------
+# Her worker kendi kopyasını tutar; diğer worker'ların yazmaları bu önbelleği
+# temizlemez (kayıtlar TTL ile eskir).
+class MemoryCacheBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get(self, key: str):
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._cache.set(key, value)
+
+    async def delete_where(self, predicate) -> int:
+        return self._cache.delete_where(predicate)
+
+    async def clear(self):
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# Paylaşılan önbellek (Redis)
+# -------------------------
+# Tüm worker'lar aynı kayıtları görür ve yazmalar her yerde geçersiz kılar.
+# redis paketi opsiyoneldir; sadece bu backend seçilirse gerekir.
+# Anahtarlar ayrıca bir hash'te (anahtar -> bitiş zamanı) listelenir ki hücre
+# bazlı silme KEYS/SCAN gerektirmesin; süresi dolanlar silme sırasında temizlenir.
+class RedisCacheBackend:
+    def __init__(self, url: str, ttl: float, prefix: str = "donations:area:"):
+        import redis.asyncio as redis
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = max(1, int(ttl))
+        self._prefix = prefix
+        self._registry = prefix + "keys"
+
+    async def get(self, key: str):
+        return await self._client.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.set(self._prefix + key, value, ex=self._ttl)
+            pipe.hset(self._registry, key, int(time.time()) + self._ttl)
+            await pipe.execute()
+
+    async def delete_where(self, predicate) -> int:
+        now = time.time()
+        matched = []
+        expired = []
+        for key, expires in (await self._client.hgetall(self._registry)).items():
+            key = key.decode()
+            if int(expires) < now:
+                expired.append(key)
+            elif predicate(key):
+                matched.append(key)
+        if matched or expired:
+            async with self._client.pipeline(transaction=False) as pipe:
+                if matched:
+                    pipe.delete(*(self._prefix + key for key in matched))
+                pipe.hdel(self._registry, *matched, *expired)
+                await pipe.execute()
+        return len(matched)
+
+    async def clear(self):
+        keys = [key.decode() for key in await self._client.hkeys(self._registry)]
+        await self._client.delete(self._registry, *(self._prefix + key for key in keys))
+
+
+# Yakın bağış sorguları için alan bazlı yanıt önbelleği
+# -------------------------
+# Konum cell_deg'lik grid hücresinin merkezine, yarıçap bir üst kovaya
+# yuvarlanır; sorgu bu yuvarlanmış değerlerle çalışır. Böylece GPS titremesiyle
+# farklılaşan istekler aynı anahtara düşer ve önbellekteki yanıt o anahtar için
+# birebir doğrudur.
+# Sonuç kayması: önbellek açıkken yanıt istenen konum/yarıçap için değil,
+# hücre merkezi ve yuvarlanmış yarıçap için üretilir (mesafeler hücre
+# merkezine göredir, yarıçap sınırındaki ilanlar fazladan dönebilir). Bu
+# yüzden varsayılan kapalıdır (RESPONSE_CACHE_ENABLED=1 ile açılır).
+# Anahtar: "hücre_i|hücre_j|yarıçap_m|..." (diğer parametreler sonda).
+# Değer: "<ETag>\n<JSON gövde>"; ETag doğrulayıcılar kapalıysa boştur.
+# Geçerlilik hücre bazlıdır: yazmalar invalidate_points ile sadece o noktayı
+# kapsayan kayıtları siler, diğer worker'ların yazmaları (memory backend) TTL
+# ile eskir. Global sürüm sorgusu yoktur; isabet veritabanına hiç gitmez.
+# Backend hataları isteği düşürmez: okuma ıska sayılır, yazma atlanır.
+class AreaResponseCache:
+    def __init__(self, backend, cell_deg: float):
+        self.backend = backend
+        self.cell_deg = cell_deg
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # Konumu hücre merkezine yuvarla; return: (hücre_i, hücre_j, enlem, boylam)
+    def snap(self, latitude: float, longitude: float):
+        i = math.floor(latitude / self.cell_deg)
+        j = math.floor(longitude / self.cell_deg)
+        return i, j, (i + 0.5) * self.cell_deg, (j + 0.5) * self.cell_deg
+
+    @staticmethod
+    def bucket_radius(radius_m: float) -> float:
+        for bucket in RADIUS_BUCKETS_M:
+            if radius_m <= bucket:
+                return float(bucket)
+        return float(math.ceil(radius_m / RADIUS_STEP_M) * RADIUS_STEP_M)
+
+    @staticmethod
+    def make_key(cell_i: int, cell_j: int, radius_m: float, *params) -> str:
+        return "|".join(str(part) for part in (cell_i, cell_j, int(radius_m), *params))
+
+    # return: (ETag veya None, gövde) ya da ıska ise None
+    async def get(self, key: str) -> tuple[str | None, bytes] | None:
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            logger.exception("response cache read failed")
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, _, body = value.partition(b"\n")
+        return etag.decode() or None, body
+
+    async def set(self, key: str, etag: str | None, body: bytes):
+        try:
+            await self.backend.set(key, (etag or "").encode() + b"\n" + body)
+        except Exception:
+            logger.exception("response cache write failed")
+
+    # Noktayı kapsayan tüm kayıtları sil
+    # -------------------------
+    # points: [(enlem, boylam), ...] — eklenen/güncellenen/silinen bağışların konumları.
+    # Kayıt, hücre merkezine uzaklığı yarıçapından küçükse (sorgu çemberi noktayı içeriyorsa) silinir.
+    async def invalidate_points(self, points) -> int:
+        points = list(points)
+        if not points:
+            return 0
+
+        def covers(key: str) -> bool:
+            cell_i, cell_j, radius_m = key.split("|", 3)[:3]
+            center_lat = (int(cell_i) + 0.5) * self.cell_deg
+            center_lng = (int(cell_j) + 0.5) * self.cell_deg
+            return any(
+                haversine_m(center_lat, center_lng, lat, lng) <= float(radius_m) + 1.0
+                for lat, lng in points
+            )
+
+        try:
+            removed = await self.backend.delete_where(covers)
+        except Exception:
+            logger.exception("response cache invalidation failed")
+            return 0
+        self.invalidations += removed
+        return removed
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else None,
+            "invalidated": self.invalidations,
+        }
+
+
+# Ayarlara göre önbelleği oluştur (kapalıysa None)
+def build_response_cache():
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return None
+    if settings.response_cache_backend == "redis":
+        backend = RedisCacheBackend(settings.response_cache_url, settings.response_cache_ttl)
+    else:
+        backend = MemoryCacheBackend(settings.response_cache_size, settings.response_cache_ttl)
+    return AreaResponseCache(backend, settings.response_cache_cell_deg)
+
+
+# Uygulama genelinde tek önbellek örneği
+response_cache = build_response_cache()
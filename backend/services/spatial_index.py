@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import math
+import threading
+from datetime import datetime, timezone
+from starlette.concurrency import run_in_threadpool
+from backend.config.database import SessionLocal
+from backend.config.settings import get_settings
+from backend.models.donation import Donation
+from backend.services.donation_service import NOT_EXPIRED, is_expired, select_donations
+
+logger = logging.getLogger(__name__)
+
+# PostGIS'in küre hesaplarında kullandığı ortalama dünya yarıçapı (metre)
+EARTH_RADIUS_M = 6371008.7714
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+# Açık bir bağışın bellekteki kaydı
+# -------------------------
+# __slots__ ile satır başına dict tutulmaz; alanlar DONATION_COLUMNS ile aynıdır
+# ve row_to_response() doğrudan bu kayıtla çalışır.
+class DonationRecord:
+    __slots__ = (
+        "id", "donor_id", "reserved_by", "title", "description", "category",
+        "quantity", "is_for_animals", "is_reserved", "is_collected",
+        "latitude", "longitude", "expiration_date", "created_at", "updated_at",
+    )
+
+    def __init__(self, row):
+        for name in self.__slots__:
+            setattr(self, name, getattr(row, name))
+        self.latitude = float(self.latitude)
+        self.longitude = float(self.longitude)
+
+
+# İki nokta arası küre üzerindeki mesafe (metre, haversine)
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+# Teslim alınmamış bağışların grid tabanlı mekânsal indeksi
+# -------------------------
+# Hücre anahtarı (floor(lat/cell), floor(lng/cell)); her hücre bağış id kümesi tutar.
+# Açılışta veritabanından doldurulur (warm), yazma uçları upsert/remove ile
+# artımlı günceller. Soğuk veya tutarsız işaretliyken ready=False döner ve
+# sorgular PostGIS yoluna düşer.
+class SpatialIndex:
+    def __init__(self, cell_deg: float):
+        self.cell_deg = cell_deg
+        self._lock = threading.RLock()
+        self._records: dict[int, DonationRecord] = {}
+        self._cells: dict[tuple[int, int], set[int]] = {}
+        self._ready = False
+        self._pending = None  # warm sırasında gelen yazmalar
+        self.generation = 0   # İçerik her değiştiğinde artar (ETag için)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return (math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg))
+
+    # Kayıt ekle / güncelle (kilit tutulurken çağrılır)
+    def _put(self, records: dict, cells: dict, record: DonationRecord):
+        self._drop(records, cells, record.id)
+        records[record.id] = record
+        cells.setdefault(self._cell(record.latitude, record.longitude), set()).add(record.id)
+
+    # Kaydı çıkar (kilit tutulurken çağrılır)
+    def _drop(self, records: dict, cells: dict, donation_id: int):
+        old = records.pop(donation_id, None)
+        if old is None:
+            return
+        key = self._cell(old.latitude, old.longitude)
+        members = cells.get(key)
+        if members is not None:
+            members.discard(donation_id)
+            if not members:
+                del cells[key]
+
+    # Satırla aynı veya daha yeni bir kayıt zaten var mı?
+    @staticmethod
+    def _is_stale(records: dict, row) -> bool:
+        current = records.get(row.id)
+        return (
+            current is not None
+            and current.updated_at is not None
+            and row.updated_at is not None
+            and current.updated_at > row.updated_at
+        )
+
+    # Veritabanı satırlarından indeksi baştan kur
+    def load(self, rows):
+        records: dict[int, DonationRecord] = {}
+        cells: dict[tuple[int, int], set[int]] = {}
+        for row in rows:
+            self._put(records, cells, DonationRecord(row))
+        with self._lock:
+            # Yükleme sırasında gelen yazmaları yeni yapıya uygula
+            for op, payload in self._pending or ():
+                if op == "upsert":
+                    if not self._is_stale(records, payload):
+                        self._put(records, cells, DonationRecord(payload))
+                else:
+                    self._drop(records, cells, payload)
+            self._records = records
+            self._cells = cells
+            self._pending = None
+            self._ready = True
+            self.generation += 1
+
+    # Yüklemeye başlarken yazmaları biriktirmeye başla
+    def begin_load(self):
+        with self._lock:
+            self._pending = []
+
+    # Yükleme başarısız: biriken yazmaları bırak (liste sınırsız büyümesin) ve
+    # indeksi yeniden yüklenene kadar kullanma
+    def abort_load(self):
+        with self._lock:
+            self._pending = None
+            self._ready = False
+
+    # Soğuk indekse (hiç yüklenmemiş, yükleme de sürmüyor) yazma uygulanmaz
+    def _accepts_writes(self) -> bool:
+        return self._ready or self._pending is not None
+
+    # Bağış satırını ekle/güncelle; teslim alınmış veya süresi dolmuşsa indeksten çıkar
+    def upsert(self, row):
+        if row.is_collected or is_expired(row):
+            self.remove(row.id)
+            return
+        with self._lock:
+            if not self._accepts_writes():
+                return
+            if self._pending is not None:
+                self._pending.append(("upsert", row))
+            if not self._is_stale(self._records, row):
+                self._put(self._records, self._cells, DonationRecord(row))
+                self.generation += 1
+
+    def remove(self, donation_id: int):
+        with self._lock:
+            if not self._accepts_writes():
+                return
+            if self._pending is not None:
+                self._pending.append(("remove", donation_id))
+            self._drop(self._records, self._cells, donation_id)
+            self.generation += 1
+
+    # İndeks veritabanıyla tutarsız: yeniden yüklenene kadar kullanma
+    def mark_inconsistent(self):
+        with self._lock:
+            self._ready = False
+
+    # Yarıçap içindeki açık bağışlar
+    # -------------------------
+    # return: [(kayıt, mesafe_m), ...]; order="distance" ise (mesafe, id), değilse id sırasında.
+    # after: keyset imlecinden gelen son anahtarlar; en fazla limit kayıt döner.
+    def query(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        category: str | None = None,
+        order: str = "id",
+        after: list | None = None,
+        limit: int | None = None,
+    ):
+        dlat = radius_m / METERS_PER_DEGREE
+        coslat = max(math.cos(math.radians(latitude)), 1e-6)
+        dlng = min(radius_m / (METERS_PER_DEGREE * coslat), 180.0)
+        min_cell = self._cell(latitude - dlat, longitude - dlng)
+        max_cell = self._cell(latitude + dlat, longitude + dlng)
+
+        # Süresi yükleme/upsert'ten sonra dolan kayıtlar sorgu anında elenir
+        now = datetime.now(timezone.utc)
+        hits = []
+        with self._lock:
+            span = (max_cell[0] - min_cell[0] + 1) * (max_cell[1] - min_cell[1] + 1)
+            if span <= len(self._cells):
+                keys = (
+                    (i, j)
+                    for i in range(min_cell[0], max_cell[0] + 1)
+                    for j in range(min_cell[1], max_cell[1] + 1)
+                )
+            else:
+                # Geniş alanlarda boş hücreleri gezmek yerine dolu hücreleri tara
+                keys = [
+                    key for key in self._cells
+                    if min_cell[0] <= key[0] <= max_cell[0] and min_cell[1] <= key[1] <= max_cell[1]
+                ]
+            for key in keys:
+                for donation_id in self._cells.get(key, ()):
+                    record = self._records[donation_id]
+                    if category and record.category != category:
+                        continue
+                    if record.expiration_date is not None and is_expired(record, now):
+                        continue
+                    distance = haversine_m(latitude, longitude, record.latitude, record.longitude)
+                    if distance <= radius_m:
+                        hits.append((record, distance))
+
+        if order == "distance":
+            sort_key = lambda hit: (hit[1], hit[0].id)
+        else:
+            sort_key = lambda hit: (hit[0].id,)
+        if after is not None:
+            last = tuple(after)
+            hits = [hit for hit in hits if sort_key(hit) > last]
+        hits.sort(key=sort_key)
+        return hits[:limit] if limit is not None else hits
+
+
+# Uygulama genelinde tek indeks örneği
+spatial_index = SpatialIndex(get_settings().spatial_index_cell_deg)
+
+
+# İndeksi veritabanındaki açık bağışlarla doldur
+def warm_spatial_index():
+    spatial_index.begin_load()
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select_donations().where(Donation.is_collected.isnot(True), NOT_EXPIRED)
+        ).all()
+        spatial_index.load(rows)
+    except Exception:
+        spatial_index.abort_load()
+        raise
+    finally:
+        db.close()
+
+
+# Periyodik yeniden yükleme
+# -------------------------
+# Her worker kendi indeksini tutar; başka worker'daki yazmalar en geç
+# bu aralıkta yansır (tutarsız işaretlenmiş indeks de böyle toparlanır).
+async def refresh_spatial_index_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(warm_spatial_index)
+        except Exception:
+            logger.exception("spatial index refresh failed")
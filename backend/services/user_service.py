@@ -1,11 +1,5 @@
-from passlib.context import CryptContext
 from backend.models.user import User
-from backend.config.database import SessionLocal
-
-
-# Şifre Hashleme Ayarları
-# bcrypt algoritması kullanılıyor
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend.utils.hash import hash_password
 
 
 
@@ -15,7 +9,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 def create_user(db, user_data):
     
     # Şifreyi hashle
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = hash_password(user_data.password)
 
     # User nesnesini oluştur
     new_user = User(
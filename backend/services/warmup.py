@@ -0,0 +1,32 @@
+import asyncio
+from sqlalchemy.orm import Session
+from backend.config.database import DBSession
+from backend.config.settings import get_settings
+from backend.services.donation_service import get_donation_row, get_donation_rows, get_donations_version
+from backend.utils.jwt import get_principal_row
+
+settings = get_settings()
+
+
+# Her istekte (veya çok sık) çalışan sorgular
+# Var olmayan id'lerle çalıştırılır: amaç sonuç değil, SQLAlchemy derleme
+# önbelleğini ve asyncpg'nin bağlantı başına prepared statement önbelleğini doldurmak.
+def _warm_queries(db: Session):
+    get_principal_row(db, 0)
+    if settings.http_validators_enabled:
+        get_donations_version(db)
+    get_donation_row(db, 0, include_expired=False)
+    get_donation_rows(db, [0], include_expired=False)
+
+
+# Açılışta havuz bağlantılarını aç ve ısıt
+# -------------------------
+# connections kadar oturum aynı anda açılır (en fazla DB_POOL_SIZE; fazlası
+# havuza geri dönerken kapatılırdı). Bağlantılar havuza ısınmış olarak döner.
+async def warm_up_database(connections: int):
+    sessions = [DBSession() for _ in range(max(0, min(connections, settings.db_pool_size)))]
+    try:
+        await asyncio.gather(*(db.run(_warm_queries) for db in sessions))
+    finally:
+        for db in sessions:
+            await db.close()
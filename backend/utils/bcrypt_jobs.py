@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+
+# bcrypt worker süreçlerinde çalışan işler
+# -------------------------
+# Spawn edilen worker'lar sadece bu modülü import eder; FastAPI, SQLAlchemy
+# ve ayarlar yüklenmez, worker açılışı hızlı kalır. passlib de ilk
+# kullanımda yüklenir (login/register dışındaki yollar ödemez).
+#
+# bcrypt algoritması kullanılıyor. Maliyet (rounds) BCRYPT_ROUNDS ile ayarlanır;
+# min/max aynı tutulduğu için farklı maliyetle üretilmiş eski hash'ler
+# needs_update=True olur ve login sırasında yeniden hashlenir.
+@lru_cache
+def crypt_context(rounds: int):
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+# Worker süreçlerinde çalışan fonksiyonlar (pickle edilebilmeleri için modül seviyesinde)
+def hash_job(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def verify_job(plain_password: str, hashed_password: str, rounds: int):
+    return crypt_context(rounds).verify_and_update(plain_password, hashed_password)
+
+
+# Worker'ı ısıt: passlib/bcrypt'i yükle
+def warm_job(rounds: int) -> bool:
+    crypt_context(rounds)
+    return True
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Sınırlı boyutlu TTL + LRU önbellek
+# -------------------------
+# maxsize: en fazla kayıt sayısı (dolunca en eski kullanılan atılır)
+# ttl    : kaydın geçerlilik süresi (saniye)
+# Thread-safe; hit/miss sayaçları istatistik için tutulur.
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # Kaydı getir; yoksa veya süresi dolmuşsa default döner
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, ttl: float | None = None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    # Anahtarı koşula uyan tüm kayıtları sil; silinen sayısını döner
+    def delete_where(self, predicate) -> int:
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -1,10 +1,14 @@
-from passlib.context import CryptContext
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from backend.config.settings import get_settings
+from backend.utils.bcrypt_jobs import crypt_context, hash_job, verify_job, warm_job
 
-
-#  Şifre Hashleme Ayarları
-# -------------------------
-# bcrypt algoritması kullanılıyor
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 # Şifreyi hashle
@@ -12,7 +16,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # plain_password : Kullanıcının girdiği düz şifre
 # return         : Hashlenmiş şifre (veritabanına kaydedilir)
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return crypt_context(settings.bcrypt_rounds).hash(password)
 
 
 #  Şifre doğrulama
@@ -21,4 +25,95 @@ def hash_password(password: str) -> str:
 # hashed_password : Veritabanındaki hashlenmiş şifre
 # return          : True/False
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return crypt_context(settings.bcrypt_rounds).verify(plain_password, hashed_password)
+
+
+#  bcrypt worker havuzu
+# -------------------------
+# bcrypt istek thread'lerini/event loop'u meşgul etmesin diye ayrı, boyutu
+# sınırlı bir process havuzunda çalışır. Bekleyen iş sayısı
+# BCRYPT_WORKERS + BCRYPT_MAX_PENDING'i aşarsa beklemek yerine hemen 503 döner.
+# Bir worker ölürse (ör. OOM) havuz kırılır; yeniden kurulur ve iş bir kez tekrarlanır.
+_executor = None
+_in_flight = 0
+_SUBMIT_ATTEMPTS = 2
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.bcrypt_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+# Kırılan havuzu at; sonraki _get_executor() yenisini kurar
+# (aynı anda kırılmayı gören diğer istekler yeni havuzu kapatmasın diye kimlik kontrolü)
+def _discard_executor(broken: ProcessPoolExecutor):
+    global _executor
+    if _executor is broken:
+        _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _submit(fn, *args):
+    global _in_flight
+    if _in_flight >= settings.bcrypt_workers + settings.bcrypt_max_pending:
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "error", "message": "Sunucu yoğun, lütfen biraz sonra tekrar deneyin."},
+            headers={"Retry-After": "1"},
+        )
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        for _ in range(_SUBMIT_ATTEMPTS):
+            executor = _get_executor()
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                logger.warning("bcrypt worker pool is broken, recreating it")
+                _discard_executor(executor)
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "error", "message": "Sunucu yoğun, lütfen biraz sonra tekrar deneyin."},
+            headers={"Retry-After": "1"},
+        )
+    finally:
+        _in_flight -= 1
+
+
+# Şifreyi worker havuzunda hashle
+async def hash_password_async(password: str) -> str:
+    return await _submit(hash_job, password, settings.bcrypt_rounds)
+
+
+# Şifreyi worker havuzunda doğrula
+# -------------------------
+# return: (doğru_mu, yeni_hash). Hash eski maliyetle üretilmişse yeni_hash
+# güncel maliyetle hesaplanmış hash'tir ve veritabanına yazılmalıdır; değilse None.
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await _submit(verify_job, plain_password, hashed_password, settings.bcrypt_rounds)
+
+
+# Worker süreçlerini önceden başlat (açılışta, arka planda)
+# -------------------------
+# Spawn edilen süreçlerin açılışı ilk login isteğine yansımasın diye
+# her worker için bir ısıtma işi gönderilir.
+async def warm_hash_pool():
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    await asyncio.gather(*(
+        loop.run_in_executor(executor, warm_job, settings.bcrypt_rounds)
+        for _ in range(settings.bcrypt_workers)
+    ))
+
+
+# Uygulama kapanırken worker süreçlerini durdur
+def shutdown_hash_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
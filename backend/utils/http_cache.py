@@ -0,0 +1,68 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request
+from fastapi.responses import Response
+
+
+# Zayıf ETag üret
+# -------------------------
+# parts: yanıtı belirleyen her şey (sürüm/updated_at + etkili sorgu parametreleri)
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+# Doğrulayıcı header'ları (200 ve 304 yanıtlarında aynı)
+# -------------------------
+# Yanıt kullanıcı rolüne göre değiştiği için Vary: Authorization;
+# no-cache: istemci saklayabilir ama her seferinde doğrulatmalı.
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+# İstemcinin elindeki kopya hâlâ geçerli mi?
+# -------------------------
+# If-None-Match varsa sadece ona bakılır (RFC 9110); yoksa If-Modified-Since
+# saniye hassasiyetinde Last-Modified ile karşılaştırılır.
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+# Koşullu GET
+# -------------------------
+# return: (304 yanıtı veya None, tam yanıta eklenecek header'lar)
+def conditional_response(request: Request, etag: str, last_modified: datetime | None = None):
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers), headers
+    return None, headers
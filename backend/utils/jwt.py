@@ -3,26 +3,61 @@ from typing import Optional
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials 
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from backend.config.database import SessionLocal
+from backend.config.database import DBSession, get_db
+from backend.config.settings import get_settings
 from backend.models.user import User
-import os
-from dotenv import load_dotenv
+from backend.utils.cache import TTLCache
 
-# Ortam değişkenlerini yükle
-load_dotenv()
-
-SECRET_KEY = os.getenv("SECRET_KEY")
-# GEÇİCİ: Konsola anahtarı yazdırır (production'da kaldır)
-print(f"DEBUG: Yüklenen Gizli Anahtar: {SECRET_KEY}")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
+settings = get_settings()
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.jwt_algorithm
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
 
 #  HTTP Bearer şeması (Swagger UI uyumlu)
 oauth2_scheme = HTTPBearer()
 
 
+#  Principal önbelleği
+# -------------------------
+# Anahtar: (user_id, token) -> get_current_user'ın döndüğü dict.
+# Token her istekte yine doğrulanır (imza + exp); önbellek sadece
+# kullanıcı sorgusunu atlar. Kullanıcı değişince invalidate_principal() ile temizlenir.
+principal_cache = TTLCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl
+)
+
+
+# Kullanıcının tüm önbellek kayıtlarını sil
+def invalidate_principal(user_id: int):
+    principal_cache.delete_where(lambda key: key[0] == user_id)
+
+
+# ORM üzerinden güncellenen/silinen kullanıcıların kayıtlarını otomatik temizle
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    invalidate_principal(target.id)
+
+
+# Token içine konacak principal claim'leri
+# -------------------------
+# JWT_PRINCIPAL_CLAIMS açıksa user_type/email/full_name imzalı claim olarak
+# taşınır ve get_current_user hiç veritabanına gitmez.
+def principal_claims(user) -> dict:
+    claims = {"sub": str(user.id)}
+    if settings.jwt_principal_claims:
+        claims.update({
+            "user_type": user.user_type,
+            "email": user.email,
+            "full_name": user.full_name,
+        })
+    return claims
+
+
 
 # JWT TOKEN OLUŞTURMA
 # -------------------------
@@ -38,37 +73,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 
 
-#  DB Bağımlılığı: Session oluştur
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-
 # DB'den kullanıcı bul
 def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
 
+# Kimlik doğrulama için gereken kolonlar (şifre hash'i vb. çekilmez)
+def get_principal_row(db: Session, user_id: int):
+    return db.query(User.id, User.email, User.full_name, User.user_type).filter(User.id == user_id).first()
+
+
 
 # TOKEN'DAN MEVCUT KULLANICIYI AL
-def get_current_user(
+async def get_current_user(
     token_auth: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
+    # HTTPAuthorizationCredentials.credentials -> sadece token stringi
+    return await resolve_principal(token_auth.credentials, db)
+
+
+# Token'ı doğrula ve principal dict'ini döndür
+# -------------------------
+# get_current_user ve Authorization header'ı olmayan uçlar (WebSocket) ortak kullanır.
+async def resolve_principal(token: str, db: DBSession) -> dict:
     # Hata durumunda fırlatılacak exception
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail={"status": "error", "message": "Token geçersiz veya süresi dolmuş."},
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    # HTTPAuthorizationCredentials.credentials -> sadece token stringi
-    token = token_auth.credentials
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -80,18 +114,34 @@ def get_current_user(
 
         user_id = int(user_id)
 
-    except JWTError:
+    except (JWTError, ValueError):
         raise credentials_exception
 
+    # Principal imzalı claim olarak geldiyse DB'ye gitmeye gerek yok
+    if "user_type" in payload:
+        return {
+            "user_id": user_id,
+            "email": payload.get("email"),
+            "full_name": payload.get("full_name"),
+            "user_type": payload["user_type"]
+        }
+
+    cache_key = (user_id, token)
+    principal = principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
+
     # Kullanıcıyı veritabanından çek
-    user = get_user_by_id(db, user_id)
+    user = await db.run(get_principal_row, user_id)
     if user is None:
         raise credentials_exception
 
     # Donation router vs. için dict formatında dön
-    return {
+    principal = {
         "user_id": user.id,
         "email": user.email,
         "full_name": user.full_name,
         "user_type": user.user_type
     }
+    principal_cache.set(cache_key, principal)
+    return principal
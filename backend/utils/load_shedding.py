@@ -0,0 +1,64 @@
+import random
+from backend.utils.metrics import SHED, pool_wait_average
+from backend.utils.serialization import FastJSONResponse
+
+OVERLOADED = {"status": "error", "message": "Sunucu yoğun, lütfen biraz sonra tekrar deneyin."}
+
+
+# Genel kabul kontrolü / yük atma (saf ASGI middleware)
+# -------------------------
+# İki koşulda yeni istek beklemeden 503 + Retry-After ile reddedilir:
+#   - max_concurrency: bu worker'da aynı anda işlenen istek sayısı sınırı (0 = yok)
+#   - pool_wait_threshold: havuzdan bağlantı alma bekleme süresinin sönümlenen
+#     ortalaması eşiği aşınca, aşım oranıyla artan olasılıkla (2 katında tümü)
+# Kuyrukta bekleyip zaman aşımına düşmek yerine hızlı hata dönülür; böylece
+# kabul edilen isteklerin gecikmesi sınırlı kalır. Havuz bekleme ölçümü
+# metrikler açıkken (METRICS_ENABLED) yapılır.
+# Akış yanıtları (SSE /donations/feed/sse, stream=true / NDJSON listeler)
+# gövdenin ilk parçası more_body=True ile gönderildiği anda in_flight'tan
+# düşer: uzun süre açık kalan bağlantılar eşzamanlılık sınırını doldurmaz.
+class LoadShedMiddleware:
+    def __init__(self, app, max_concurrency: int = 0, pool_wait_threshold: float = 0.0,
+                 exempt_prefixes: tuple = ("/metrics", "/admin")):
+        self.app = app
+        self.max_concurrency = max_concurrency
+        self.pool_wait_threshold = pool_wait_threshold
+        self.exempt_prefixes = exempt_prefixes
+        self.in_flight = 0
+
+    def _shed_reason(self) -> str | None:
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            return "concurrency"
+        if self.pool_wait_threshold > 0:
+            overload = pool_wait_average.value() / self.pool_wait_threshold - 1
+            if overload > 0 and random.random() < overload:
+                return "pool_wait"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._shed_reason()
+        if reason is not None:
+            SHED.inc(1, reason)
+            response = FastJSONResponse({"detail": OVERLOADED}, status_code=503, headers={"Retry-After": "1"})
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        counted = True
+
+        async def send_with_release(message):
+            nonlocal counted
+            if counted and message["type"] == "http.response.body" and message.get("more_body"):
+                counted = False
+                self.in_flight -= 1
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_release)
+        finally:
+            if counted:
+                self.in_flight -= 1
@@ -0,0 +1,319 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util import queue as sqla_queue
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Süreç içi Prometheus metrikleri
+# -------------------------
+# Harici bağımlılık yok; değerler worker başına tutulur (birden çok worker
+# varsa Prometheus her worker'ı ayrı hedef olarak toplamalı). Thread-safe.
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        # label değerleri -> [bucket sayaçları..., toplam, adet]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            for label_values, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    le = _format_value(float(bound))
+                    lines.append(f"{self.name}_bucket{_format_labels(names, label_values + (le,))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(names, label_values + ('+Inf',))} {state[-1]}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+                lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+REQUEST_LABELS = ("method", "route")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency per route.",
+    LATENCY_BUCKETS, REQUEST_LABELS + ("status",)
+)
+REQUEST_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements executed per request.",
+    STATEMENT_BUCKETS, REQUEST_LABELS
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Total SQL execution time per request.",
+    LATENCY_BUCKETS, REQUEST_LABELS
+)
+REQUEST_POOL_WAIT = Histogram(
+    "http_request_db_pool_wait_seconds", "Total connection pool checkout wait per request.",
+    WAIT_BUCKETS, REQUEST_LABELS
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Connection pool checkout wait (all callers, including background tasks).",
+    WAIT_BUCKETS
+)
+STATEMENTS = Counter("db_statements_total", "SQL statements executed (all callers).")
+QUERY_BUDGET_EXCEEDED = Counter(
+    "http_request_query_budget_exceeded_total", "Requests that exceeded their declared query budget.", REQUEST_LABELS
+)
+RATE_LIMITED = Counter("http_requests_rate_limited_total", "Requests rejected by a per-user/IP rate limit.", ("bucket",))
+SHED = Counter("http_requests_shed_total", "Requests rejected by load shedding.", ("reason",))
+
+REGISTRY = [
+    REQUEST_LATENCY, REQUEST_STATEMENTS, REQUEST_DB_TIME, REQUEST_POOL_WAIT,
+    POOL_WAIT, STATEMENTS, QUERY_BUDGET_EXCEEDED, RATE_LIMITED, SHED,
+]
+
+
+# Prometheus metin formatı (text/plain; version=0.0.4)
+def render_metrics() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.collect()) + "\n"
+
+
+# İstek başına veritabanı sayaçları
+# -------------------------
+# Middleware her istek için bir RequestStats açar; engine ve havuz olayları
+# contextvar üzerinden buna yazar. Threadpool (run_in_threadpool) ve async
+# oturum (run_sync greenlet'i) context'i kopyaladığı için aynı nesne görülür.
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "pool_wait_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+_current_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    STATEMENTS.inc()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+# Engine'e sorgu sayacı/süre olaylarını bağla (async engine için sync_engine verilir)
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Son havuz bekleme sürelerinin zamanla sönümlenen ortalaması
+# -------------------------
+# Her ölçümde EWMA güncellenir; okurken son ölçümden beri geçen süreyle
+# yarılanır. Böylece yük kesilince (yeni ölçüm gelmese de) değer sıfıra iner.
+class DecayingAverage:
+    def __init__(self, half_life: float = 1.0, weight: float = 0.2):
+        self.half_life = half_life
+        self.weight = weight
+        self._value = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now: float) -> float:
+        return self._value * 0.5 ** ((now - self._updated) / self.half_life)
+
+    def observe(self, value: float):
+        now = time.monotonic()
+        with self._lock:
+            self._value = self._decayed(now) * (1 - self.weight) + value * self.weight
+            self._updated = now
+
+    def value(self) -> float:
+        with self._lock:
+            return self._decayed(time.monotonic())
+
+
+# Yük atma (load_shedding) bu değere bakar
+pool_wait_average = DecayingAverage()
+
+
+def _record_pool_wait(elapsed: float):
+    POOL_WAIT.observe(elapsed)
+    pool_wait_average.observe(elapsed)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.pool_wait_seconds += elapsed
+
+
+# Havuzdan bağlantı alma süresini ölçen havuzlar
+# -------------------------
+# Pool olaylarında "checkout başladı" olayı yok; ölçüm havuzun kuyruğunda
+# yapılır ve sadece boşta bağlantı için bekleme süresini içerir. Yeni bağlantı
+# açma (TCP + kimlik doğrulama, overflow dahil) ölçüme girmez: bekleme 0 kaydedilir.
+# Böylece soğuk açılış veya yavaş bir veritabanı bağlantısı havuz doygunluğu
+# sanılıp yük atmayı tetiklemez. Kuyruğu boş bulan bloklamayan deneme
+# kaydedilmez; ardından ya bağlantı açılır ya da tekrar denenir.
+class _TimedQueue(sqla_queue.Queue):
+    def get(self, block: bool = True, timeout: float | None = None):
+        started = time.perf_counter()
+        try:
+            item = super().get(block, timeout)
+        except sqla_queue.Empty:
+            if block:
+                _record_pool_wait(time.perf_counter() - started)
+            raise
+        _record_pool_wait(time.perf_counter() - started)
+        return item
+
+
+class _TimedAsyncQueue(sqla_queue.AsyncAdaptedQueue):
+    def get(self, block: bool = True, timeout: float | None = None):
+        started = time.perf_counter()
+        try:
+            item = super().get(block, timeout)
+        except sqla_queue.Empty:
+            if block:
+                _record_pool_wait(time.perf_counter() - started)
+            raise
+        _record_pool_wait(time.perf_counter() - started)
+        return item
+
+
+class TimedQueuePool(QueuePool):
+    _queue_class = _TimedQueue
+
+    def _create_connection(self):
+        _record_pool_wait(0.0)
+        return super()._create_connection()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    _queue_class = _TimedAsyncQueue
+
+    def _create_connection(self):
+        _record_pool_wait(0.0)
+        return super()._create_connection()
+
+
+# Sorgu bütçesi
+# -------------------------
+# @query_budget(n) ile işaretlenen route'lar bir istekte n'den fazla SQL
+# çalıştırırsa middleware uyarı loglar; QUERY_BUDGET_ENFORCE=1 (test modu)
+# iken QueryBudgetExceeded fırlatır, TestClient bunu testte hata olarak görür.
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_statements: int):
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_statements
+        return endpoint
+    return decorator
+
+
+# Route bazlı gecikme / SQL / havuz bekleme metrikleri (saf ASGI middleware)
+# -------------------------
+# route etiketi eşleşen route'un şablonudur (/donations/{donation_id});
+# eşleşmeyen istekler "unmatched" altında toplanır (etiket sayısı sınırlı kalsın).
+class MetricsMiddleware:
+    def __init__(self, app, enforce_budgets: bool = False):
+        self.app = app
+        self.enforce_budgets = enforce_budgets
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            REQUEST_LATENCY.observe(elapsed, *labels, str(status))
+            REQUEST_STATEMENTS.observe(stats.statements, *labels)
+            REQUEST_DB_TIME.observe(stats.db_seconds, *labels)
+            REQUEST_POOL_WAIT.observe(stats.pool_wait_seconds, *labels)
+
+        budget = getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+        if budget is not None and stats.statements > budget:
+            QUERY_BUDGET_EXCEEDED.inc(1, *labels)
+            message = f"{labels[0]} {labels[1]} ran {stats.statements} SQL statements (budget {budget})"
+            if self.enforce_budgets:
+                raise QueryBudgetExceeded(message)
+            logger.warning("query budget exceeded: %s", message)
@@ -0,0 +1,249 @@
+import asyncio
+import heapq
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from backend.config.settings import get_settings
+
+
+# İstek bazlı örnekleyici profil (stdlib, harici bağımlılık yok)
+# -------------------------
+# Profil alınan her istek için ayrı bir sampler thread'i belirli aralıklarla
+# isteğin asyncio task'ının mantıksal yığınını okur:
+#   - task o an çalışıyorsa: coroutine zinciri + event loop thread'inin
+#     gerçek yığınındaki daha derin çağrılar (pydantic, shapely, serileştirme)
+#   - async DB oturumunun greenlet'i çalışıyorsa: greenlet yığını
+#   - task bekliyorsa: coroutine zinciri + "<await X>" yaprağı (threadpool,
+#     bcrypt process pool'u, asyncpg future'ı gibi); sırasını bekliyorsa "<ready>"
+# Sonuç flame graph araçlarının (flamegraph.pl, speedscope) okuduğu
+# "folded stacks" formatındadır: "a;b;c <örnek sayısı>".
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_labels: dict = {}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(_ROOT):
+            filename = os.path.relpath(filename, _ROOT)
+        else:
+            filename = os.path.basename(filename)
+        label = f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+        _labels[code] = label
+    return label
+
+
+# Coroutine zinciri (dıştan içe): [(coroutine, frame)...] ve en içteki beklenen nesne
+def _coroutine_chain(coro):
+    chain = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        chain.append((coro, frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return chain, coro
+
+
+def _is_running(coro) -> bool:
+    return bool(getattr(coro, "cr_running", None) or getattr(coro, "gi_running", None) or getattr(coro, "ag_running", None))
+
+
+def _thread_stack(thread_id: int) -> list:
+    frame = sys._current_frames().get(thread_id)
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _sample_task(task: asyncio.Task, thread_id: int) -> tuple | None:
+    chain, leaf = _coroutine_chain(task.get_coro())
+    if not chain:
+        return None
+    stack = [_frame_label(frame) for _, frame in chain]
+    innermost, innermost_frame = chain[-1]
+    if leaf is not None:
+        stack.append(f"<await {type(leaf).__name__}>")
+    elif _is_running(innermost):
+        # Coroutine çalışıyor: event loop thread'inde daha derine in
+        # (yığında yoksa async DB oturumunun greenlet'i çalışıyordur)
+        thread_frames = _thread_stack(thread_id)
+        position = next((i for i, frame in enumerate(thread_frames) if frame is innermost_frame), None)
+        deeper = thread_frames[position + 1:] if position is not None else thread_frames
+        stack.extend(_frame_label(frame) for frame in deeper)
+    else:
+        # Task çalışmaya hazır, event loop sırasını bekliyor
+        stack.append("<ready>")
+    return tuple(stack)
+
+
+class Profile:
+    __slots__ = ("id", "method", "route", "path", "trigger", "started_at", "status", "duration_ms",
+                 "_samples", "_lock")
+
+    def __init__(self, profile_id: int, method: str, path: str, trigger: str):
+        self.id = profile_id
+        self.method = method
+        self.route = None
+        self.path = path
+        self.trigger = trigger
+        self.started_at = datetime.now(timezone.utc)
+        self.status = None
+        self.duration_ms = None
+        self._samples: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add_sample(self, stack: tuple):
+        with self._lock:
+            self._samples[stack] += 1
+
+    def samples(self) -> list[tuple[tuple, int]]:
+        with self._lock:
+            return self._samples.most_common()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": self.route,
+            "path": self.path,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "samples": sum(count for _, count in self.samples()),
+        }
+
+    # flamegraph.pl / speedscope "folded stacks" formatı
+    def folded(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples())
+
+
+# Tek bir isteğin örnekleme thread'i
+class _Sampler(threading.Thread):
+    def __init__(self, profile: Profile, task: asyncio.Task, thread_id: int, interval: float):
+        super().__init__(name=f"profiler-{profile.id}", daemon=True)
+        self.profile = profile
+        self.task = task
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if self.task.done():
+                break
+            try:
+                stack = _sample_task(self.task, self.thread_id)
+            except (RuntimeError, ValueError):
+                # Yığın örnekleme sırasında değişti; bu örneği atla
+                continue
+            if stack:
+                self.profile.add_sample(stack)
+
+
+# Route başına en yavaş N profil
+# -------------------------
+# Her route için süreye göre min-heap; dolunca en hızlı profil atılır.
+# Route'lar şablon yoludur, toplam boyut route sayısı × N ile sınırlı kalır.
+class ProfileStore:
+    def __init__(self, per_route: int):
+        self.per_route = per_route
+        self._routes: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        entry = (profile.duration_ms, profile.id, profile)
+        with self._lock:
+            heap = self._routes.setdefault(profile.route, [])
+            if len(heap) < self.per_route:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    def list(self, route: str | None = None) -> list[dict]:
+        with self._lock:
+            profiles = [
+                entry[2] for name, heap in self._routes.items()
+                if route is None or name == route for entry in heap
+            ]
+        return [profile.summary() for profile in sorted(profiles, key=lambda p: -p.duration_ms)]
+
+    def get(self, profile_id: int) -> Profile | None:
+        with self._lock:
+            for heap in self._routes.values():
+                for entry in heap:
+                    if entry[1] == profile_id:
+                        return entry[2]
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+# Worker başına profil deposu (admin uçları okur)
+profile_store = ProfileStore(get_settings().profiler_slowest_per_route)
+
+
+# Profil tetikleyici middleware (saf ASGI)
+# -------------------------
+# Bir istek iki şekilde profillenir:
+#   - X-Profile header'ı ADMIN_TOKEN ile eşleşirse (trigger="header")
+#   - PROFILER_SAMPLE_RATE olasılıkla rastgele (trigger="sampled")
+# Profillenmeyen isteklerde maliyet bir header araması ve random() çağrısıdır;
+# ikisi de kapalıysa middleware hiç eklenmez.
+class ProfilerMiddleware:
+    def __init__(self, app, store: ProfileStore = profile_store, sample_rate: float = 0.0,
+                 admin_token: str | None = None, interval: float = 0.005):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token.encode() if admin_token else None
+        self.interval = interval
+        self._ids = itertools.count(1)
+
+    def _trigger(self, scope) -> str | None:
+        if self.admin_token is not None:
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    return "header" if hmac.compare_digest(value, self.admin_token) else None
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(next(self._ids), scope["method"], scope["path"], trigger)
+        sampler = _Sampler(profile, asyncio.current_task(), threading.get_ident(), self.interval)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            sampler.stopped.set()
+            profile.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            profile.route = getattr(scope.get("route"), "path", "unmatched")
+            self.store.add(profile)
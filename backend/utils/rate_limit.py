@@ -0,0 +1,86 @@
+import math
+import threading
+import time
+from fastapi import Depends, HTTPException, Request
+from backend.config.settings import get_settings
+from backend.utils.cache import TTLCache
+from backend.utils.jwt import get_current_user
+from backend.utils.metrics import RATE_LIMITED
+
+settings = get_settings()
+
+
+# Anahtar başına token bucket
+# -------------------------
+# rate : saniyede eklenen token, burst: kova kapasitesi.
+# Kova durumu (token, son_zaman) TTLCache'te tutulur; ttl kovanın tamamen
+# dolma süresidir, süresi dolan kayıt zaten dolu kova demektir. Böylece
+# bellek max_keys ile sınırlı kalır. Worker başına tutulur (paylaşılmaz).
+class TokenBucketLimiter:
+    def __init__(self, name: str, per_minute: float, burst: int, max_keys: int):
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self._buckets = TTLCache(maxsize=max_keys, ttl=burst / self.rate)
+        self._lock = threading.Lock()
+
+    # Bir token harca; kova boşsa bekleme süresini (saniye) döner, değilse 0
+    def acquire(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            state = self._buckets.get(key)
+            tokens = self.burst if state is None else min(self.burst, state[0] + (now - state[1]) * self.rate)
+            if tokens < 1:
+                self._buckets.set(key, (tokens, now))
+                return (1 - tokens) / self.rate
+            self._buckets.set(key, (tokens - 1, now))
+            return 0.0
+
+    def check(self, key: str):
+        retry_after = self.acquire(key)
+        if retry_after > 0:
+            RATE_LIMITED.inc(1, self.name)
+            raise HTTPException(
+                status_code=429,
+                detail={"status": "error", "message": "Çok fazla istek, lütfen biraz sonra tekrar deneyin."},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+def _limiter(name: str, per_minute: float, burst: int) -> TokenBucketLimiter | None:
+    if not settings.rate_limit_enabled or per_minute <= 0:
+        return None
+    return TokenBucketLimiter(name, per_minute, burst, settings.rate_limit_max_keys)
+
+
+# Ayrı bütçeler: kimlik (login/register, IP'ye göre), okuma ve yazma (kullanıcıya göre)
+auth_limiter = _limiter("auth", settings.rate_limit_auth_per_minute, settings.rate_limit_auth_burst)
+read_limiter = _limiter("read", settings.rate_limit_read_per_minute, settings.rate_limit_read_burst)
+write_limiter = _limiter("write", settings.rate_limit_write_per_minute, settings.rate_limit_write_burst)
+
+
+# get_current_user + kullanıcı bazlı limit
+# -------------------------
+# Route'larda Depends(get_current_user) yerine kullanılır; aynı principal'ı döner.
+# get_current_user istek içinde önbelleğe alındığı için ek sorgu yoktur.
+def rate_limited_user(limiter: TokenBucketLimiter | None):
+    async def dependency(current_user: dict = Depends(get_current_user)) -> dict:
+        if limiter is not None:
+            limiter.check(f"user:{current_user['user_id']}")
+        return current_user
+    return dependency
+
+
+# Kimliği olmayan uçlar (login/register, herkese açık okumalar) için IP bazlı limit
+# Proxy arkasında çalışılıyorsa uvicorn --proxy-headers ile gerçek istemci IP'si gelmeli.
+def rate_limited_ip(limiter: TokenBucketLimiter | None):
+    async def dependency(request: Request):
+        if limiter is not None:
+            limiter.check(f"ip:{request.client.host if request.client else 'unknown'}")
+    return dependency
+
+
+read_user = rate_limited_user(read_limiter)
+write_user = rate_limited_user(write_limiter)
+auth_ip_limit = rate_limited_ip(auth_limiter)
+read_ip_limit = rate_limited_ip(read_limiter)
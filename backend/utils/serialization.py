@@ -0,0 +1,45 @@
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+# pydantic'in JSON çıktısıyla aynı biçim: UTC zamanları "Z" ile, sayısal anahtarlar string
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+# Hızlı JSON yanıtı
+# -------------------------
+# İçerik (dict/list) orjson ile doğrudan byte'a çevrilir. Handler bir Response
+# döndürdüğünde FastAPI response_model doğrulamasını ve jsonable_encoder'ı
+# atlar; response_model yalnızca OpenAPI dokümantasyonu için kalır.
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+# Tek JSON değeri (WebSocket mesajı, SSE data satırı)
+def dumps(content) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+# NDJSON satırı (sonunda \n)
+def dumps_line(content) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+
+# Seyrek alan listesi (fields=id,latitude,longitude)
+# -------------------------
+# allowed: izin verilen alan adları. Boşsa None (tüm alanlar) döner,
+# bilinmeyen alan varsa 400 fırlatır.
+def parse_fields(fields: str | None, allowed) -> tuple[str, ...] | None:
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": f"Bilinmeyen alan(lar): {', '.join(unknown)}"}
+        )
+    return names or None
@@ -0,0 +1,73 @@
+"""Login baskısı altında okuma gecikmesi.
+
+Çalışan bir API'ye karşı (uvicorn backend.main:app) login isteklerini bcrypt
+havuzunu doyuracak kadar eşzamanlı gönderirken aynı anda GET /donations okur.
+Çıktı JSON'dur: login throughput'u, 503 sayısı ve okuma yolunun p50/p95/p99'u.
+
+Sonuç ancak havuz üretim boyutundayken anlamlıdır: büyük bir havuz, login'in
+bcrypt beklerken bağlantı tutmasını gizler. Sunucu aynı ortamla (.env)
+başlatılmalı; DB_POOL_SIZE/DB_MAX_OVERFLOW --pool-size/--max-overflow ile
+eşleşmezse benchmark çalışmaz. Kullanılan havuz ayarları çıktıda raporlanır.
+
+    python -m benchmarks.bench_login --base-url http://localhost:8000 --duration 20
+"""
+import argparse
+import json
+
+from backend.config.settings import get_settings
+from benchmarks.common import Workload, ensure_user, request, run_concurrently
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="bench-login@example.com")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--read-concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--latitude", type=float, default=41.0082)
+    parser.add_argument("--longitude", type=float, default=28.9784)
+    parser.add_argument("--pool-size", type=int, default=5, help="Üretim DB_POOL_SIZE")
+    parser.add_argument("--max-overflow", type=int, default=10, help="Üretim DB_MAX_OVERFLOW")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    pool = {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow}
+    if pool != {"pool_size": args.pool_size, "max_overflow": args.max_overflow}:
+        parser.error(
+            f"DB pool is {pool['pool_size']}+{pool['max_overflow']}, expected production "
+            f"{args.pool_size}+{args.max_overflow}; start the server with the production pool settings"
+        )
+
+    token = ensure_user(args.base_url, args.email, args.password)
+    credentials = {"email": args.email, "password": args.password}
+    read_path = f"/donations/?latitude={args.latitude}&longitude={args.longitude}&radius_km=5&limit=50"
+
+    def login_job():
+        status, _, elapsed = request(args.base_url, "POST", "/auth/login", credentials)
+        return status, elapsed
+
+    def read_job():
+        status, _, elapsed = request(args.base_url, "GET", read_path, token=token)
+        return status, elapsed
+
+    # Önce login baskısı olmadan okuma (taban çizgisi), sonra baskı altında
+    baseline = run_concurrently([Workload("read", read_job, args.read_concurrency)], args.duration / 2)
+    loaded = run_concurrently([
+        Workload("login", login_job, args.login_concurrency),
+        Workload("read", read_job, args.read_concurrency),
+    ], args.duration)
+
+    print(json.dumps({
+        "benchmark": "login_saturation",
+        "params": vars(args) | {"password": "***"},
+        "pool": pool,
+        "read_baseline": baseline["read"],
+        "login": loaded["login"],
+        "read_under_login_load": loaded["read"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Aynı ilanlar için eşzamanlı rezervasyon yarışı.
+
+Bir bağışçı K ilan oluşturur, N alıcı aynı ilanları rastgele ve eşzamanlı
+rezerve etmeye çalışır. Çıktı JSON'dur: throughput, gecikme yüzdelikleri,
+status dağılımı ve çift rezervasyon kontrolü (bir ilan için birden fazla
+farklı kullanıcının 200 alması veya son durumun kazananla uyuşmaması).
+
+    python -m benchmarks.bench_reserve --base-url http://localhost:8000 --clients 32 --donations 5
+"""
+import argparse
+import json
+import random
+import threading
+
+from benchmarks.common import Workload, ensure_user, request, run_concurrently
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--donations", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--password", default="benchmark-password")
+    args = parser.parse_args()
+
+    donor_token = ensure_user(args.base_url, "bench-reserve-donor@example.com", args.password, "donor")
+    donation_ids = []
+    for i in range(args.donations):
+        status, payload, _ = request(args.base_url, "POST", "/donations/", {
+            "title": f"Yarış ilanı {i}",
+            "category": "temiz yemek",
+            "latitude": 41.0 + random.uniform(-0.01, 0.01),
+            "longitude": 29.0 + random.uniform(-0.01, 0.01),
+        }, token=donor_token)
+        if status != 201:
+            raise RuntimeError(f"create failed: {status} {payload}")
+        donation_ids.append(payload["data"]["id"])
+
+    recipients = []
+    for i in range(args.clients):
+        token = ensure_user(args.base_url, f"bench-reserve-{i}@example.com", args.password, "recipient")
+        recipients.append(token)
+
+    # ilan id -> 200 alan kullanıcı indeksleri
+    winners: dict[int, set[int]] = {donation_id: set() for donation_id in donation_ids}
+    lock = threading.Lock()
+    client_ids = iter(range(args.clients))
+
+    workload_clients = threading.local()
+
+    def reserve_job():
+        if not hasattr(workload_clients, "index"):
+            with lock:
+                workload_clients.index = next(client_ids)
+        index = workload_clients.index
+        donation_id = random.choice(donation_ids)
+        status, _, elapsed = request(
+            args.base_url, "POST", f"/donations/{donation_id}/reserve", token=recipients[index]
+        )
+        if status == 200:
+            with lock:
+                winners[donation_id].add(index)
+        return status, elapsed
+
+    result = run_concurrently([Workload("reserve", reserve_job, args.clients)], args.duration)
+
+    # Son durum: her ilan için reserved_by tek bir kazananla uyuşmalı
+    double_reservations = []
+    for donation_id, users in winners.items():
+        status, payload, _ = request(args.base_url, "GET", f"/donations/{donation_id}")
+        reserved_by = payload["data"]["reserved_by"] if status == 200 else None
+        if len(users) > 1:
+            double_reservations.append({"donation_id": donation_id, "winners": len(users)})
+        elif users and reserved_by is None:
+            double_reservations.append({"donation_id": donation_id, "winners": len(users), "reserved_by": None})
+
+    print(json.dumps({
+        "benchmark": "reservation_race",
+        "params": vars(args) | {"password": "***"},
+        "reserve": result["reserve"],
+        "donations": len(donation_ids),
+        "double_reservations": double_reservations,
+        "ok": not double_reservations,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Açılış süresi regresyon kontrolü: `import backend.main` bütçeyi aşıyor mu?
+
+Her ölçüm temiz bir Python sürecinde yapılır (modül önbelleği yok); medyan
+süre --budget-ms'i aşarsa veya yasaklı bir paket import sırasında yüklenirse
+çıkış kodu 1'dir. Yasaklı paketler (varsayılan: shapely, passlib) import
+anında engellenir: opsiyonel olarak deneyen kütüphaneler (geoalchemy2 →
+shapely) sessizce devam eder, uygulama kodundan doğrudan import hata verir.
+
+Import veritabanına bağlanmaz; DATABASE_URL yoksa sahte bir URL kullanılır.
+Çıktı JSON'dur: ölçümler, medyan ve en pahalı üst seviye import'lar (-X importtime).
+Aynı kontrol tests/test_import_time.py'de pytest testi olarak çalışır
+(bütçe: IMPORT_BUDGET_MS, varsayılan 1500).
+
+    python -m benchmarks.check_import_time --budget-ms 1500 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import sys, time
+forbidden = set(sys.argv[1].split(",")) - {""}
+
+class Forbidden:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in forbidden:
+            raise ImportError(f"{name} must not be imported at startup")
+        return None
+
+sys.meta_path.insert(0, Forbidden())
+started = time.perf_counter()
+try:
+    import backend.main
+except ImportError as exc:
+    print("FORBIDDEN", exc)
+    sys.exit(2)
+print(time.perf_counter() - started)
+"""
+
+
+def probe_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+# Temiz süreçte import süresi (saniye); yasaklı import varsa hata mesajı
+def measure(forbid: str) -> tuple[float | None, str | None]:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, forbid], capture_output=True, text=True, env=probe_env()
+    )
+    output = result.stdout.strip().splitlines()
+    if result.returncode == 2:
+        return None, output[-1] if output else "forbidden import"
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"probe exited with {result.returncode}")
+    return float(output[-1]), None
+
+
+# backend.main'in doğrudan import ettiği modüllerin kümülatif süreleri (ms)
+def top_imports(limit: int) -> list[dict]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        capture_output=True, text=True, env=probe_env()
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            rows.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    return sorted(rows, key=lambda row: -row["cumulative_ms"])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--forbid", default="shapely,passlib", help="Virgülle ayrılmış paketler")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed, error = measure(args.forbid)
+        if error is not None:
+            print(json.dumps({"ok": False, "forbidden_import": error}, indent=2))
+            sys.exit(1)
+        timings.append(round(elapsed * 1000, 1))
+
+    median = statistics.median(timings)
+    ok = median <= args.budget_ms
+    print(json.dumps({
+        "ok": ok,
+        "budget_ms": args.budget_ms,
+        "median_ms": median,
+        "runs_ms": timings,
+        "top_imports": top_imports(args.top),
+    }, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Sorgu planı regresyon kontrolü: router sorguları Seq Scan'e düşüyor mu?
+
+donation_router ve auth_router'ın çalıştırdığı sorgular, uygulamadaki aynı
+yardımcı fonksiyonlarla üretilir ve EXPLAIN (FORMAT JSON) ile planlanır.
+donations veya users üzerinde Seq Scan olan her sorgu hata sayılır.
+
+Tablo gerçekçi boyuta getirilmek için tek bir transaction içinde sentetik
+kullanıcı ve bağışlarla doldurulur (benchmarks/plan_seed.py), planlar alınır
+ve transaction geri alınır; veritabanında kalıcı veri bırakılmaz. Yerel bir
+PostGIS veritabanında (DATABASE_URL) migration'lar uygulanmış olarak
+çalıştırılmalıdır.
+
+Çıktı JSON'dur: sorgu başına kullanılan indeksler ve Seq Scan durumu.
+Regresyon varsa çıkış kodu 1'dir. Aynı kontroller tests/test_router_query_plans.py'de
+pytest testi olarak da çalışır (DATABASE_URL verilmişse; CI build'i kırar).
+
+    python -m benchmarks.check_query_plans --donations 200000 --users 20000
+
+Kapsam dışı (tüm tabloyu okuması beklenen) sorgular:
+  GET /donations?stream=1 (filtresiz tam akış), bellek içi indeksin yüklenmesi,
+  dünyayı kapsayan bbox ile /clusters.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from backend.models.donation import Donation
+from backend.models.user import User
+from backend.routers.donation_router import _donations_query
+from backend.services.donation_service import (
+    NOT_DELETED,
+    NOT_EXPIRED,
+    changes_query,
+    delete_statement,
+    select_donations,
+    transition_statement,
+)
+from backend.services.donation_archive import archive_candidates, expire_statement
+from backend.services.geo_query import cluster_query, explain, has_seq_scan, iter_plan_nodes
+from benchmarks.plan_seed import DEFAULT_SEED, seeded_session
+
+CHECKED_RELATIONS = ("donations", "users")
+CATEGORIES = ("temiz yemek", "atık yemek")
+
+
+# Kontrol edilen sorgular: (isim, ifade)
+# -------------------------
+# Parametreler tipik istekleri temsil eder: 5 km yarıçap, 100'lük sayfa,
+# tek ilçe büyüklüğünde bbox.
+def plan_cases(lat: float, lng: float) -> list[tuple[str, object]]:
+    bbox = (lng - 0.02, lat - 0.02, lng + 0.02, lat + 0.02)
+    after = (datetime.now(timezone.utc) - timedelta(hours=1), 0)
+    page = 101
+    ids = list(range(1, 51))
+
+    def listing(category=None, nearby=False, order="id", last=None, open_only=False):
+        query = _donations_query(
+            category,
+            lat if nearby else None,
+            lng if nearby else None,
+            5000.0 if nearby else None,
+            order, last, open_only
+        )
+        return query.limit(page)
+
+    return [
+        # GET /donations
+        ("list_by_id", listing()),
+        ("list_by_id_cursor", listing(last=[1000])),
+        ("list_category", listing(category=CATEGORIES[0])),
+        ("list_open_category", listing(category=CATEGORIES[0], open_only=True)),
+        ("nearby_by_id", listing(nearby=True)),
+        ("nearby_by_distance", listing(nearby=True, order="distance")),
+        ("nearby_by_distance_cursor", listing(nearby=True, order="distance", last=[1000.0, 10])),
+        ("nearby_open", listing(nearby=True, order="distance", open_only=True)),
+        ("nearby_open_category", listing(CATEGORIES[1], nearby=True, order="distance", open_only=True)),
+        ("nearby_stream", _donations_query(None, lat, lng, 5000.0, "id", None, False)),
+        # GET /donations/{id}, /batch
+        ("detail", select_donations().where(Donation.id == 1, NOT_EXPIRED)),
+        ("detail_updated_at", select(Donation.updated_at).where(Donation.id == 1, NOT_DELETED, NOT_EXPIRED)),
+        ("batch_read", select_donations().where(Donation.id.in_(ids), NOT_EXPIRED)),
+        # reserve / cancel / collect / delete (tekil ve toplu)
+        ("reserve", transition_statement("reserve", Donation.id == 1, 2)),
+        ("collect_batch", transition_statement("collect", Donation.id.in_(ids), 2)),
+        ("delete_batch", delete_statement(Donation.id.in_(ids), 2)),
+        # /clusters, /changes
+        ("clusters", cluster_query(bbox, 0.001)),
+        ("changes_initial", changes_query(bbox, None, 10).limit(page)),
+        ("changes_since", changes_query(bbox, after, 10).limit(page)),
+        ("changes_initial_category", changes_query(bbox, None, 10, CATEGORIES[0]).limit(page)),
+        ("changes_since_category", changes_query(bbox, after, 10, CATEGORIES[0]).limit(page)),
+        # Arşiv süpürücüsü
+        ("sweep_expire", expire_statement(500)),
+        ("sweep_archive_candidates", archive_candidates(timedelta(hours=168), 500)),
+        # auth: login, get_current_user
+        ("user_by_email", select(User).where(User.email == "plan-check-1@example.com")),
+        ("principal_by_id", select(User.id, User.email, User.full_name, User.user_type).where(User.id == 1)),
+    ]
+
+
+def check(db, lat: float, lng: float) -> list[dict]:
+    results = []
+    for name, stmt in plan_cases(lat, lng):
+        plan = explain(db, stmt)
+        seq_scans = [relation for relation in CHECKED_RELATIONS if has_seq_scan(plan, relation)]
+        results.append({
+            "query": name,
+            "ok": not seq_scans,
+            "seq_scan": seq_scans,
+            "indexes": sorted({node["Index Name"] for node in iter_plan_nodes(plan) if "Index Name" in node}),
+            "total_cost": plan.get("Total Cost"),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--donations", type=int, default=DEFAULT_SEED["donations"])
+    parser.add_argument("--users", type=int, default=DEFAULT_SEED["users"])
+    parser.add_argument("--lat", type=float, default=DEFAULT_SEED["lat"])
+    parser.add_argument("--lng", type=float, default=DEFAULT_SEED["lng"])
+    parser.add_argument("--spread", type=float, default=DEFAULT_SEED["spread"], help="Bağışların dağıldığı kare (derece)")
+    args = parser.parse_args()
+
+    with seeded_session(args.users, args.donations, args.lat, args.lng, args.spread) as db:
+        results = check(db, args.lat, args.lng)
+
+    failed = [result["query"] for result in results if not result["ok"]]
+    print(json.dumps({
+        "seeded": {"donations": args.donations, "users": args.users},
+        "plans": results,
+        "regressions": failed,
+    }, ensure_ascii=False, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
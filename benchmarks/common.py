@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+# Basit HTTP istemcisi (stdlib)
+# -------------------------
+# return: (status_code, gövde dict'i veya None, gecikme_saniye)
+def request(base_url: str, method: str, path: str, body=None, token: str | None = None, timeout: float = 30):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(base_url.rstrip("/") + path, data=data, method=method)
+    req.add_header("Content-Type", "application/json")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as res:
+            raw = res.read()
+            status = res.status
+    except urllib.error.HTTPError as exc:
+        raw = exc.read()
+        status = exc.code
+    elapsed = time.perf_counter() - start
+    try:
+        payload = json.loads(raw) if raw else None
+    except ValueError:
+        payload = None
+    return status, payload, elapsed
+
+
+# Yüzdelik (nearest-rank)
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+# Gecikme listesinden özet (milisaniye)
+def summarize(latencies: list[float], duration: float, statuses: dict | None = None) -> dict:
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else None,
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "statuses": statuses or {},
+    }
+
+
+def _ms(value: float | None):
+    return round(value * 1000, 2) if value is not None else None
+
+
+# Belirli süre boyunca N thread ile aynı işi tekrarla
+# -------------------------
+# job(): (status, elapsed) döner. Sonuç: gecikmeler + status sayıları.
+class Workload:
+    def __init__(self, name: str, job, concurrency: int):
+        self.name = name
+        self.job = job
+        self.concurrency = concurrency
+        self.latencies: list[float] = []
+        self.statuses: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _loop(self, deadline: float):
+        while time.perf_counter() < deadline:
+            status, elapsed = self.job()
+            with self._lock:
+                self.latencies.append(elapsed)
+                self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    def threads(self, deadline: float) -> list[threading.Thread]:
+        return [
+            threading.Thread(target=self._loop, args=(deadline,), daemon=True)
+            for _ in range(self.concurrency)
+        ]
+
+
+# Birden fazla iş yükünü aynı anda çalıştır ve özetle
+def run_concurrently(workloads: list[Workload], duration: float) -> dict:
+    deadline = time.perf_counter() + duration
+    threads = [t for w in workloads for t in w.threads(deadline)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {w.name: summarize(w.latencies, elapsed, w.statuses) for w in workloads}
+
+
+# Kullanıcı kaydı (varsa) + login; token döner
+def ensure_user(base_url: str, email: str, password: str, user_type: str = "donor") -> str:
+    request(base_url, "POST", "/auth/register", {
+        "full_name": "Benchmark Kullanıcısı",
+        "email": email,
+        "password": password,
+        "phone_number": None,
+        "user_type": user_type,
+    })
+    return login(base_url, email, password)
+
+
+# Var olan kullanıcıyla login; token döner
+def login(base_url: str, email: str, password: str) -> str:
+    status, payload, _ = request(base_url, "POST", "/auth/login", {"email": email, "password": password})
+    if status != 200:
+        raise RuntimeError(f"login failed for {email}: {status} {payload}")
+    return payload["token"]
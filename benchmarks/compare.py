@@ -0,0 +1,61 @@
+"""İki run_scenarios sonucunu karşılaştır (önce / sonra, yüzde değişim).
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change_pct(before, after):
+    if before in (None, 0) or after is None:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def compare(before: dict, after: dict) -> dict:
+    result = {}
+    for name, scenario in after["scenarios"].items():
+        old = before["scenarios"].get(name)
+        if old is None:
+            continue
+        rows = {}
+        for workload, summary in scenario.items():
+            if not isinstance(summary, dict) or not isinstance(old.get(workload), dict):
+                continue
+            rows[workload] = {
+                metric: {
+                    "before": old[workload].get(metric),
+                    "after": summary.get(metric),
+                    "change_pct": change_pct(old[workload].get(metric), summary.get(metric)),
+                }
+                for metric in METRICS
+            }
+        old_queries, new_queries = old.get("db_queries_per_request"), scenario.get("db_queries_per_request")
+        rows["db_queries_per_request"] = {
+            "before": old_queries, "after": new_queries, "change_pct": change_pct(old_queries, new_queries)
+        }
+        result[name] = rows
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as fh:
+        before = json.load(fh)
+    with open(args.after, encoding="utf-8") as fh:
+        after = json.load(fh)
+    print(json.dumps({
+        "before_commit": before.get("commit"),
+        "after_commit": after.get("commit"),
+        "scenarios": compare(before, after),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
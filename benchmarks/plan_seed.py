@@ -0,0 +1,68 @@
+"""Sorgu planı kontrolleri için sentetik veri (tek transaction, sonunda geri alınır).
+
+Planlayıcının gerçekçi boyutlu tablolarla karar vermesi için users ve donations
+tek bir transaction içinde sentetik satırlarla doldurulur ve ANALYZE edilir.
+Oturum kapanırken transaction geri alınır; veritabanında kalıcı veri kalmaz
+(istatistikler gerçek tabloya göre yeniden hesaplanır). Yerel bir PostGIS
+veritabanında (DATABASE_URL) migration'lar uygulanmış olarak kullanılmalıdır.
+
+tests/conftest.py (seeded_db) ve benchmarks/check_query_plans.py kullanır.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from backend.config.database import SessionLocal
+
+DEFAULT_SEED = {"users": 20000, "donations": 200000, "lat": 41.0, "lng": 29.0, "spread": 0.6}
+
+SEED_USERS = """
+INSERT INTO users (full_name, email, password_hash, user_type)
+SELECT 'Plan Kontrol ' || g, 'plan-check-' || g || '@example.com', 'x',
+       (ARRAY['donor', 'recipient', 'shelter_volunteer'])[1 + g % 3]
+FROM generate_series(1, :users) AS g
+"""
+
+# Bağışların %10'u teslim alınmış, %20'si rezerve, %2'si silinmiş,
+# üçte birinin son kullanma tarihi var (bir kısmı geçmiş)
+SEED_DONATIONS = """
+INSERT INTO donations (donor_id, reserved_by, title, category, is_reserved, is_collected,
+                       location, created_at, updated_at, expiration_date, deleted_at)
+SELECT u.first_id + g % :users,
+       CASE WHEN g % 5 = 0 THEN u.first_id + (g * 7) % :users END,
+       'Plan bağışı ' || g,
+       (ARRAY['temiz yemek', 'atık yemek'])[1 + g % 2],
+       g % 5 = 0,
+       g % 10 = 0,
+       ST_SetSRID(ST_MakePoint(:lng + (random() - 0.5) * :spread, :lat + (random() - 0.5) * :spread), 4326),
+       now() - random() * interval '30 days',
+       now() - random() * interval '30 days',
+       CASE WHEN g % 3 = 0 THEN now() + (random() - 0.2) * interval '10 days' END,
+       CASE WHEN g % 50 = 0 THEN now() END
+FROM generate_series(1, :donations) AS g,
+     (SELECT min(id) AS first_id FROM users WHERE email LIKE 'plan-check-%') AS u
+"""
+
+
+# Sentetik veriyle doldurulmuş oturum
+# -------------------------
+# Seed + plan aynı transaction'dadır; çıkışta geri alınır.
+@contextmanager
+def seeded_session(users: int, donations: int, lat: float, lng: float, spread: float):
+    db = SessionLocal()
+    try:
+        db.execute(text("SET LOCAL statement_timeout = 0"))
+        db.execute(text(SEED_USERS), {"users": users})
+        db.execute(text(SEED_DONATIONS), {
+            "users": users, "donations": donations, "lat": lat, "lng": lng, "spread": spread,
+        })
+        db.execute(text("ANALYZE donations"))
+        db.execute(text("ANALYZE users"))
+        yield db
+    finally:
+        db.rollback()
+        # ANALYZE'ın pg_class'a yazdığı satır sayıları geri alınmaz; gerçek tabloya göre yenile
+        db.execute(text("ANALYZE donations"))
+        db.execute(text("ANALYZE users"))
+        db.commit()
+        db.close()
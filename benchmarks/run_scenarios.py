@@ -0,0 +1,249 @@
+"""Senaryo bazlı yük testi: harita gezintisi, login patlaması, rezervasyon yarışı, toplu ilan.
+
+Çalışan bir API'ye (uvicorn backend.main:app) benchmarks.seed ile üretilmiş
+veri üzerinde eşzamanlı istemcilerle yüklenir. Senaryolar sırayla çalışır;
+her biri için iş yükü başına p50/p95/p99, throughput, status dağılımı ve
+istek başına veritabanı sorgusu raporlanır.
+
+İstek başına sorgu sayısı pg_stat_statements'tan (senaryo öncesi/sonrası fark)
+hesaplanır; eklenti yoksa null döner. Arka plan görevleri (indeks yenileme,
+arşiv süpürücüsü) de sayıma girer, karşılaştırmalar aynı ayarlarla yapılmalı.
+
+Sunucu RATE_LIMIT_ENABLED=0 ile başlatılmalı; aksi halde login patlaması ve
+yarış senaryoları kullanıcı/IP limitlerini ölçer (429'lar status'ta görünür).
+
+Çıktı JSON'dur ve commit'ler arasında benchmarks.compare ile karşılaştırılabilir.
+Yazma yapan senaryolar veriyi değiştirdiği için her koşudan önce seed yeniden çalıştırılmalı:
+
+    python -m benchmarks.seed --out bench-seed.json
+    python -m benchmarks.run_scenarios --manifest bench-seed.json --out before.json
+"""
+import argparse
+import json
+import random
+import subprocess
+import threading
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from sqlalchemy import text
+
+from benchmarks.common import Workload, login, request, run_concurrently
+
+SCENARIOS = ("map_browse", "login_burst", "reservation_race", "bulk_post")
+
+STATEMENTS_SQL = text(r"""
+SELECT coalesce(sum(calls), 0) FROM pg_stat_statements
+WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+  AND query ~* '^\s*(select|insert|update|delete|with)'
+  AND query NOT LIKE '%pg_stat_statements%'
+""")
+
+
+# Veritabanındaki toplam sorgu sayısı (pg_stat_statements yoksa None)
+def statement_count() -> int | None:
+    from backend.config.database import engine
+
+    try:
+        with engine.connect() as conn:
+            return int(conn.execute(STATEMENTS_SQL).scalar())
+    except Exception:
+        return None
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Sıcak noktalardan ağırlıklı rastgele bir konum (biraz kaydırılmış)
+def random_location(manifest: dict) -> tuple[float, float]:
+    spot = random.choices(manifest["hotspots"], [s["weight"] for s in manifest["hotspots"]])[0]
+    return spot["latitude"] + random.gauss(0, 0.005), spot["longitude"] + random.gauss(0, 0.005)
+
+
+# Kullanıcı tipi başına ilk n kullanıcı için token
+def tokens_for(base_url: str, manifest: dict, user_type: str, count: int) -> list[str]:
+    return [login(base_url, email, manifest["password"]) for email in manifest["users"][user_type][:count]]
+
+
+# Thread başına sabit token (istemci = kullanıcı)
+class TokenPool:
+    def __init__(self, tokens: list[str]):
+        self._tokens = tokens
+        self._next = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def get(self) -> str:
+        if not hasattr(self._local, "token"):
+            with self._lock:
+                self._local.token = self._tokens[self._next % len(self._tokens)]
+                self._next += 1
+        return self._local.token
+
+
+# Harita: yakındaki açık ilanlar (mesafe sıralı) + görünen alanın kümeleri
+def map_browse(args, manifest: dict) -> dict:
+    tokens = TokenPool(
+        tokens_for(args.base_url, manifest, "recipient", args.concurrency)
+        + tokens_for(args.base_url, manifest, "shelter_volunteer", args.concurrency)
+        + tokens_for(args.base_url, manifest, "donor", args.concurrency)
+    )
+
+    def nearby_job():
+        latitude, longitude = random_location(manifest)
+        path = (
+            f"/donations/?latitude={latitude:.6f}&longitude={longitude:.6f}"
+            f"&radius_km=2&order=distance&open_only=true&limit=50"
+        )
+        status, _, elapsed = request(args.base_url, "GET", path, token=tokens.get())
+        return status, elapsed
+
+    def clusters_job():
+        latitude, longitude = random_location(manifest)
+        zoom = random.choice((12, 13, 14, 15))
+        half = 180.0 / (2 ** zoom) * 2
+        bbox = f"{longitude - half:.6f},{latitude - half:.6f},{longitude + half:.6f},{latitude + half:.6f}"
+        status, _, elapsed = request(
+            args.base_url, "GET", f"/donations/clusters?bbox={bbox}&zoom={zoom}&open_only=true", token=tokens.get()
+        )
+        return status, elapsed
+
+    return run_concurrently([
+        Workload("nearby", nearby_job, args.concurrency),
+        Workload("clusters", clusters_job, max(1, args.concurrency // 2)),
+    ], args.duration)
+
+
+# Login patlaması: tüm kullanıcı tiplerinden rastgele kullanıcılar
+def login_burst(args, manifest: dict) -> dict:
+    emails = [email for users in manifest["users"].values() for email in users]
+
+    def login_job():
+        body = {"email": random.choice(emails), "password": manifest["password"]}
+        status, _, elapsed = request(args.base_url, "POST", "/auth/login", body)
+        return status, elapsed
+
+    return run_concurrently([Workload("login", login_job, args.login_concurrency)], args.duration)
+
+
+# Rezervasyon yarışı: en yoğun sıcak noktadaki K açık "temiz yemek" ilanına N alıcı aynı anda
+# Sonunda her ilan için en fazla bir kazanan olmalı (double_reservations boş)
+def reservation_race(args, manifest: dict) -> dict:
+    donor = tokens_for(args.base_url, manifest, "donor", 1)[0]
+    spot = manifest["hotspots"][0]
+    _, payload, _ = request(
+        args.base_url, "GET",
+        f"/donations/?latitude={spot['latitude']}&longitude={spot['longitude']}"
+        f"&radius_km=5&order=distance&open_only=true&limit=200&fields=id,is_reserved"
+        f"&category={quote('temiz yemek')}",
+        token=donor
+    )
+    donation_ids = [row["id"] for row in (payload or {}).get("data", []) if not row["is_reserved"]]
+    donation_ids = donation_ids[:args.race_donations]
+    if not donation_ids:
+        raise RuntimeError("reservation_race: no open donations near the first hotspot")
+
+    recipients = tokens_for(args.base_url, manifest, "recipient", args.race_clients)
+    pool = TokenPool(list(range(len(recipients))))
+    winners: dict[int, set[int]] = {donation_id: set() for donation_id in donation_ids}
+    lock = threading.Lock()
+
+    def reserve_job():
+        index = pool.get()
+        donation_id = random.choice(donation_ids)
+        status, _, elapsed = request(
+            args.base_url, "POST", f"/donations/{donation_id}/reserve", token=recipients[index]
+        )
+        if status == 200:
+            with lock:
+                winners[donation_id].add(index)
+        return status, elapsed
+
+    result = run_concurrently([Workload("reserve", reserve_job, len(recipients))], args.duration)
+    result["double_reservations"] = [
+        {"donation_id": donation_id, "winners": len(users)}
+        for donation_id, users in winners.items() if len(users) > 1
+    ]
+    result["donations"] = len(donation_ids)
+    return result
+
+
+# Toplu ilan: bağışçılar POST /donations/bulk ile bulk_size'lık partiler gönderir
+def bulk_post(args, manifest: dict) -> dict:
+    tokens = TokenPool(tokens_for(args.base_url, manifest, "donor", args.concurrency))
+
+    def bulk_job():
+        items = []
+        for i in range(args.bulk_size):
+            latitude, longitude = random_location(manifest)
+            items.append({
+                "title": f"Toplu benchmark ilanı {i}",
+                "category": random.choice(("temiz yemek", "atık yemek")),
+                "quantity": "5 porsiyon",
+                "latitude": latitude,
+                "longitude": longitude,
+            })
+        status, _, elapsed = request(args.base_url, "POST", "/donations/bulk", items, token=tokens.get())
+        return status, elapsed
+
+    return run_concurrently([Workload("bulk", bulk_job, args.concurrency)], args.duration)
+
+
+# Senaryoyu çalıştır ve istek başına sorgu sayısını ekle
+def run_scenario(name: str, args, manifest: dict) -> dict:
+    before = statement_count()
+    result = globals()[name](args, manifest)
+    after = statement_count()
+    requests = sum(summary["requests"] for key, summary in result.items() if isinstance(summary, dict))
+    result["db_queries_per_request"] = (
+        round((after - before) / requests, 2) if before is not None and after is not None and requests else None
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default="bench-seed.json")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=20.0, help="Senaryo başına süre (saniye)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--race-clients", type=int, default=32)
+    parser.add_argument("--race-donations", type=int, default=5)
+    parser.add_argument("--bulk-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="Sonuç dosyası (verilmezse stdout)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    with open(args.manifest, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    random.seed(args.seed)
+
+    output = {
+        "benchmark": "scenarios",
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "params": vars(args),
+        "seed_params": manifest.get("params"),
+        "scenarios": {name: run_scenario(name, args, manifest) for name in names},
+    }
+    body = json.dumps(output, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(body + "\n")
+    else:
+        print(body)
+
+
+if __name__ == "__main__":
+    main()
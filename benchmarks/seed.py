@@ -0,0 +1,175 @@
+"""Benchmark verisi: her kullanıcı tipinden N kullanıcı, M kümelenmiş bağış.
+
+Yerel bir PostGIS veritabanına (DATABASE_URL) doğrudan yazar. Bağışlar şehir
+merkezi etrafına dağılmış K sıcak noktada toplanır (nokta başına ağırlık
+Zipf benzeri, nokta içinde normal dağılım); gerçek haritadaki gibi birkaç
+yoğun mahalle ve seyrek bir arka plan oluşur. Aynı --seed aynı veriyi üretir.
+
+Tüm kullanıcıların şifresi --password'dür (hash bir kez hesaplanır).
+Çıktı: run_scenarios'un okuduğu manifest JSON'u (kullanıcılar, sıcak noktalar, bbox).
+
+    python -m benchmarks.seed --users-per-type 200 --donations 50000 --out bench-seed.json
+    python -m benchmarks.seed --reset   # önceki benchmark verisini sil
+"""
+import argparse
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, or_, select, text
+
+from backend.config.database import SessionLocal
+from backend.models.donation import Donation
+from backend.models.user import User
+from backend.schemas.user import UserType
+from backend.services.spatial_index import METERS_PER_DEGREE
+from backend.utils.hash import hash_password
+
+EMAIL_DOMAIN = "bench.example.com"
+CATEGORIES = ("temiz yemek", "atık yemek")
+INSERT_BATCH = 1000
+
+
+def user_email(user_type: str, index: int) -> str:
+    return f"{user_type}-{index}@{EMAIL_DOMAIN}"
+
+
+# Sıcak noktalar: merkez etrafında spread_km yarıçapında, ağırlıkları 1/sıra
+def make_hotspots(rng: random.Random, center: tuple[float, float], spread_km: float, count: int) -> list[dict]:
+    lat0, lng0 = center
+    hotspots = []
+    for rank in range(1, count + 1):
+        distance_m = spread_km * 1000 * math.sqrt(rng.random())
+        bearing = rng.uniform(0, 2 * math.pi)
+        hotspots.append({
+            "latitude": lat0 + distance_m * math.cos(bearing) / METERS_PER_DEGREE,
+            "longitude": lng0 + distance_m * math.sin(bearing) / (METERS_PER_DEGREE * math.cos(math.radians(lat0))),
+            "sigma_m": rng.uniform(300, 1500),
+            "weight": 1.0 / rank,
+        })
+    return hotspots
+
+
+# Bir bağış konumu: %85 bir sıcak noktanın etrafında, %15 tüm alanda rastgele
+def make_point(rng: random.Random, hotspots: list[dict], weights: list[float], center, spread_km: float):
+    if rng.random() < 0.15:
+        spot = {"latitude": center[0], "longitude": center[1], "sigma_m": spread_km * 500}
+    else:
+        spot = rng.choices(hotspots, weights)[0]
+    coslat = math.cos(math.radians(spot["latitude"]))
+    return (
+        spot["latitude"] + rng.gauss(0, spot["sigma_m"]) / METERS_PER_DEGREE,
+        spot["longitude"] + rng.gauss(0, spot["sigma_m"]) / (METERS_PER_DEGREE * coslat),
+    )
+
+
+def seed_users(db, per_type: int, password_hash: str) -> dict[str, list[int]]:
+    ids = {}
+    for user_type in UserType:
+        rows = [
+            {
+                "full_name": f"Benchmark {user_type.value} {i}",
+                "email": user_email(user_type.value, i),
+                "password_hash": password_hash,
+                "user_type": user_type.value,
+            }
+            for i in range(per_type)
+        ]
+        ids[user_type.value] = [
+            row.id for row in db.execute(insert(User).values(rows).returning(User.id)).all()
+        ] if rows else []
+    db.commit()
+    return ids
+
+
+# Bağışlar: %10 teslim alınmış, %15 rezerve, üçte birinde son kullanma tarihi
+def seed_donations(db, rng: random.Random, count: int, donors: list[int], recipients: list[int],
+                   hotspots: list[dict], center, spread_km: float):
+    weights = [spot["weight"] for spot in hotspots]
+    now = datetime.now(timezone.utc)
+    for start in range(0, count, INSERT_BATCH):
+        values = []
+        for i in range(start, min(start + INSERT_BATCH, count)):
+            latitude, longitude = make_point(rng, hotspots, weights, center, spread_km)
+            collected = rng.random() < 0.10
+            reserved = collected or rng.random() < 0.15
+            values.append({
+                "donor_id": rng.choice(donors),
+                "reserved_by": rng.choice(recipients) if reserved and recipients else None,
+                "title": f"Benchmark bağışı {i}",
+                "description": "Benchmark için üretilmiş ilan",
+                "category": rng.choice(CATEGORIES),
+                "quantity": f"{rng.randint(1, 20)} porsiyon",
+                "is_for_animals": rng.random() < 0.2,
+                "is_reserved": reserved,
+                "is_collected": collected,
+                "expiration_date": now + timedelta(hours=rng.uniform(2, 240)) if rng.random() < 0.33 else None,
+                "location": func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+            })
+        db.execute(insert(Donation).values(values))
+        db.commit()
+
+
+# Önceki benchmark kullanıcılarını ve bağışlarını sil
+def reset(db):
+    users = select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+    db.execute(delete(Donation).where(or_(Donation.donor_id.in_(users), Donation.reserved_by.in_(users))))
+    db.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users-per-type", type=int, default=100)
+    parser.add_argument("--donations", type=int, default=20000)
+    parser.add_argument("--hotspots", type=int, default=25)
+    parser.add_argument("--latitude", type=float, default=41.0082)
+    parser.add_argument("--longitude", type=float, default=28.9784)
+    parser.add_argument("--spread-km", type=float, default=15.0)
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Sadece önceki benchmark verisini sil")
+    parser.add_argument("--out", default="bench-seed.json")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        reset(db)
+        if args.reset:
+            return
+
+        rng = random.Random(args.seed)
+        center = (args.latitude, args.longitude)
+        hotspots = make_hotspots(rng, center, args.spread_km, args.hotspots)
+        user_ids = seed_users(db, args.users_per_type, hash_password(args.password))
+        seed_donations(
+            db, rng, args.donations, user_ids[UserType.donor.value],
+            user_ids[UserType.recipient.value] + user_ids[UserType.shelter_volunteer.value],
+            hotspots, center, args.spread_km
+        )
+        # Planlayıcı istatistikleri yeni veriyi görsün
+        db.execute(text("ANALYZE donations"))
+        db.execute(text("ANALYZE users"))
+        db.commit()
+    finally:
+        db.close()
+
+    span = args.spread_km * 1000 / METERS_PER_DEGREE
+    manifest = {
+        "params": {name: value for name, value in vars(args).items() if name != "password"},
+        "password": args.password,
+        "users": {
+            user_type: [user_email(user_type, i) for i in range(args.users_per_type)]
+            for user_type in user_ids
+        },
+        "hotspots": hotspots,
+        "bbox": [args.longitude - span, args.latitude - span, args.longitude + span, args.latitude + span],
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=2)
+    print(json.dumps({"users": sum(map(len, user_ids.values())), "donations": args.donations, "manifest": args.out}))
+
+
+if __name__ == "__main__":
+    main()
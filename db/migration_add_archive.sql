@@ -0,0 +1,90 @@
+-- Bağış yaşam döngüsü: son kullanma tarihi ve arşiv
+-- 1. expiration_date: geçen ilanlar listelerde/haritada görünmez.
+-- 2. donations_archive: teslim alınan/silinen/süresi dolan ilanlar
+--    ARCHIVE_RETENTION_HOURS sonra arka plan süpürücüsüyle buraya taşınır
+--    (backend/services/donation_archive.py). Canlı tablo ve GIST indeksleri
+--    böylece geçmişle değil aktif ilan sayısıyla büyür.
+--    Aylık partition'lar (archived_at); eski aylar DETACH/DROP ile atılabilir.
+-- Önce migration_add_soft_delete.sql uygulanmalı (deleted_at kolonu ve
+-- updated_at trigger'ı); uygulamada ARCHIVE_ENABLED=1 bu migration'dan sonra açılır.
+
+ALTER TABLE donations ADD COLUMN IF NOT EXISTS expiration_date TIMESTAMP WITH TIME ZONE;
+
+-- Süresi dolan açık ilanları bulmak için (süpürücünün "expire" adımı)
+CREATE INDEX IF NOT EXISTS idx_donations_expiration
+ON donations (expiration_date)
+WHERE deleted_at IS NULL AND is_collected IS NOT TRUE AND expiration_date IS NOT NULL;
+
+-- Arşive taşınacak adaylar
+-- Sadece kapanmış (teslim alınmış / silinmiş) ilanlar indekste; süresi dolmuş
+-- açık ilanlar idx_donations_expiration'dan gelir (süpürücü sorgusu iki kolu
+-- ayrı yazar, planlayıcı BitmapOr ile birleştirir).
+CREATE INDEX IF NOT EXISTS idx_donations_archivable
+ON donations (updated_at)
+WHERE is_collected IS TRUE OR deleted_at IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS donations_archive (
+    id INTEGER NOT NULL,
+    donor_id INTEGER,
+    reserved_by INTEGER,
+    title VARCHAR(150) NOT NULL,
+    description TEXT,
+    category VARCHAR(50),
+    quantity VARCHAR(50),
+    is_for_animals BOOLEAN,
+    is_reserved BOOLEAN,
+    is_collected BOOLEAN,
+    location GEOMETRY(Point, 4326) NOT NULL,
+    expiration_date TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    deleted_at TIMESTAMP WITH TIME ZONE,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    archive_reason VARCHAR(20) NOT NULL,          -- deleted / collected / expired
+    PRIMARY KEY (id, archived_at)
+) PARTITION BY RANGE (archived_at);
+
+-- Partition'ı henüz oluşturulmamış aylar için güvenlik ağı
+CREATE TABLE IF NOT EXISTS donations_archive_default PARTITION OF donations_archive DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_donations_archive_donor_id ON donations_archive (donor_id);
+
+-- Verilen zamanın ayı için partition (yoksa) oluştur: donations_archive_YYYY_MM
+-- Süpürücü her turda bu ay ve gelecek ay için çağırır (partition'lar ay
+-- başlamadan hazırdır); partition zaten varsa üst tabloya kilit alınmaz.
+CREATE OR REPLACE FUNCTION ensure_donations_archive_partition(ts TIMESTAMP WITH TIME ZONE)
+RETURNS void AS $$
+DECLARE
+    month_start TIMESTAMP WITH TIME ZONE := date_trunc('month', ts);
+    partition_name TEXT := 'donations_archive_' || to_char(ts, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    -- Aynı ayı aynı anda oluşturmaya çalışan süpürücüler sıraya girer
+    PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    -- Default partition'da bu aya ait satır varsa PARTITION OF hata verir;
+    -- önce ayrı tablo kurulur, satırlar default'tan taşınır, sonra bağlanır.
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE donations_archive INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM donations_archive_default WHERE archived_at >= %L AND archived_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        month_start, month_start + interval '1 month', partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE donations_archive ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_start + interval '1 month'
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_donations_archive_partition(now());
+SELECT ensure_donations_archive_partition(now() + interval '1 month');
+
+ANALYZE donations;
@@ -0,0 +1,22 @@
+-- Tablo bazlı değişiklik sayacı (ETag / Last-Modified için)
+-- donations üzerinde satır değiştiren her yazmadan sonra sayaç bir artırılır.
+-- GET uçları önce bu tek satırlık birincil anahtar okumasını yapar; sayaç
+-- değişmemişse liste sorgusu çalıştırılmadan 304 döner.
+-- Uygulamada HTTP_VALIDATORS_ENABLED=1 bu migration uygulandıktan sonra açılır.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO table_versions (table_name) VALUES ('donations')
+ON CONFLICT (table_name) DO NOTHING;
+
+-- Sayaç uygulama tarafından, yazma commit edildikten sonra ayrı ve kısa bir
+-- transaction'da artırılır (backend/services/donation_events.py: bump_version).
+-- Trigger kullanılmaz: her yazan transaction commit'e kadar bu tek satırın
+-- kilidinde sıraya girerdi.
+-- Uygulama dışından (elle SQL) yapılan yazmalardan sonra sayaç elle artırılmalı:
+--   UPDATE table_versions SET version = version + 1, changed_at = clock_timestamp()
+--   WHERE table_name = 'donations';
@@ -0,0 +1,47 @@
+-- Canlı değişiklik akışı: donations üzerindeki her satır değişikliği
+-- commit edildiğinde 'donation_changes' kanalına NOTIFY gönderilir.
+-- Uygulama worker'ları bu kanalı LISTEN ederek WebSocket/SSE abonelerine dağıtır
+-- (CHANGE_FEED_BACKEND=postgres). Payload hafiftir: tür, id, konum, kategori, durum.
+
+CREATE OR REPLACE FUNCTION notify_donation_change() RETURNS trigger AS $$
+DECLARE
+    rec donations;
+    kind TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+        kind := 'delete';
+    ELSE
+        rec := NEW;
+        IF TG_OP = 'INSERT' THEN
+            kind := 'create';
+        ELSIF NEW.is_collected IS TRUE AND OLD.is_collected IS NOT TRUE THEN
+            kind := 'collect';
+        ELSIF NEW.is_reserved IS TRUE AND OLD.is_reserved IS NOT TRUE THEN
+            kind := 'reserve';
+        ELSIF NEW.is_reserved IS NOT TRUE AND OLD.is_reserved IS TRUE THEN
+            kind := 'cancel';
+        ELSE
+            kind := 'update';
+        END IF;
+    END IF;
+
+    PERFORM pg_notify('donation_changes', json_build_object(
+        'type', kind,
+        'id', rec.id,
+        'latitude', ST_Y(rec.location),
+        'longitude', ST_X(rec.location),
+        'category', rec.category,
+        'is_reserved', rec.is_reserved,
+        'is_collected', rec.is_collected,
+        'updated_at', rec.updated_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS donations_notify_change ON donations;
+
+CREATE TRIGGER donations_notify_change
+AFTER INSERT OR UPDATE OR DELETE ON donations
+FOR EACH ROW EXECUTE FUNCTION notify_donation_change();
@@ -0,0 +1,9 @@
+-- Metre cinsinden yarıçap/mesafe sorguları için geography ifade indeksi
+-- location geometry(Point,4326) olarak saklanır (birimi derece).
+-- Sorgular (location::geography) üzerinden ST_DWithin / <-> kullanır,
+-- bu indeks olmadan her yarıçap sorgusu tüm tabloyu tarar.
+
+CREATE INDEX IF NOT EXISTS idx_donations_location_geog
+ON donations USING GIST ((location::geography));
+
+ANALYZE donations;
@@ -0,0 +1,72 @@
+-- Delta senkronizasyon (GET /donations/changes) için:
+-- 1. Silme artık satırı kaldırmaz, deleted_at doldurulur (tombstone).
+-- 2. updated_at her UPDATE'te veritabanında güncellenir (uygulama dışı
+--    yazmalar dahil); senkron token'ı bu kolona dayanır.
+-- 3. (updated_at, id) indeksi: değişiklik sorgusu alanın tamamını değil,
+--    sadece token'dan sonraki değişiklikleri tarar.
+-- 4. previous_category: rol kategorisi filtresi SQL'de uygulanır; kategorisi
+--    değişen bir ilan eski kategorinin kullanıcılarına tombstone olarak gider.
+--    Son kategori değişikliğinden önceki değer aynı trigger'da tutulur ve
+--    yapışkandır: sonraki güncellemeler silmez, böylece iki senkron arasında
+--    kategori değişikliğinden sonra başka bir güncelleme olsa da tombstone kaçmaz.
+
+ALTER TABLE donations ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE donations ADD COLUMN IF NOT EXISTS previous_category VARCHAR(50);
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    IF NEW.category IS DISTINCT FROM OLD.category THEN
+        NEW.previous_category := OLD.category;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS donations_touch_updated_at ON donations;
+
+CREATE TRIGGER donations_touch_updated_at
+BEFORE UPDATE ON donations
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_donations_updated_at ON donations (updated_at, id);
+
+-- Canlı akış: deleted_at dolduran UPDATE bir 'delete' olayıdır
+CREATE OR REPLACE FUNCTION notify_donation_change() RETURNS trigger AS $$
+DECLARE
+    rec donations;
+    kind TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+        kind := 'delete';
+    ELSE
+        rec := NEW;
+        IF TG_OP = 'INSERT' THEN
+            kind := 'create';
+        ELSIF NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN
+            kind := 'delete';
+        ELSIF NEW.is_collected IS TRUE AND OLD.is_collected IS NOT TRUE THEN
+            kind := 'collect';
+        ELSIF NEW.is_reserved IS TRUE AND OLD.is_reserved IS NOT TRUE THEN
+            kind := 'reserve';
+        ELSIF NEW.is_reserved IS NOT TRUE AND OLD.is_reserved IS TRUE THEN
+            kind := 'cancel';
+        ELSE
+            kind := 'update';
+        END IF;
+    END IF;
+
+    PERFORM pg_notify('donation_changes', json_build_object(
+        'type', kind,
+        'id', rec.id,
+        'latitude', ST_Y(rec.location),
+        'longitude', ST_X(rec.location),
+        'category', rec.category,
+        'is_reserved', rec.is_reserved,
+        'is_collected', rec.is_collected,
+        'updated_at', rec.updated_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,36 @@
+-- Uygulamanın gerçekte çalıştırdığı sorgulara göre indeksler
+-- Planların kontrolü: python -m benchmarks.check_query_plans
+--
+-- users.email için ayrı indeks gerekmez: UNIQUE kısıtı (users_email_key)
+-- login sorgusunu zaten karşılar.
+
+-- Kategori + konum tek GIST indeksinde (btree_gist ile text kolon)
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- 1. Açık bağışlar, yakındakiler (GET /donations?open_only=1&latitude=..)
+-- Partial: teslim alınmış/silinmiş satırlar indekse girmez; tablo büyüdükçe
+-- indeks açık ilan sayısıyla orantılı kalır. WHERE koşulu sorgulardaki
+-- "is_collected IS NOT true AND deleted_at IS NULL" ile birebir aynıdır.
+CREATE INDEX IF NOT EXISTS idx_donations_open_geog
+ON donations USING GIST ((location::geography))
+WHERE is_collected IS NOT TRUE AND deleted_at IS NULL;
+
+-- 2. Rolün zorladığı kategori + açık + yakındakiler (recipient / shelter_volunteer
+-- her listede kategori filtresiyle gelir); ST_DWithin ve <-> KNN sıralaması
+CREATE INDEX IF NOT EXISTS idx_donations_open_category_geog
+ON donations USING GIST (category, (location::geography))
+WHERE is_collected IS NOT TRUE AND deleted_at IS NULL;
+
+-- 3. Konumsuz liste: kategori filtresi + id keyset sayfalama (ORDER BY id)
+CREATE INDEX IF NOT EXISTS idx_donations_category_id
+ON donations (category, id)
+WHERE deleted_at IS NULL;
+
+-- 4. Yabancı anahtarlar: users satırı silinirken/güncellenirken referans
+-- kontrolü donations tablosunu taramasın
+CREATE INDEX IF NOT EXISTS idx_donations_donor_id ON donations (donor_id);
+CREATE INDEX IF NOT EXISTS idx_donations_reserved_by
+ON donations (reserved_by)
+WHERE reserved_by IS NOT NULL;
+
+ANALYZE donations;
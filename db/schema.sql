@@ -19,6 +19,7 @@ CREATE TABLE donations (
     title VARCHAR(150) NOT NULL,                  -- Örneğin: "3 kg Domates", "Kafe Artık Yemekleri"
     description TEXT,                             -- Detaylı açıklama
     category VARCHAR(50),                         -- Kategori (Gıda, Giyim, vb.)
+    previous_category VARCHAR(50),                -- Son kategori değişikliğinden önceki değer (trigger)
     quantity VARCHAR(50),                         -- Miktar (ör: "5 porsiyon", "1 kutu", "Bilinmiyor")
     is_for_animals BOOLEAN DEFAULT FALSE,         -- Hayvan barınağı için mi?
     is_reserved BOOLEAN DEFAULT FALSE,            -- İlan rezerve edildi mi?
@@ -29,7 +30,9 @@ CREATE TABLE donations (
     location GEOMETRY(Point, 4326) NOT NULL,
     
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    expiration_date TIMESTAMP WITH TIME ZONE,     -- Son kullanma (geçince listelenmez, sonra arşivlenir)
+    deleted_at TIMESTAMP WITH TIME ZONE           -- Silinme zamanı (NULL = aktif, doluysa tombstone)
 );
 
 -- Eğer tablo zaten varsa, category kolonunu eklemek için:
@@ -37,4 +40,166 @@ CREATE TABLE donations (
 
 -- 3. KONUM SORGULARINI HIZLANDIRMAK İÇİN İNDEKSLER
 -- GIST indeksi, PostGIS coğrafi sorgularını (ST_DWithin gibi) çok hızlı yapar.
-CREATE INDEX idx_donations_location ON donations USING GIST (location);
\ No newline at end of file
+CREATE INDEX idx_donations_location ON donations USING GIST (location);
+
+-- Metre cinsinden yarıçap sorguları (ST_DWithin / <-> geography) için ifade indeksi
+CREATE INDEX idx_donations_location_geog ON donations USING GIST ((location::geography));
+
+-- Sorgu yüküne göre indeksler (bkz. migration_add_workload_indexes.sql)
+-- Açık bağışlar: partial GIST, kategori + konum için btree_gist
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+CREATE INDEX idx_donations_open_geog ON donations USING GIST ((location::geography))
+WHERE is_collected IS NOT TRUE AND deleted_at IS NULL;
+CREATE INDEX idx_donations_open_category_geog ON donations USING GIST (category, (location::geography))
+WHERE is_collected IS NOT TRUE AND deleted_at IS NULL;
+CREATE INDEX idx_donations_category_id ON donations (category, id) WHERE deleted_at IS NULL;
+CREATE INDEX idx_donations_donor_id ON donations (donor_id);
+CREATE INDEX idx_donations_reserved_by ON donations (reserved_by) WHERE reserved_by IS NOT NULL;
+
+
+-- 4. DEĞİŞİKLİK SAYACI (ETag / Last-Modified, bkz. migration_add_change_counter.sql)
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO table_versions (table_name) VALUES ('donations')
+ON CONFLICT (table_name) DO NOTHING;
+
+-- Sayaç uygulama tarafından, yazma commit edildikten sonra ayrı ve kısa bir
+-- transaction'da artırılır (trigger yok; yazanlar sayaç satırında sıraya girmez).
+
+
+-- 5. CANLI DEĞİŞİKLİK AKIŞI (LISTEN/NOTIFY, bkz. migration_add_change_feed.sql)
+CREATE OR REPLACE FUNCTION notify_donation_change() RETURNS trigger AS $$
+DECLARE
+    rec donations;
+    kind TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+        kind := 'delete';
+    ELSE
+        rec := NEW;
+        IF TG_OP = 'INSERT' THEN
+            kind := 'create';
+        ELSIF NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN
+            kind := 'delete';
+        ELSIF NEW.is_collected IS TRUE AND OLD.is_collected IS NOT TRUE THEN
+            kind := 'collect';
+        ELSIF NEW.is_reserved IS TRUE AND OLD.is_reserved IS NOT TRUE THEN
+            kind := 'reserve';
+        ELSIF NEW.is_reserved IS NOT TRUE AND OLD.is_reserved IS TRUE THEN
+            kind := 'cancel';
+        ELSE
+            kind := 'update';
+        END IF;
+    END IF;
+
+    PERFORM pg_notify('donation_changes', json_build_object(
+        'type', kind,
+        'id', rec.id,
+        'latitude', ST_Y(rec.location),
+        'longitude', ST_X(rec.location),
+        'category', rec.category,
+        'is_reserved', rec.is_reserved,
+        'is_collected', rec.is_collected,
+        'updated_at', rec.updated_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS donations_notify_change ON donations;
+
+CREATE TRIGGER donations_notify_change
+AFTER INSERT OR UPDATE OR DELETE ON donations
+FOR EACH ROW EXECUTE FUNCTION notify_donation_change();
+
+-- 6. DELTA SENKRONİZASYON (bkz. migration_add_soft_delete.sql)
+-- updated_at her UPDATE'te veritabanında güncellenir; (updated_at, id) indeksi
+-- GET /donations/changes sorgusunu değişiklik sayısıyla orantılı tutar.
+-- previous_category: kategorisi değişen ilan eski kategoriye tombstone olarak gider.
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    IF NEW.category IS DISTINCT FROM OLD.category THEN
+        NEW.previous_category := OLD.category;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER donations_touch_updated_at
+BEFORE UPDATE ON donations
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE INDEX idx_donations_updated_at ON donations (updated_at, id);
+
+
+-- 7. ARŞİV (bkz. migration_add_archive.sql)
+-- Teslim alınan/silinen/süresi dolan ilanlar ARCHIVE_RETENTION_HOURS sonra
+-- aylık partition'lı donations_archive tablosuna taşınır.
+CREATE INDEX idx_donations_expiration ON donations (expiration_date)
+WHERE deleted_at IS NULL AND is_collected IS NOT TRUE AND expiration_date IS NOT NULL;
+
+-- Kapanmış ilanlar; süresi dolmuş açık ilanlar idx_donations_expiration'dan gelir
+CREATE INDEX idx_donations_archivable ON donations (updated_at)
+WHERE is_collected IS TRUE OR deleted_at IS NOT NULL;
+
+CREATE TABLE donations_archive (
+    id INTEGER NOT NULL,
+    donor_id INTEGER,
+    reserved_by INTEGER,
+    title VARCHAR(150) NOT NULL,
+    description TEXT,
+    category VARCHAR(50),
+    quantity VARCHAR(50),
+    is_for_animals BOOLEAN,
+    is_reserved BOOLEAN,
+    is_collected BOOLEAN,
+    location GEOMETRY(Point, 4326) NOT NULL,
+    expiration_date TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    deleted_at TIMESTAMP WITH TIME ZONE,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    archive_reason VARCHAR(20) NOT NULL,
+    PRIMARY KEY (id, archived_at)
+) PARTITION BY RANGE (archived_at);
+
+CREATE TABLE donations_archive_default PARTITION OF donations_archive DEFAULT;
+CREATE INDEX idx_donations_archive_donor_id ON donations_archive (donor_id);
+
+CREATE OR REPLACE FUNCTION ensure_donations_archive_partition(ts TIMESTAMP WITH TIME ZONE)
+RETURNS void AS $$
+DECLARE
+    month_start TIMESTAMP WITH TIME ZONE := date_trunc('month', ts);
+    partition_name TEXT := 'donations_archive_' || to_char(ts, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    -- Aynı ayı aynı anda oluşturmaya çalışan süpürücüler sıraya girer
+    PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    -- Default partition'da bu aya ait satır varsa PARTITION OF hata verir;
+    -- önce ayrı tablo kurulur, satırlar default'tan taşınır, sonra bağlanır.
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE donations_archive INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM donations_archive_default WHERE archived_at >= %L AND archived_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        month_start, month_start + interval '1 month', partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE donations_archive ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_start + interval '1 month'
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -133,6 +133,7 @@ export default function AddDonationScreen({ onSuccess }: { onSuccess?: () => voi
         description: description.trim(),
         category,
         quantity: quantity.trim() || undefined,
+        expiration_date: expirationDate.trim() || undefined,
       };
 
       if (isEditMode && donationId) {
@@ -143,7 +144,6 @@ export default function AddDonationScreen({ onSuccess }: { onSuccess?: () => voi
       } else {
         await createDonation({
           ...payload,
-          expiration_date: expirationDate.trim() || undefined,
           latitude: location!.latitude,
           longitude: location!.longitude,
         });
@@ -263,7 +263,7 @@ export default function AddDonationScreen({ onSuccess }: { onSuccess?: () => voi
         />
 
         <CustomInput
-          placeholder="Son Kullanma Tarihi"
+          placeholder="Son Kullanma Tarihi (GG.AA.YYYY)"
           value={expirationDate}
           onChangeText={setExpirationDate}
           editable={!loading}
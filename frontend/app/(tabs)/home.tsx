@@ -3,13 +3,22 @@ import { ThemedText } from '@/components/themed-text';
 import { ThemedView } from '@/components/themed-view';
 import { PrimaryButton } from '@/components/ui/primary-button';
 import { useAuth } from '@/contexts/auth-context';
-import { cancelReservation, deleteDonation, getDonations, getDonationsByLocation, reserveDonation } from '@/services/api-service';
+import {
+  cancelReservation,
+  deleteDonation,
+  DonationCluster,
+  getDonationClusters,
+  getDonations,
+  getDonationsByLocation,
+  reserveDonation,
+  subscribeDonationFeed,
+} from '@/services/api-service';
 import { getAuthToken } from '@/services/auth-service';
-import { calculateDistance, getCurrentLocation, LocationCoords } from '@/utils/location-service';
+import { getCurrentLocation, LocationCoords } from '@/utils/location-service';
 import { useFocusEffect, useNavigation, useRouter } from 'expo-router';
 import { useCallback, useEffect, useLayoutEffect, useRef, useState } from 'react';
 import { ActivityIndicator, Alert, FlatList, RefreshControl, StyleSheet, TouchableOpacity, View } from 'react-native';
-import MapView, { Marker, PROVIDER_GOOGLE } from 'react-native-maps';
+import MapView, { Marker, PROVIDER_GOOGLE, Region } from 'react-native-maps';
 import { useSafeAreaInsets } from 'react-native-safe-area-context';
 
 export default function HomeScreen() {
@@ -26,7 +35,11 @@ export default function HomeScreen() {
   const [error, setError] = useState<string | null>(null);
   const [actioningId, setActioningId] = useState<number | null>(null);
   const [filter, setFilter] = useState<'all' | 'temiz' | 'atik' | 'reserved'>('all');
+  const [clusters, setClusters] = useState<DonationCluster[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const mapRef = useRef<MapView>(null);
+  const regionRef = useRef<Region | null>(null);
 
   useEffect(() => {
     loadInitialData();
@@ -40,6 +53,30 @@ export default function HomeScreen() {
     }, [userLocation])
   );
 
+  // Canlı akış: yakındaki değişikliklerde listeyi yenile (olaylar kısa süre biriktirilir).
+  // Liste isteği ETag ile gittiği için değişiklik yoksa 304 döner.
+  useEffect(() => {
+    if (!userLocation) return;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let unsubscribe: (() => void) | null = null;
+    let cancelled = false;
+    subscribeDonationFeed(userLocation.latitude, userLocation.longitude, 10, () => {
+      if (timer) return;
+      timer = setTimeout(() => {
+        timer = null;
+        loadDonations(userLocation);
+      }, 1000);
+    }).then((close) => {
+      if (cancelled) close();
+      else unsubscribe = close;
+    });
+    return () => {
+      cancelled = true;
+      if (timer) clearTimeout(timer);
+      unsubscribe?.();
+    };
+  }, [userLocation]);
+
   useLayoutEffect(() => {
     navigation.setOptions({
       headerLeft: showMap
@@ -90,36 +127,67 @@ export default function HomeScreen() {
     }
   };
 
+  const fetchDonationPage = (location?: LocationCoords, cursor?: string | null) =>
+    location
+      ? getDonationsByLocation(location.latitude, location.longitude, 10, cursor)
+      : getDonations(cursor ? { cursor } : undefined);
+
+  // Mesafe ve sıralama sunucuda hesaplanır (order=distance, distance_m)
+  const enrich = (items: Donation[]) =>
+    items.map((donation) => ({ ...donation, distance: donation.distance_m ?? undefined }) as Donation);
+
+  // İlk sayfayı yükle (liste baştan kurulur); devamı listenin sonuna gelince yüklenir
   const loadDonations = async (location?: LocationCoords) => {
     try {
-      let data: Donation[] = [];
-      if (location) {
-        data = await getDonationsByLocation(location.latitude, location.longitude, 10);
-      } else {
-        data = await getDonations();
-      }
-      const enrichedDonations = data.map((donation) => {
-        let distance: number | undefined;
-        if (location) {
-          distance = calculateDistance(
-            location.latitude,
-            location.longitude,
-            donation.latitude,
-            donation.longitude
-          );
-        }
-        return { ...donation, distance } as Donation;
-      });
-
-      enrichedDonations.sort((a, b) => (a.distance || 0) - (b.distance || 0));
+      const page = await fetchDonationPage(location);
+      const enrichedDonations = enrich(page.data);
       setDonations(enrichedDonations);
       setDisplayedDonations(applyFilter(enrichedDonations, filter));
+      setNextCursor(page.next_cursor);
+      if (regionRef.current) {
+        loadClusters(regionRef.current);
+      }
     } catch (error) {
       console.error('Bağışları yüklerken hata:', error);
       setError('Bağışlar yüklenemedi');
     }
   };
 
+  // Sonraki sayfa (next_cursor): sunucu sayfa başına en fazla 100 bağış döner
+  const loadMoreDonations = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchDonationPage(userLocation || undefined, nextCursor);
+      const known = new Set(donations.map((donation) => donation.id));
+      const merged = [...donations, ...enrich(page.data).filter((donation) => !known.has(donation.id))];
+      setDonations(merged);
+      setDisplayedDonations(applyFilter(merged, filter));
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Sonraki bağışlar yüklenemedi:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Harita için sunucu tarafı kümeleme: görünen alan + zoom'a göre sabit boyutlu cevap
+  const loadClusters = async (region: Region) => {
+    regionRef.current = region;
+    const bbox = [
+      region.longitude - region.longitudeDelta / 2,
+      region.latitude - region.latitudeDelta / 2,
+      region.longitude + region.longitudeDelta / 2,
+      region.latitude + region.latitudeDelta / 2,
+    ].join(',');
+    const zoom = Math.max(0, Math.min(22, Math.round(Math.log2(360 / region.longitudeDelta))));
+    try {
+      setClusters(await getDonationClusters(bbox, zoom));
+    } catch (error) {
+      console.error('Harita kümeleri yüklenemedi:', error);
+    }
+  };
+
   const onRefresh = async () => {
     setRefreshing(true);
     try {
@@ -245,6 +313,15 @@ export default function HomeScreen() {
               latitudeDelta: 0.1,
               longitudeDelta: 0.1,
             }}
+            onMapReady={() =>
+              loadClusters({
+                latitude: userLocation?.latitude || 41.0082,
+                longitude: userLocation?.longitude || 28.9784,
+                latitudeDelta: 0.1,
+                longitudeDelta: 0.1,
+              })
+            }
+            onRegionChangeComplete={loadClusters}
           >
             {userLocation && (
               <Marker
@@ -257,18 +334,38 @@ export default function HomeScreen() {
               />
             )}
 
-            {donations.map((donation) => (
-              <Marker
-                key={donation.id}
-                coordinate={{
-                  latitude: donation.latitude,
-                  longitude: donation.longitude,
-                }}
-                title={donation.title}
-                description={donation.category}
-                onPress={() => handleDonationPress(donation)}
-              />
-            ))}
+            {clusters.map((cluster) => {
+              const donation = cluster.donation_id
+                ? donations.find((d) => d.id === cluster.donation_id)
+                : undefined;
+              if (donation) {
+                return (
+                  <Marker
+                    key={`d-${donation.id}`}
+                    coordinate={{
+                      latitude: donation.latitude,
+                      longitude: donation.longitude,
+                    }}
+                    title={donation.title}
+                    description={donation.category}
+                    onPress={() => handleDonationPress(donation)}
+                  />
+                );
+              }
+              return (
+                <Marker
+                  key={`c-${cluster.latitude}-${cluster.longitude}`}
+                  coordinate={{
+                    latitude: cluster.latitude,
+                    longitude: cluster.longitude,
+                  }}
+                  title={`${cluster.count} bağış`}
+                  description={Object.entries(cluster.categories)
+                    .map(([category, count]) => `${category}: ${count}`)
+                    .join(', ')}
+                />
+              );
+            })}
           </MapView>
 
           <PrimaryButton
@@ -337,6 +434,11 @@ export default function HomeScreen() {
               data={displayedDonations}
               keyExtractor={(item) => item.id.toString()}
               contentContainerStyle={{ paddingBottom: insets.bottom + 140 }}
+              onEndReached={loadMoreDonations}
+              onEndReachedThreshold={0.5}
+              ListFooterComponent={
+                loadingMore ? <ActivityIndicator style={styles.loadMoreIndicator} color="#4CAF50" /> : null
+              }
               renderItem={({ item }) => (
                 <View style={styles.cardWrapper}>
                   <DonationCard
@@ -584,6 +686,9 @@ const styles = StyleSheet.create({
     textAlign: 'center',
     fontSize: 16,
   },
+  loadMoreIndicator: {
+    marginVertical: 16,
+  },
   infoBanner: {
     marginTop: 8,
     marginHorizontal: 0,
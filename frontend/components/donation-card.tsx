@@ -12,6 +12,7 @@ export interface Donation {
   latitude: number;
   longitude: number;
   distance?: number;
+  distance_m?: number | null;
   quantity?: string;
   expiration_date?: string;
   is_reserved?: boolean;
@@ -111,7 +112,7 @@ export function DonationCard({ donation, onPress }: DonationCardProps) {
           )}
 
           {donation.expiration_date && (
-            <ThemedText style={styles.expiration}>📅 {donation.expiration_date}</ThemedText>
+            <ThemedText style={styles.expiration}>📅 {new Date(donation.expiration_date).toLocaleDateString('tr-TR')}</ThemedText>
           )}
         </ThemedView>
 
@@ -29,6 +29,66 @@ export interface Donation extends DonationCreate {
   reserved_by?: number | null;
   is_collected?: boolean;
   is_for_animals?: boolean;
+  distance_m?: number | null;
+}
+
+// GET /donations sayfası: next_cursor null ise son sayfa
+export interface DonationPage {
+  data: Donation[];
+  next_cursor: string | null;
+}
+
+export interface DonationCluster {
+  latitude: number;
+  longitude: number;
+  count: number;
+  categories: Record<string, number>;
+  donation_id?: number | null;
+}
+
+export type DonationFeedEventType =
+  | 'create'
+  | 'update'
+  | 'reserve'
+  | 'cancel'
+  | 'collect'
+  | 'delete'
+  | 'resync'
+  | 'error';
+
+export interface DonationFeedEvent {
+  type: DonationFeedEventType;
+  id?: number;
+  latitude?: number;
+  longitude?: number;
+  category?: string | null;
+  is_reserved?: boolean;
+  is_collected?: boolean;
+  updated_at?: string | null;
+}
+
+export interface DonationTombstone {
+  id: number;
+  reason: 'deleted' | 'collected' | 'expired' | 'hidden';
+  updated_at: string;
+}
+
+export interface DonationChanges {
+  data: Donation[];
+  deleted: DonationTombstone[];
+  next_token: string | null;
+  has_more: boolean;
+  message?: string;
+}
+
+export type DonationBatchAction = 'reserve' | 'cancel' | 'collect' | 'delete';
+
+export interface DonationBatchItem {
+  id: number;
+  status: 'ok' | 'error';
+  status_code: number;
+  message?: string | null;
+  data?: Donation | null;
 }
 
 export const ENDPOINTS = {
@@ -40,9 +100,15 @@ export const ENDPOINTS = {
   },
   DONATIONS: {
     ROOT: '/donations',
+    CLUSTERS: '/donations/clusters',
+    BATCH: '/donations/batch',
+    FEED: '/donations/feed',
+    CHANGES: '/donations/changes',
+    BATCH_ACTION: (action: DonationBatchAction) => `/donations/batch/${action}`,
     BY_ID: (id: number) => `/donations/${id}`,
     RESERVE: (id: number) => `/donations/${id}/reserve`,
     CANCEL_RESERVATION: (id: number) => `/donations/${id}/cancel_reservation`,
+    COLLECT: (id: number) => `/donations/${id}/collect`,
   },
 };
 
@@ -53,6 +119,33 @@ async function authHeaders() {
 }
 
 // -------- AUTH --------
+// Koşullu GET: son yanıtın ETag'i saklanır, aynı istek If-None-Match ile
+// tekrarlanır; sunucu 304 dönerse gövde indirilmeden önceki veri kullanılır.
+const ETAG_CACHE_SIZE = 50;
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+async function conditionalGet<T>(url: string, config: { params?: object; headers?: Record<string, string> } = {}) {
+  const key = `${config.headers?.Authorization ?? ''} ${apiClient.getUri({ url, params: config.params })}`;
+  const cached = etagCache.get(key);
+  const res = await apiClient.get<T>(url, {
+    ...config,
+    headers: { ...config.headers, ...(cached ? { 'If-None-Match': cached.etag } : {}) },
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+  if (res.status === 304 && cached) {
+    return cached.data as T;
+  }
+  const etag = res.headers?.etag;
+  if (etag) {
+    etagCache.delete(key);
+    etagCache.set(key, { etag, data: res.data });
+    if (etagCache.size > ETAG_CACHE_SIZE) {
+      etagCache.delete(etagCache.keys().next().value as string);
+    }
+  }
+  return res.data;
+}
+
 export async function apiLogin(payload: { email: string; password: string }) {
   const res = await apiClient.post(ENDPOINTS.AUTH.LOGIN, payload);
   return res.data;
@@ -88,17 +181,46 @@ export async function getDonations(params?: {
   latitude?: number;
   longitude?: number;
   radius_km?: number;
+  order?: 'id' | 'distance';
+  open_only?: boolean;
+  limit?: number;
+  cursor?: string;
 }) {
   const headers = await authHeaders();
-  const res = await apiClient.get<ApiResponse<Donation[]>>(ENDPOINTS.DONATIONS.ROOT, {
+  const data = await conditionalGet<DonationPage>(ENDPOINTS.DONATIONS.ROOT, {
     params,
     headers,
   });
-  return res.data?.data || res.data;
+  const page: DonationPage = { data: data?.data || [], next_cursor: data?.next_cursor ?? null };
+  return page;
 }
 
 export async function getDonationById(id: number) {
-  const res = await apiClient.get<ApiResponse<Donation>>(ENDPOINTS.DONATIONS.BY_ID(id));
+  const data = await conditionalGet<ApiResponse<Donation>>(ENDPOINTS.DONATIONS.BY_ID(id));
+  return data?.data || data;
+}
+
+export async function getDonationsByIds(ids: number[]) {
+  const headers = await authHeaders();
+  const res = await apiClient.get<ApiResponse<DonationBatchItem[]>>(ENDPOINTS.DONATIONS.BATCH, {
+    params: { ids: ids.join(',') },
+    headers,
+  });
+  return res.data?.data || res.data;
+}
+
+// since yoksa alandaki açık bağışların tamamı döner; has_more ise next_token ile tekrar çağır
+export async function getDonationChanges(bbox: string, since?: string | null) {
+  const headers = await authHeaders();
+  const params: Record<string, string> = { bbox };
+  if (since) params.since = since;
+  const res = await apiClient.get<DonationChanges>(ENDPOINTS.DONATIONS.CHANGES, { params, headers });
+  return res.data;
+}
+
+export async function batchDonationAction(action: DonationBatchAction, ids: number[]) {
+  const headers = await authHeaders();
+  const res = await apiClient.post<ApiResponse<DonationBatchItem[]>>(ENDPOINTS.DONATIONS.BATCH_ACTION(action), { ids }, { headers });
   return res.data?.data || res.data;
 }
 
@@ -132,11 +254,62 @@ export async function cancelReservation(id: number) {
   return res.data?.data || res.data;
 }
 
-export async function getDonationsByLocation(latitude: number, longitude: number, radiusKm: number = 10) {
+export async function collectDonation(id: number) {
   const headers = await authHeaders();
-  const res = await apiClient.get<ApiResponse<Donation[]>>(ENDPOINTS.DONATIONS.ROOT, {
-    params: { latitude, longitude, radius_km: radiusKm },
+  const res = await apiClient.post<ApiResponse<Donation>>(ENDPOINTS.DONATIONS.COLLECT(id), null, { headers });
+  return res.data?.data || res.data;
+}
+
+// Sunucu sayfa başına en fazla limit (varsayılan 100) bağış döner; devamı için
+// dönen next_cursor ile tekrar çağrılır
+export async function getDonationsByLocation(
+  latitude: number,
+  longitude: number,
+  radiusKm: number = 10,
+  cursor?: string | null
+) {
+  return getDonations({
+    latitude,
+    longitude,
+    radius_km: radiusKm,
+    order: 'distance',
+    open_only: true,
+    ...(cursor ? { cursor } : {}),
+  });
+}
+
+// bbox: "min_lng,min_lat,max_lng,max_lat"
+export async function getDonationClusters(bbox: string, zoom: number) {
+  const headers = await authHeaders();
+  const res = await apiClient.get<ApiResponse<DonationCluster[]>>(ENDPOINTS.DONATIONS.CLUSTERS, {
+    params: { bbox, zoom, open_only: true },
     headers,
   });
   return res.data?.data || res.data;
 }
+
+// Canlı değişiklik akışı (WebSocket)
+// Alan içindeki olaylar onEvent'e gelir; dönen fonksiyon aboneliği kapatır.
+// 'resync' olayı gelirse kaçırılan olay vardır, liste yeniden çekilmelidir.
+export async function subscribeDonationFeed(
+  latitude: number,
+  longitude: number,
+  radiusKm: number,
+  onEvent: (event: DonationFeedEvent) => void
+) {
+  const token = await AsyncStorage.getItem('auth_token');
+  if (!token) {
+    return () => {};
+  }
+  const baseUrl = (apiClient.defaults.baseURL || '').replace(/^http/, 'ws');
+  const query = `token=${encodeURIComponent(token)}&latitude=${latitude}&longitude=${longitude}&radius_km=${radiusKm}`;
+  const socket = new WebSocket(`${baseUrl}${ENDPOINTS.DONATIONS.FEED}?${query}`);
+  socket.onmessage = (message) => {
+    try {
+      onEvent(JSON.parse(message.data));
+    } catch (error) {
+      console.error('Akış mesajı okunamadı:', error);
+    }
+  };
+  return () => socket.close();
+}
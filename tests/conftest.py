@@ -0,0 +1,17 @@
+import os
+import pytest
+
+# Sentetik veriyle doldurulmuş veritabanı oturumu
+# -------------------------
+# DATABASE_URL ortamda yoksa atlanır; backend/.env bilerek dikkate alınmaz
+# (veritabanı testleri sadece CI'da veya açıkça istendiğinde çalışır).
+# Migration'ları uygulanmış bir veritabanı beklenir. Tablolar tek transaction
+# içinde doldurulur ve test oturumu sonunda geri alınır.
+@pytest.fixture(scope="session")
+def seeded_db():
+    if not os.environ.get("DATABASE_URL"):
+        pytest.skip("DATABASE_URL is not set")
+    from benchmarks.plan_seed import DEFAULT_SEED, seeded_session
+
+    with seeded_session(**DEFAULT_SEED) as db:
+        yield db
@@ -0,0 +1,20 @@
+import os
+import statistics
+
+from benchmarks.check_import_time import measure
+
+BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "1500"))
+RUNS = 3
+FORBIDDEN = "shapely,passlib"
+
+
+# `import backend.main` temiz süreçte bütçe içinde kalmalı ve
+# yasaklı paketleri (shapely, passlib) açılışta yüklememeli
+def test_startup_import_within_budget():
+    timings = []
+    for _ in range(RUNS):
+        elapsed, error = measure(FORBIDDEN)
+        assert error is None, error
+        timings.append(elapsed * 1000)
+    median = statistics.median(timings)
+    assert median <= BUDGET_MS, f"import backend.main took {median:.0f} ms (budget {BUDGET_MS:.0f} ms)"
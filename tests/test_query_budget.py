@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from backend.utils.metrics import MetricsMiddleware, QueryBudgetExceeded, instrument_engine, query_budget
+
+
+# @query_budget(2) ile işaretli iki route: biri bütçe içinde, biri üstünde
+def _budget_app(enforce_budgets: bool) -> FastAPI:
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    def run_statements(count: int):
+        with engine.connect() as connection:
+            for _ in range(count):
+                connection.execute(text("SELECT 1"))
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, enforce_budgets=enforce_budgets)
+
+    @app.get("/within")
+    @query_budget(2)
+    async def within():
+        run_statements(2)
+        return {"status": "success"}
+
+    @app.get("/over")
+    @query_budget(2)
+    async def over():
+        run_statements(3)
+        return {"status": "success"}
+
+    return app
+
+
+def test_route_within_budget_passes():
+    with TestClient(_budget_app(enforce_budgets=True)) as client:
+        assert client.get("/within").status_code == 200
+
+
+# Yanıt gönderildikten sonra middleware fırlatır; TestClient bunu hata olarak yükseltir
+def test_route_over_budget_raises_when_enforced():
+    with TestClient(_budget_app(enforce_budgets=True)) as client:
+        with pytest.raises(QueryBudgetExceeded, match=r"GET /over ran 3 SQL statements \(budget 2\)"):
+            client.get("/over")
+
+
+def test_route_over_budget_only_warns_when_not_enforced(caplog):
+    with TestClient(_budget_app(enforce_budgets=False)) as client:
+        with caplog.at_level(logging.WARNING, logger="backend.utils.metrics"):
+            assert client.get("/over").status_code == 200
+    assert "GET /over ran 3 SQL statements (budget 2)" in caplog.text
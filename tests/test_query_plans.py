@@ -0,0 +1,28 @@
+import os
+import pytest
+
+# Gerçek PostGIS veritabanı gerekir (bkz. conftest.seeded_db)
+if not os.environ.get("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from benchmarks.plan_seed import DEFAULT_SEED
+from backend.routers.donation_router import _donations_query
+from backend.services.geo_query import explain, has_seq_scan, uses_index
+
+GEOGRAPHY_INDEX = "idx_donations_location_geog"
+LAT, LNG = DEFAULT_SEED["lat"], DEFAULT_SEED["lng"]
+
+
+# Yarıçap filtresi (ST_DWithin) geography GIST indeksini kullanmalı
+def test_within_radius_uses_geography_index(seeded_db):
+    plan = explain(seeded_db, _donations_query(None, LAT, LNG, 5000.0, "id", None, False).limit(101))
+    assert uses_index(plan, GEOGRAPHY_INDEX)
+    assert not has_seq_scan(plan)
+
+
+# Mesafeye göre sıralama (KNN <->) aynı indeksle yapılmalı
+def test_knn_order_uses_geography_index(seeded_db):
+    plan = explain(seeded_db, _donations_query(None, LAT, LNG, 5000.0, "distance", None, True).limit(101))
+    assert uses_index(plan, GEOGRAPHY_INDEX)
+    assert not has_seq_scan(plan)
+
@@ -0,0 +1,22 @@
+import os
+import pytest
+
+# Gerçek PostGIS veritabanı gerekir (bkz. conftest.seeded_db)
+if not os.environ.get("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from benchmarks.check_query_plans import CHECKED_RELATIONS, plan_cases
+from benchmarks.plan_seed import DEFAULT_SEED
+from backend.services.geo_query import explain, has_seq_scan
+
+# benchmarks/check_query_plans.py'deki tüm router sorguları
+# -------------------------
+# donations veya users üzerinde Seq Scan olan her sorgu testi düşürür (CI build'i kırılır).
+PLAN_CASES = dict(plan_cases(DEFAULT_SEED["lat"], DEFAULT_SEED["lng"]))
+
+
+@pytest.mark.parametrize("name", list(PLAN_CASES))
+def test_router_query_has_no_seq_scan(seeded_db, name):
+    plan = explain(seeded_db, PLAN_CASES[name])
+    seq_scans = [relation for relation in CHECKED_RELATIONS if has_seq_scan(plan, relation)]
+    assert not seq_scans, f"{name}: Seq Scan on {', '.join(seq_scans)}"